@@ -5,10 +5,20 @@ from fastapi.security import HTTPBearer
 SECRET_KEY = "your-secret-key-change-this-in-production"
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
+TOKEN_CACHE_SIZE = 10000  # verified tokens remembered until their exp
+
+# GraphQL
+MAX_PAGE_SIZE = 200  # largest `first` accepted by paginated fields
+MAX_LOCATION_BATCH = 1000  # moves accepted by one updateTamagotchiLocations call
+DOCUMENT_CACHE_SIZE = 512  # parsed + validated operations kept in memory
+PERSISTED_QUERY_CACHE_SIZE = 1000  # sha256 -> query text for persisted queries
+SUBSCRIPTION_QUEUE_SIZE = 256  # events buffered per subscription; oldest dropped beyond this
 
 # Password hashing
 # Use pbkdf2_sha256 (pure Python via hashlib) to avoid bcrypt binary builds
 pwd_context = CryptContext(schemes=["pbkdf2_sha256"], deprecated="auto")
+HASH_WORKERS = 2  # processes hashing/verifying passwords
+HASH_MAX_CONCURRENCY = 8  # hashing jobs submitted at once; more callers wait
 security = HTTPBearer()
 
 # Game configuration
@@ -16,8 +26,60 @@ GAME_AREA_WIDTH = 800
 GAME_AREA_HEIGHT = 600
 TAMAGOTCHI_EMOJIS = ['🐱', '🐶', '🐰', '🐸', '🐧', '🐨', '🦊', '🐼']
 
-# Update intervals
+# Update intervals: fixed timesteps of the game clock (services/clock.py)
 STATS_UPDATE_INTERVAL = 1  # seconds
 POSITION_UPDATE_INTERVAL = 0.1  # seconds
+CLOCK_MAX_CATCH_UP_TICKS = 3  # missed ticks a phase replays; older ones are skipped
+CLOCK_ERROR_LOG_INTERVAL_SEC = 10.0  # log a failing phase's traceback at most this often
 DEBOUNCE_DELAY_SEC = 2.0  # debounce delay for scheduled saves
-BACKUP_INTERVAL_SEC = 30.0  # interval for periodic backup saves
\ No newline at end of file
+BACKUP_INTERVAL_SEC = 30.0  # interval for periodic backup saves
+MOUSE_FLUSH_INTERVAL_SEC = 2.0  # batch cursor coordinates into the users table this often
+POSITION_FLUSH_INTERVAL_SEC = 5.0  # persist pet positions from the movement tick this often
+STATS_KEYFRAME_INTERVAL_SEC = 30  # full stats_update keyframe interval (0 disables)
+WS_SEND_TIMEOUT_SEC = 1.0  # per-socket send timeout before a client is evicted
+WS_OUTBOUND_QUEUE_SIZE = 64  # pending frames per connection before coalescable ones are dropped
+
+# Persistence
+# 'sqlite': write only changed pet rows to the tamagotchis table in game.db;
+# 'journal': append per-pet change records to JOURNAL_FILE and periodically
+# compact them into DATA_FILE; 'snapshot': rewrite DATA_FILE on every save
+PERSISTENCE_MODE = "sqlite"
+DATA_FILE = "game_data.json"
+JOURNAL_FILE = "game_data.journal"
+JOURNAL_COMPACT_RECORDS = 10000  # compact once this many records are appended
+JOURNAL_COMPACT_INTERVAL_SEC = 300.0  # ...or this long after the last snapshot
+ASYNC_PERSISTENCE = True  # write to disk on a background thread instead of the event loop
+
+# Stat decay: seconds per point at difficulty 1.0 (divided by the owner's difficulty)
+HUNGER_DECAY_SEC = 30
+HAPPINESS_DECAY_SEC = 60
+ENERGY_DECAY_SEC = 45
+
+# Movement
+# Advance positions with the NumPy struct-of-arrays engine when NumPy is installed;
+# falls back to the per-pet Python loop otherwise.
+VECTORIZED_MOVEMENT = True
+
+# Sharded simulation: with SIMULATION_WORKERS > 0 (and NumPy) pets are split across
+# that many worker processes, each ticking movement and decay for its shard over
+# shared memory; 0 runs both ticks on the event loop
+SIMULATION_WORKERS = 0
+SIMULATION_SHARD_CAPACITY = 4096  # initial pets per shard; grows by doubling
+
+# Multiple server workers (uvicorn --workers N): every worker joins an event bus
+# on this Unix socket. The first to claim it owns the simulation; the others
+# keep a replica, forward mutations to the owner and relay its broadcasts to
+# their own sockets. Empty runs a single, self-contained process.
+CLUSTER_SOCKET = ""
+CLUSTER_REQUEST_TIMEOUT_SEC = 5.0  # forwarded mutation waits this long for the owner
+CLUSTER_PEER_BUFFER_BYTES = 32 * 1024 * 1024  # unsent bytes before a lagging follower is dropped
+CLUSTER_WORLD_CHUNK = 500  # pets per frame when streaming the world to a joining follower
+CLUSTER_RESYNC_RETRY_SEC = 1.0  # wait before retrying a failed follower resync
+
+# Area of interest for movement broadcasts (clients that declare a viewport)
+AOI_CELL_SIZE = 100  # spatial grid cell size in world units
+AOI_MARGIN = 100  # extra border around a viewport that still receives positions
+
+# Cursors: moves are collected and broadcast as one 'cursors' frame per tick
+CURSOR_BROADCAST_HZ = 15
+CURSOR_MIN_DISTANCE = 2.0  # moves shorter than this (world units) are not sent
@@ -1,24 +1,80 @@
 import sqlite3
 import json
 import os
+import threading
+from typing import Dict, Iterable, List
+
+from .models.record import PetRecord, to_epoch, to_iso
 
 DB_PATH = "game.db"
+DB_SYNCHRONOUS = "NORMAL"  # with WAL, only a power loss can drop the last commits
+DB_BUSY_TIMEOUT_MS = 5000
+DB_STATEMENT_CACHE = 256  # prepared statements kept per connection
+DB_MAX_IN_PARAMS = 500  # ids per "WHERE id IN (...)" query (SQLite caps bound parameters)
 
+# Column order for the tamagotchis table; position is flattened into x/y/direction/speed
+TAMAGOTCHI_COLUMNS = (
+    "id", "name", "owner_id", "happiness", "hunger", "energy", "health", "age",
+    "last_fed", "last_played", "last_slept", "created_at", "is_alive", "status",
+    "x", "y", "direction", "speed", "emoji",
+)
 
-def get_connection():
-    """Return a SQLite3 connection with Row factory enabled."""
-    conn = sqlite3.connect(DB_PATH, check_same_thread=False)
+
+_local = threading.local()
+_connections: List[sqlite3.Connection] = []
+_connections_lock = threading.Lock()
+_generation = 0  # bumped by close_connections so every thread reopens
+
+
+def open_connection():
+    """Open a new SQLite3 connection (WAL, Row factory, statement cache)."""
+    conn = sqlite3.connect(DB_PATH, check_same_thread=False, cached_statements=DB_STATEMENT_CACHE)
     conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute(f"PRAGMA synchronous={DB_SYNCHRONOUS}")
+    conn.execute(f"PRAGMA busy_timeout={DB_BUSY_TIMEOUT_MS}")
+    return conn
+
+
+def get_connection():
+    """Return this thread's long-lived connection, opening it on first use.
+
+    Callers must not close it; use ``with conn:`` or ``conn.commit()`` to end
+    transactions. Statements reuse the connection's prepared statement cache,
+    so keep SQL text constant and pass values as parameters.
+    """
+    conn = getattr(_local, "conn", None)
+    if conn is None or _local.key != (os.getpid(), _generation):
+        conn = open_connection()
+        _local.conn = conn
+        _local.key = (os.getpid(), _generation)
+        with _connections_lock:
+            _connections.append(conn)
     return conn
 
 
+def close_connections():
+    """Close every pooled connection (app shutdown)."""
+    global _generation
+    with _connections_lock:
+        conns = list(_connections)
+        _connections.clear()
+        _generation += 1
+    for conn in conns:
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+
 def init_db_and_migrate_json_users(json_path: str = "game_data.json"):
     """
     Initialize the SQLite database and migrate users from JSON if the DB is empty.
 
-    - Creates the `users` table if it does not exist.
+    - Creates the `users` and `tamagotchis` tables if they do not exist.
     - If `users` table is empty and JSON contains users, migrates them.
     - After migration, rewrites JSON without `users` to avoid storing password hashes.
+    - If `tamagotchis` table is empty and JSON contains pets, migrates them.
     """
     conn = get_connection()
     try:
@@ -37,6 +93,33 @@ def init_db_and_migrate_json_users(json_path: str = "game_data.json"):
             )
             """
         )
+        cur.execute(
+            """
+            CREATE TABLE IF NOT EXISTS tamagotchis (
+                id TEXT PRIMARY KEY,
+                name TEXT NOT NULL,
+                owner_id TEXT NOT NULL,
+                happiness INTEGER NOT NULL,
+                hunger INTEGER NOT NULL,
+                energy INTEGER NOT NULL,
+                health INTEGER NOT NULL,
+                age INTEGER DEFAULT 0,
+                last_fed TEXT NOT NULL,
+                last_played TEXT NOT NULL,
+                last_slept TEXT NOT NULL,
+                created_at TEXT NOT NULL,
+                is_alive INTEGER NOT NULL,
+                status TEXT NOT NULL,
+                x REAL DEFAULT 0.0,
+                y REAL DEFAULT 0.0,
+                direction REAL DEFAULT 0.0,
+                speed REAL DEFAULT 1.0,
+                emoji TEXT
+            )
+            """
+        )
+        cur.execute("CREATE INDEX IF NOT EXISTS idx_tamagotchis_owner ON tamagotchis (owner_id)")
+        cur.execute("CREATE INDEX IF NOT EXISTS idx_tamagotchis_alive ON tamagotchis (is_alive)")
         conn.commit()
 
         # If DB is empty, try migrating from JSON
@@ -76,5 +159,134 @@ def init_db_and_migrate_json_users(json_path: str = "game_data.json"):
             except Exception:
                 # Best-effort migration; if it fails, leave JSON as-is
                 pass
+
+        # Migrate pets from JSON into an empty tamagotchis table
+        cur.execute("SELECT COUNT(*) AS count FROM tamagotchis")
+        pet_count = int(cur.fetchone()["count"])
+
+        if pet_count == 0 and os.path.exists(json_path):
+            try:
+                with open(json_path, "r") as f:
+                    data = json.load(f)
+                pets = (data.get("tamagotchis", {}) or {}).values()
+                cur.executemany(_UPSERT_TAMAGOTCHI_SQL, [tamagotchi_to_row(PetRecord.from_dict(p)) for p in pets])
+                conn.commit()
+            except Exception:
+                # Best-effort migration; JSON stays the source if it fails
+                conn.rollback()
     finally:
-        conn.close()
\ No newline at end of file
+        cur.close()
+
+
+# A true upsert: updates the row in place (same rowid) instead of the delete +
+# insert of INSERT OR REPLACE
+_UPSERT_TAMAGOTCHI_SQL = "INSERT INTO tamagotchis ({}) VALUES ({}) ON CONFLICT(id) DO UPDATE SET {}".format(
+    ", ".join(TAMAGOTCHI_COLUMNS),
+    ", ".join("?" for _ in TAMAGOTCHI_COLUMNS),
+    ", ".join("{0} = excluded.{0}".format(c) for c in TAMAGOTCHI_COLUMNS if c != "id"),
+)
+
+
+def tamagotchi_to_row(pet: PetRecord) -> tuple:
+    """Flatten an in-memory pet into a tamagotchis row (TAMAGOTCHI_COLUMNS order)."""
+    return (
+        pet.id,
+        pet.name or "",
+        pet.owner_id or "",
+        int(pet.happiness),
+        int(pet.hunger),
+        int(pet.energy),
+        int(pet.health),
+        int(pet.age),
+        to_iso(pet.last_fed),
+        to_iso(pet.last_played),
+        to_iso(pet.last_slept),
+        to_iso(pet.created_at),
+        1 if pet.is_alive else 0,
+        pet.status or "",
+        float(pet.x),
+        float(pet.y),
+        float(pet.direction),
+        float(pet.speed),
+        pet.emoji,
+    )
+
+
+def row_to_tamagotchi(row) -> PetRecord:
+    """Rebuild the in-memory pet from a tamagotchis row."""
+    return PetRecord(
+        id=row["id"],
+        name=row["name"],
+        owner_id=row["owner_id"],
+        happiness=row["happiness"],
+        hunger=row["hunger"],
+        energy=row["energy"],
+        health=row["health"],
+        age=row["age"] or 0,
+        last_fed=to_epoch(row["last_fed"]),
+        last_played=to_epoch(row["last_played"]),
+        last_slept=to_epoch(row["last_slept"]),
+        created_at=to_epoch(row["created_at"]),
+        is_alive=bool(row["is_alive"]),
+        status=row["status"],
+        x=float(row["x"] or 0.0),
+        y=float(row["y"] or 0.0),
+        direction=float(row["direction"] or 0.0),
+        speed=float(row["speed"] if row["speed"] is not None else 1.0),
+        emoji=row["emoji"],
+    )
+
+
+def load_tamagotchis() -> Dict[str, PetRecord]:
+    """Read every pet from SQLite keyed by id."""
+    cur = get_connection().execute("SELECT {} FROM tamagotchis".format(", ".join(TAMAGOTCHI_COLUMNS)))
+    return {r["id"]: row_to_tamagotchi(r) for r in cur.fetchall()}
+
+
+def load_user_rows(user_ids: Iterable[str]) -> List[sqlite3.Row]:
+    """Users rows (without password hashes) for the given ids, in batched IN queries."""
+    ids = list(user_ids)
+    rows: List[sqlite3.Row] = []
+    conn = get_connection()
+    for i in range(0, len(ids), DB_MAX_IN_PARAMS):
+        chunk = ids[i:i + DB_MAX_IN_PARAMS]
+        rows.extend(conn.execute(
+            "SELECT id, username, created_at, mouse_x, mouse_y, is_online, difficulty FROM users WHERE id IN ({})".format(
+                ", ".join("?" for _ in chunk)
+            ),
+            chunk,
+        ).fetchall())
+    return rows
+
+
+def save_mouse_positions(rows: Iterable[tuple]):
+    """Write buffered ``(mouse_x, mouse_y, user_id)`` rows in a single transaction."""
+    rows = list(rows)
+    if not rows:
+        return
+    conn = get_connection()
+    with conn:
+        conn.executemany("UPDATE users SET mouse_x = ?, mouse_y = ? WHERE id = ?", rows)
+
+
+def save_tamagotchi_positions(rows: Iterable[tuple]):
+    """Write ``(x, y, direction, id)`` rows from the movement tick in a single transaction."""
+    rows = list(rows)
+    if not rows:
+        return
+    conn = get_connection()
+    with conn:
+        conn.executemany("UPDATE tamagotchis SET x = ?, y = ?, direction = ? WHERE id = ?", rows)
+
+
+def save_tamagotchi_rows(rows: List[tuple], deleted_ids: Iterable[str] = ()):
+    """Upsert pets (rows built with tamagotchi_to_row) and delete removed ones in a single transaction."""
+    deleted = [(pet_id,) for pet_id in deleted_ids]
+    if not rows and not deleted:
+        return
+    conn = get_connection()
+    with conn:
+        if rows:
+            conn.executemany(_UPSERT_TAMAGOTCHI_SQL, rows)
+        if deleted:
+            conn.executemany("DELETE FROM tamagotchis WHERE id = ?", deleted)
\ No newline at end of file
@@ -1,3 +1,5 @@
 from .schema import schema
+from .document_cache import document_cache
+from .persisted import PersistedQueryRouter, persisted_queries
 
-__all__ = ["schema"]
\ No newline at end of file
+__all__ = ["schema", "document_cache", "PersistedQueryRouter", "persisted_queries"]
\ No newline at end of file
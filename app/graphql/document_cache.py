@@ -0,0 +1,105 @@
+import time
+from collections import OrderedDict
+from typing import Iterator
+
+from graphql import GraphQLError
+from strawberry.extensions import SchemaExtension
+from strawberry.schema.execute import parse_document, validate_document
+
+from ..config import DOCUMENT_CACHE_SIZE
+
+
+class _Entry:
+    __slots__ = ('document', 'errors', 'rules', 'parse_ms', 'validate_ms')
+
+    def __init__(self, document, parse_ms: float):
+        self.document = document
+        self.errors = None  # validation result, filled in by on_validate
+        self.rules = None
+        self.parse_ms = parse_ms
+        self.validate_ms = 0.0
+
+
+class DocumentCache:
+    """LRU of parsed and validated GraphQL documents keyed by query text.
+
+    Clients send the same few operations over and over; a hit skips both
+    parsing and validation. Misses are timed so /metrics can report how
+    much work the hits saved. The cache is process-wide; each request runs
+    its own ``DocumentCacheExtension`` against it.
+    """
+
+    def __init__(self, max_size: int = DOCUMENT_CACHE_SIZE):
+        self.max_size = max_size
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.saved_ms = 0.0
+        self.spent_ms = 0.0
+
+    def parse(self, ctx):
+        query = ctx.query
+        entry = self._entries.get(query) if query else None
+        if entry is not None and entry.errors is not None:
+            self._entries.move_to_end(query)
+            ctx.graphql_document = entry.document
+        elif query:
+            start = time.perf_counter()
+            try:
+                document = parse_document(query)
+            except GraphQLError:
+                document = None  # let Strawberry report the syntax error
+            if document is not None:
+                parse_ms = (time.perf_counter() - start) * 1000
+                ctx.graphql_document = document
+                self._entries[query] = _Entry(document, parse_ms)
+                self._entries.move_to_end(query)
+                while len(self._entries) > self.max_size:
+                    self._entries.popitem(last=False)
+
+    def validate(self, ctx):
+        entry = self._entries.get(ctx.query) if ctx.query else None
+        if entry is not None and entry.document is ctx.graphql_document:
+            if entry.errors is not None and entry.rules == ctx.validation_rules:
+                self.hits += 1
+                self.saved_ms += entry.parse_ms + entry.validate_ms
+                ctx.errors = list(entry.errors)
+            else:
+                start = time.perf_counter()
+                entry.errors = validate_document(ctx.schema._schema, ctx.graphql_document, ctx.validation_rules)
+                entry.validate_ms = (time.perf_counter() - start) * 1000
+                entry.rules = ctx.validation_rules
+                self.misses += 1
+                self.spent_ms += entry.parse_ms + entry.validate_ms
+                ctx.errors = list(entry.errors)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            'size': len(self._entries),
+            'max_size': self.max_size,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / lookups, 3) if lookups else 0.0,
+            'saved_ms_total': round(self.saved_ms, 3),
+            'saved_ms_per_hit': round(self.saved_ms / self.hits, 3) if self.hits else 0.0,
+            'parse_validate_ms_per_miss': round(self.spent_ms / self.misses, 3) if self.misses else 0.0,
+        }
+
+
+document_cache = DocumentCache()
+
+
+class DocumentCacheExtension(SchemaExtension):
+    """Per-request extension serving parse and validate from ``document_cache``.
+
+    Registered as a class so Strawberry builds one instance per execution.
+    """
+
+    def on_parse(self) -> Iterator[None]:
+        document_cache.parse(self.execution_context)
+        yield
+
+    def on_validate(self) -> Iterator[None]:
+        document_cache.validate(self.execution_context)
+        yield
@@ -0,0 +1,24 @@
+from typing import List, Optional
+
+from strawberry.dataloader import DataLoader
+
+from ..models import User
+from ..services.storage import GameStorage
+
+# This will be injected
+storage: GameStorage = None
+
+
+async def _load_users(user_ids: List[str]) -> List[Optional[User]]:
+    return storage.get_users(user_ids)
+
+
+def create_loaders() -> dict:
+    """Per-request DataLoaders, added to the GraphQL context.
+
+    ``user_loader`` collects every user id requested while a query resolves
+    and fetches them in one batch (cache misses share one SQLite query).
+    """
+    return {
+        "user_loader": DataLoader(load_fn=_load_users),
+    }
@@ -1,12 +1,15 @@
 import strawberry
 from datetime import timedelta
 
-from ..config import ACCESS_TOKEN_EXPIRE_MINUTES
+from typing import List
+
+from ..config import ACCESS_TOKEN_EXPIRE_MINUTES, MAX_LOCATION_BATCH
 from ..models import (
     CreateUserInput,
     LoginInput,
     CreateTamagotchiInput,
     MousePositionInput,
+    TamagotchiLocationInput,
     AuthPayload,
     Tamagotchi,
     User,
@@ -20,9 +23,9 @@ storage: GameStorage = None
 @strawberry.type
 class Mutation:
     @strawberry.mutation
-    def register(self, input: CreateUserInput) -> AuthPayload:
+    async def register(self, input: CreateUserInput) -> AuthPayload:
         try:
-            user = storage.create_user(input.username, input.password)
+            user = await storage.create_user_async(input.username, input.password)
             access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
             access_token = create_access_token(
                 data={"sub": user.id}, expires_delta=access_token_expires
@@ -32,8 +35,8 @@ class Mutation:
             raise Exception(str(e))
     
     @strawberry.mutation
-    def login(self, input: LoginInput) -> AuthPayload:
-        user = storage.authenticate_user(input.username, input.password)
+    async def login(self, input: LoginInput) -> AuthPayload:
+        user = await storage.authenticate_user_async(input.username, input.password)
         if not user:
             raise Exception("Invalid credentials")
         
@@ -44,24 +47,24 @@ class Mutation:
         return AuthPayload(token=access_token, user=user)
     
     @strawberry.mutation
-    def create_tamagotchi(self, input: CreateTamagotchiInput, info) -> Tamagotchi:
+    async def create_tamagotchi(self, input: CreateTamagotchiInput, info) -> Tamagotchi:
         # Get user_id from context
         user_id = info.context.get("user_id")
         if not user_id:
             raise Exception("Authentication required")
-        return storage.create_tamagotchi(input.name, user_id)
+        return Tamagotchi.from_record(await storage.submit('create_tamagotchi', input.name, user_id))
     
     @strawberry.mutation
-    def update_mouse_position(self, input: MousePositionInput, info) -> bool:
+    async def update_mouse_position(self, input: MousePositionInput, info) -> bool:
         # Get user_id from context
         user_id = info.context.get("user_id")
         if not user_id:
             raise Exception("Authentication required")
-        storage.update_mouse_position(user_id, input.x, input.y)
+        await storage.submit('update_mouse_position', user_id, input.x, input.y)
         return True
 
     @strawberry.mutation
-    def update_tamagotchi_location(self, id: str, x: float, y: float, info) -> Tamagotchi:
+    async def update_tamagotchi_location(self, id: str, x: float, y: float, info) -> Tamagotchi:
         # Require authentication
         user_id = info.context.get("user_id")
         if not user_id:
@@ -73,16 +76,28 @@ class Mutation:
             raise Exception("Tamagotchi not found")
 
         # Enforce ownership
-        if t_data.get('owner_id') != user_id:
+        if t_data.owner_id != user_id:
             raise Exception("Not authorized to update this Tamagotchi")
 
-        updated = storage.update_tamagotchi_location(id, x, y)
+        updated = await storage.submit('update_tamagotchi_location', id, x, y)
         if not updated:
             raise Exception("Failed to update location")
-        return updated
+        return Tamagotchi.from_record(updated)
+
+    @strawberry.mutation
+    async def update_tamagotchi_locations(self, inputs: List[TamagotchiLocationInput], info) -> List[Tamagotchi]:
+        """Save many pet positions at once; pets the caller does not own are skipped."""
+        # Require authentication
+        user_id = info.context.get("user_id")
+        if not user_id:
+            raise Exception("Authentication required")
+        if len(inputs) > MAX_LOCATION_BATCH:
+            raise Exception(f"At most {MAX_LOCATION_BATCH} locations per call")
+        moved = await storage.submit('update_tamagotchi_locations', user_id, [(i.id, i.x, i.y) for i in inputs])
+        return [Tamagotchi.from_record(pet) for pet in moved]
 
     @strawberry.mutation
-    def support_tamagotchi(self, id: str, info) -> Tamagotchi:
+    async def support_tamagotchi(self, id: str, info) -> Tamagotchi:
         # Require authentication
         user_id = info.context.get("user_id")
         if not user_id:
@@ -94,16 +109,16 @@ class Mutation:
             raise Exception("Tamagotchi not found")
 
         # Only non-owner can support
-        if t_data.get('owner_id') == user_id:
+        if t_data.owner_id == user_id:
             raise Exception("You cannot support your own Tamagotchi")
 
-        updated = storage.support_tamagotchi(user_id, id)
+        updated = await storage.submit('support_tamagotchi', user_id, id)
         if not updated:
             raise Exception("Failed to support Tamagotchi")
-        return updated
+        return Tamagotchi.from_record(updated)
 
     @strawberry.mutation
-    def feed_tamagotchi(self, id: str, info) -> Tamagotchi:
+    async def feed_tamagotchi(self, id: str, info) -> Tamagotchi:
         # Require authentication
         user_id = info.context.get("user_id")
         if not user_id:
@@ -115,16 +130,16 @@ class Mutation:
             raise Exception("Tamagotchi not found")
 
         # Enforce ownership
-        if t_data.get('owner_id') != user_id:
+        if t_data.owner_id != user_id:
             raise Exception("Not authorized to feed this Tamagotchi")
 
-        updated = storage.feed_tamagotchi(user_id, id)
+        updated = await storage.submit('feed_tamagotchi', user_id, id)
         if not updated:
             raise Exception("Failed to feed Tamagotchi")
-        return updated
+        return Tamagotchi.from_record(updated)
 
     @strawberry.mutation
-    def play_tamagotchi(self, id: str, info) -> Tamagotchi:
+    async def play_tamagotchi(self, id: str, info) -> Tamagotchi:
         # Require authentication
         user_id = info.context.get("user_id")
         if not user_id:
@@ -136,16 +151,16 @@ class Mutation:
             raise Exception("Tamagotchi not found")
 
         # Enforce ownership
-        if t_data.get('owner_id') != user_id:
+        if t_data.owner_id != user_id:
             raise Exception("Not authorized to play with this Tamagotchi")
 
-        updated = storage.play_tamagotchi(user_id, id)
+        updated = await storage.submit('play_tamagotchi', user_id, id)
         if not updated:
             raise Exception("Failed to play with Tamagotchi")
-        return updated
+        return Tamagotchi.from_record(updated)
 
     @strawberry.mutation
-    def sleep_tamagotchi(self, id: str, info) -> Tamagotchi:
+    async def sleep_tamagotchi(self, id: str, info) -> Tamagotchi:
         # Require authentication
         user_id = info.context.get("user_id")
         if not user_id:
@@ -157,16 +172,16 @@ class Mutation:
             raise Exception("Tamagotchi not found")
 
         # Enforce ownership
-        if t_data.get('owner_id') != user_id:
+        if t_data.owner_id != user_id:
             raise Exception("Not authorized to let this Tamagotchi sleep")
 
-        updated = storage.sleep_tamagotchi(user_id, id)
+        updated = await storage.submit('sleep_tamagotchi', user_id, id)
         if not updated:
             raise Exception("Failed to update Tamagotchi sleep")
-        return updated
+        return Tamagotchi.from_record(updated)
 
     @strawberry.mutation
-    def revive_tamagotchi(self, id: str, info) -> Tamagotchi:
+    async def revive_tamagotchi(self, id: str, info) -> Tamagotchi:
         # Require authentication
         user_id = info.context.get("user_id")
         if not user_id:
@@ -178,16 +193,16 @@ class Mutation:
             raise Exception("Tamagotchi not found")
 
         # Enforce ownership
-        if t_data.get('owner_id') != user_id:
+        if t_data.owner_id != user_id:
             raise Exception("Not authorized to revive this Tamagotchi")
 
-        revived = storage.revive_tamagotchi(user_id, id)
+        revived = await storage.submit('revive_tamagotchi', user_id, id)
         if not revived:
             raise Exception("Failed to revive Tamagotchi")
-        return revived
+        return Tamagotchi.from_record(revived)
 
     @strawberry.mutation
-    def release_tamagotchi(self, id: str, info) -> bool:
+    async def release_tamagotchi(self, id: str, info) -> bool:
         # Require authentication
         user_id = info.context.get("user_id")
         if not user_id:
@@ -200,21 +215,21 @@ class Mutation:
             return True
 
         # Enforce ownership
-        if t_data.get('owner_id') != user_id:
+        if t_data.owner_id != user_id:
             raise Exception("Not authorized to release this Tamagotchi")
 
-        ok = storage.release_tamagotchi(user_id, id)
+        ok = await storage.submit('release_tamagotchi', user_id, id)
         if not ok:
             raise Exception("Failed to release Tamagotchi")
         return True
 
     @strawberry.mutation
-    def set_difficulty(self, difficulty: float, info) -> User:
+    async def set_difficulty(self, difficulty: float, info) -> User:
         # Require authentication
         user_id = info.context.get("user_id")
         if not user_id:
             raise Exception("Authentication required")
-        updated_user = storage.set_user_difficulty(user_id, difficulty)
+        updated_user = await storage.submit('set_user_difficulty', user_id, difficulty)
         if not updated_user:
             raise Exception("Failed to set difficulty")
         return updated_user
\ No newline at end of file
@@ -0,0 +1,110 @@
+import hashlib
+import json
+from collections import OrderedDict
+from typing import Optional
+
+from graphql import GraphQLError
+from strawberry.fastapi import GraphQLRouter
+from strawberry.http import GraphQLRequestData
+from strawberry.http.exceptions import HTTPException
+from strawberry.types import ExecutionResult
+
+from ..config import PERSISTED_QUERY_CACHE_SIZE
+
+
+class PersistedQueryNotFound(Exception):
+    pass
+
+
+class PersistedQueries:
+    """Bounded LRU of sha256 hash -> query text for automatic persisted queries."""
+
+    def __init__(self, max_size: int = PERSISTED_QUERY_CACHE_SIZE):
+        self.max_size = max_size
+        self._queries: "OrderedDict[str, str]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.registered = 0
+
+    def get(self, sha256_hash: str) -> Optional[str]:
+        query = self._queries.get(sha256_hash)
+        if query is None:
+            self.misses += 1
+            return None
+        self._queries.move_to_end(sha256_hash)
+        self.hits += 1
+        return query
+
+    def register(self, sha256_hash: str, query: str):
+        if hashlib.sha256(query.encode()).hexdigest() != sha256_hash:
+            raise HTTPException(400, "provided sha does not match query")
+        if sha256_hash not in self._queries:
+            self.registered += 1
+        self._queries[sha256_hash] = query
+        self._queries.move_to_end(sha256_hash)
+        while len(self._queries) > self.max_size:
+            self._queries.popitem(last=False)
+
+    def stats(self) -> dict:
+        return {
+            'size': len(self._queries),
+            'max_size': self.max_size,
+            'hits': self.hits,
+            'misses': self.misses,
+            'registered': self.registered,
+        }
+
+
+persisted_queries = PersistedQueries()
+
+
+class PersistedQueryRouter(GraphQLRouter):
+    """GraphQLRouter with Apollo-style automatic persisted queries (APQ).
+
+    Clients send ``extensions.persistedQuery.sha256Hash`` instead of the
+    query text. An unknown hash gets a ``PersistedQueryNotFound`` error; the
+    client then retries once with both hash and query, which registers it.
+    """
+
+    def should_render_graphiql(self, request) -> bool:
+        # a hash-only GET has no ``query`` param but is still an operation
+        if request.query_params.get("extensions") is not None:
+            return False
+        return super().should_render_graphiql(request)
+
+    async def parse_http_body(self, request) -> GraphQLRequestData:
+        content_type = request.content_type or ""
+        if "application/json" in content_type:
+            data = self.parse_json(await request.get_body())
+        elif request.method == "GET" and not content_type.startswith("multipart/form-data"):
+            data = self.parse_query_params(request.query_params)
+            if isinstance(data.get("extensions"), str):
+                data["extensions"] = json.loads(data["extensions"])
+        else:
+            return await super().parse_http_body(request)
+
+        query = data.get("query")
+        persisted = (data.get("extensions") or {}).get("persistedQuery")
+        if isinstance(persisted, dict) and persisted.get("sha256Hash"):
+            sha256_hash = persisted["sha256Hash"]
+            if query:
+                persisted_queries.register(sha256_hash, query)
+            else:
+                query = persisted_queries.get(sha256_hash)
+                if query is None:
+                    raise PersistedQueryNotFound()
+
+        return GraphQLRequestData(
+            query=query,
+            variables=data.get("variables"),  # type: ignore
+            operation_name=data.get("operationName"),
+        )
+
+    async def execute_operation(self, request, context, root_value) -> ExecutionResult:
+        try:
+            return await super().execute_operation(request=request, context=context, root_value=root_value)
+        except PersistedQueryNotFound:
+            return ExecutionResult(
+                data=None,
+                errors=[GraphQLError("PersistedQueryNotFound", extensions={"code": "PERSISTED_QUERY_NOT_FOUND"})],
+            )
@@ -1,7 +1,16 @@
 import strawberry
 from typing import List, Optional
 
-from ..models import User, Tamagotchi
+from ..config import MAX_PAGE_SIZE
+from ..models import (
+    User,
+    Tamagotchi,
+    PageInfo,
+    TamagotchiEdge,
+    TamagotchiConnection,
+    encode_cursor,
+    decode_cursor,
+)
 from ..services.storage import GameStorage
 
 # This will be injected
@@ -10,24 +19,70 @@ storage: GameStorage = None
 @strawberry.type
 class Query:
     @strawberry.field
-    def me(self, info) -> Optional[User]:
+    async def me(self, info) -> Optional[User]:
         # Get user from context (set by middleware)
         user_id = getattr(info.context.get("request", {}), "user_id", None)
         if user_id:
-            return storage.get_user(user_id)
+            return await info.context["user_loader"].load(user_id)
         return None
     
     @strawberry.field
-    def all_tamagotchis(self) -> List[Tamagotchi]:
-        return storage.get_all_tamagotchis()
+    def all_tamagotchis(
+        self,
+        owner_id: Optional[str] = None,
+        alive: Optional[bool] = None,
+        status: Optional[str] = None,
+    ) -> List[Tamagotchi]:
+        if owner_id is None and alive is None and status is None:
+            # Built once per world generation / movement step and shared by every reader
+            return storage.snapshots.get('tamagotchis', lambda: [
+                Tamagotchi.from_record(pet) for pet in storage.get_all_tamagotchis()
+            ], live=('positions',))
+        pets = storage.get_all_tamagotchis(owner_id=owner_id, alive=alive, status=status)
+        return [Tamagotchi.from_record(pet) for pet in pets]
+
+    @strawberry.field
+    def tamagotchis(
+        self,
+        first: int = 50,
+        after: Optional[str] = None,
+        owner_id: Optional[str] = None,
+        alive: Optional[bool] = None,
+        status: Optional[str] = None,
+    ) -> TamagotchiConnection:
+        """Relay-style page of pets in creation order, filtered via storage indexes."""
+        if first < 0:
+            raise Exception("first must be non-negative")
+        first = min(first, MAX_PAGE_SIZE)
+        try:
+            after_key = decode_cursor(after)
+        except ValueError as e:
+            raise Exception(str(e))
+        edges, has_previous, has_next, total = storage.page_tamagotchis(
+            first, after_key, owner_id=owner_id, alive=alive, status=status
+        )
+        edges = [TamagotchiEdge(cursor=encode_cursor(key), node=Tamagotchi.from_record(pet)) for key, pet in edges]
+        return TamagotchiConnection(
+            edges=edges,
+            page_info=PageInfo(
+                has_next_page=has_next,
+                has_previous_page=has_previous,
+                start_cursor=edges[0].cursor if edges else None,
+                end_cursor=edges[-1].cursor if edges else None,
+            ),
+            total_count=total,
+        )
     
     @strawberry.field
     def my_tamagotchis(self, info) -> List[Tamagotchi]:
         user_id = getattr(info.context.get("request", {}), "user_id", None)
         if user_id:
-            return storage.get_user_tamagotchis(user_id)
+            return [Tamagotchi.from_record(pet) for pet in storage.get_user_tamagotchis(user_id)]
         return []
     
     @strawberry.field
-    def all_users(self) -> List[User]:
-        return [storage.get_user(user_id) for user_id in storage.users.keys()]
\ No newline at end of file
+    def all_users(self, info) -> List[User]:
+        # Shared per-generation list; prime the loader so owner fields reuse it
+        users = storage.get_world_users()
+        info.context["user_loader"].prime_many({u.id: u for u in users})
+        return users
\ No newline at end of file
@@ -2,5 +2,11 @@ import strawberry
 from .queries import Query
 from .mutations import Mutation
 from .subscriptions import Subscription
+from .document_cache import DocumentCacheExtension
 
-schema = strawberry.Schema(query=Query, mutation=Mutation, subscription=Subscription)
\ No newline at end of file
+schema = strawberry.Schema(
+    query=Query,
+    mutation=Mutation,
+    subscription=Subscription,
+    extensions=[DocumentCacheExtension],
+)
\ No newline at end of file
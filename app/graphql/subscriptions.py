@@ -1,12 +1,81 @@
 import strawberry
-import asyncio
-from typing import AsyncGenerator
+from typing import AsyncGenerator, Iterable, List
+
+from ..models import MousePosition, PetPosition, Tamagotchi, TamagotchiEvent
+from ..services.broker import TOPIC_STATS, TOPIC_POSITIONS, TOPIC_CREATED, TOPIC_REMOVED, TOPIC_CURSORS
+from ..services.positions import PositionColumns
+from ..services.storage import GameStorage
+
+# This will be injected
+storage: GameStorage = None
+
+PET_TOPICS = (TOPIC_STATS, TOPIC_CREATED, TOPIC_REMOVED)
+EVENT_TYPES = {
+    TOPIC_STATS: 'stats_update',
+    TOPIC_CREATED: 'tamagotchi_created',
+    TOPIC_REMOVED: 'tamagotchi_removed',
+    TOPIC_POSITIONS: 'position_update',
+}
+
+
+async def _events(routes: Iterable, max_size: int = None):
+    """Yield ``(topic, event)`` for one subscriber until the client goes away."""
+    with storage.broker.subscribe(routes, max_size) as sub:
+        while True:
+            yield await sub.get()
+
+
+def _positions(positions: PositionColumns) -> List[PetPosition]:
+    return [
+        PetPosition(id=pet_id, x=x, y=y, direction=d)
+        for pet_id, x, y, d in zip(positions.ids, positions.x, positions.y, positions.direction)
+    ]
+
+
+def _to_event(topic: str, event) -> TamagotchiEvent:
+    if topic == TOPIC_POSITIONS:
+        return TamagotchiEvent(type=EVENT_TYPES[topic], positions=_positions(event))
+    pet = None if topic == TOPIC_REMOVED else storage.get_tamagotchi(event['id'])
+    tamagotchi = Tamagotchi.from_record(pet) if pet else None
+    return TamagotchiEvent(type=EVENT_TYPES[topic], id=event['id'], tamagotchi=tamagotchi)
+
 
 @strawberry.type
 class Subscription:
     @strawberry.subscription
-    async def tamagotchi_updates(self) -> AsyncGenerator[str, None]:
-        # This is a placeholder - real implementation would use WebSocket manager
-        while True:
-            yield "Update available"
-            await asyncio.sleep(1)
\ No newline at end of file
+    async def tamagotchi_updates(self, positions: bool = False) -> AsyncGenerator[TamagotchiEvent, None]:
+        """Every pet's stat changes, creations and removals (and movement frames if asked)."""
+        routes = [(topic, None) for topic in PET_TOPICS]
+        if positions:
+            routes.append((TOPIC_POSITIONS, None))
+        async for topic, event in _events(routes):
+            yield _to_event(topic, event)
+
+    @strawberry.subscription
+    async def pet_updated(self, id: str) -> AsyncGenerator[TamagotchiEvent, None]:
+        """Stat changes of one pet; completes after it is released."""
+        async for topic, event in _events([(TOPIC_STATS, ('pet', id)), (TOPIC_REMOVED, ('pet', id))]):
+            yield _to_event(topic, event)
+            if topic == TOPIC_REMOVED:
+                return
+
+    @strawberry.subscription
+    async def my_pets_updated(self, info) -> AsyncGenerator[TamagotchiEvent, None]:
+        """Stat changes, creations and removals of the signed-in user's pets."""
+        user_id = info.context.get("user_id")
+        if not user_id:
+            raise Exception("Authentication required")
+        async for topic, event in _events([(topic, ('owner', user_id)) for topic in PET_TOPICS]):
+            yield _to_event(topic, event)
+
+    @strawberry.subscription
+    async def world_positions(self) -> AsyncGenerator[List[PetPosition], None]:
+        """Movement frames; a slow client skips to the newest frame."""
+        async for _, positions in _events([(TOPIC_POSITIONS, None)], max_size=1):
+            yield _positions(positions)
+
+    @strawberry.subscription
+    async def cursors(self) -> AsyncGenerator[List[MousePosition], None]:
+        """Batches of other users' cursor moves."""
+        async for _, cursors in _events([(TOPIC_CURSORS, None)]):
+            yield [MousePosition(**c) for c in cursors]
@@ -1,17 +1,21 @@
 from contextlib import asynccontextmanager
-from fastapi import FastAPI, Request
+from fastapi import FastAPI
+from starlette.requests import HTTPConnection
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from fastapi.responses import FileResponse, Response
-from strawberry.fastapi import GraphQLRouter
 from strawberry.subscriptions import GRAPHQL_TRANSPORT_WS_PROTOCOL, GRAPHQL_WS_PROTOCOL
-from jose import JWTError, jwt
 
-from .graphql import schema
+from .graphql import schema, document_cache, PersistedQueryRouter, persisted_queries
 from .services.storage import GameStorage
 from .services.websocket import ConnectionManager
+from .services.cluster import Cluster, LocalSocketBus
+from .services.auth import decode_token, token_cache
 from .routes.websocket import setup_websocket_routes
-from .config import SECRET_KEY, ALGORITHM
+from .routes.metrics import setup_metrics_routes
+from .routes.snapshot import setup_snapshot_routes
+from .db import get_connection, close_connections
+from .config import CLUSTER_SOCKET
 
 # Initialize services
 storage = GameStorage()
@@ -20,46 +24,66 @@ manager = ConnectionManager()
 # Set up dependency injection
 storage.set_connection_manager(manager)
 
+# Several workers: one owns the simulation, the rest follow it over the bus
+cluster = Cluster(storage, manager, LocalSocketBus(CLUSTER_SOCKET)) if CLUSTER_SOCKET else None
+
 # Inject storage into GraphQL resolvers
 import app.graphql.queries as queries_module
 import app.graphql.mutations as mutations_module
+import app.graphql.loaders as loaders_module
+import app.graphql.subscriptions as subscriptions_module
 queries_module.storage = storage
 mutations_module.storage = storage
+loaders_module.storage = storage
+subscriptions_module.storage = storage
 
 # Custom context getter for authentication
-async def get_context(request: Request):
-    context = {"request": request}
+async def get_context(request: HTTPConnection):
+    # HTTPConnection covers both HTTP requests and subscription websockets
+    context = {"request": request, **loaders_module.create_loaders()}
     
     # Extract JWT token from Authorization header
     auth_header = request.headers.get("authorization")
     if auth_header and auth_header.startswith("Bearer "):
         token = auth_header.split(" ")[1]
-        try:
-            payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-            user_id = payload.get("sub")
-            if user_id:
-                context["user_id"] = user_id
-                # Add user_id to request for easier access
-                request.user_id = user_id
-        except JWTError:
-            pass  # Invalid token, continue without authentication
+        # Verified tokens are cached until they expire; invalid ones give None
+        user_id = decode_token(token)
+        if user_id:
+            context["user_id"] = user_id
+            # Add user_id to request for easier access
+            request.user_id = user_id
     
     return context
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    # Startup
-    await storage.start_background_tasks()
+    # Startup: open the event loop thread's long-lived SQLite connection
+    get_connection()
+    if cluster:
+        await cluster.start()
+    else:
+        await storage.start_background_tasks()
     yield
-    # Shutdown (cleanup if needed)
-    try:
-        storage.flush_save()
-    except Exception:
-        # Ensure a final save even if flush didn't find pending changes
+    # Shutdown: write the complete world, including positions that movement
+    # ticks change without marking pets dirty (followers hold only a replica)
+    if not storage.follower:
         try:
-            storage.save_data()
+            storage.save_data(full=True)
         except Exception:
-            pass
+            try:
+                storage.flush_save()
+            except Exception:
+                pass
+        storage.flush_mouse_positions()
+    if storage.shards:
+        storage.shards.close()
+    # Wait for queued disk writes before the process exits
+    storage.writer.close()
+    if cluster:
+        # Only now may a follower take over and reload the saved world
+        await cluster.close()
+    storage.hasher.close()
+    close_connections()
 
 # FastAPI app with lifespan
 app = FastAPI(title="Multiplayer Tamagotchi Game API", lifespan=lifespan)
@@ -74,7 +98,7 @@ app.add_middleware(
 )
 
 # GraphQL endpoint with custom context
-graphql_app = GraphQLRouter(
+graphql_app = PersistedQueryRouter(
     schema,
     context_getter=get_context,
     subscription_protocols=[GRAPHQL_TRANSPORT_WS_PROTOCOL, GRAPHQL_WS_PROTOCOL]
@@ -84,6 +108,12 @@ app.include_router(graphql_app, prefix="/graphql")
 # Setup WebSocket routes
 setup_websocket_routes(app, storage, manager)
 
+# Operational metrics (registered before the SPA catch-all)
+setup_metrics_routes(app, storage, manager, token_cache, document_cache, persisted_queries)
+
+# ETag-validated world snapshot for dashboards and reconnecting clients
+setup_snapshot_routes(app, storage)
+
 import os
 dist_root = os.path.join("frontend", "dist")
 assets_dir = os.path.join(dist_root, "assets")
@@ -1,22 +1,36 @@
-from .user import User
+from .user import User, MousePosition
 from .tamagotchi import Tamagotchi, Position
+from .record import PetRecord
+from .events import PetPosition, TamagotchiEvent
+from .connection import PageInfo, TamagotchiEdge, TamagotchiConnection, encode_cursor, decode_cursor
 from .inputs import (
     CreateUserInput,
     LoginInput,
     CreateTamagotchiInput,
     ActionInput,
+    TamagotchiLocationInput,
     MousePositionInput,
     AuthPayload
 )
 
 __all__ = [
     "User",
+    "MousePosition",
+    "PetPosition",
+    "TamagotchiEvent",
     "Tamagotchi",
     "Position",
+    "PetRecord",
+    "PageInfo",
+    "TamagotchiEdge",
+    "TamagotchiConnection",
+    "encode_cursor",
+    "decode_cursor",
     "CreateUserInput",
     "LoginInput",
     "CreateTamagotchiInput",
     "ActionInput",
+    "TamagotchiLocationInput",
     "MousePositionInput",
     "AuthPayload"
 ]
\ No newline at end of file
@@ -0,0 +1,47 @@
+import base64
+import strawberry
+from typing import List, Optional, Tuple
+
+from .tamagotchi import Tamagotchi
+
+_CURSOR_PREFIX = "pet:"
+
+
+def encode_cursor(key: Tuple[int, str]) -> str:
+    """Opaque cursor for a pet's page-order key ``(created_at microseconds, id)``."""
+    created_us, pet_id = key
+    return base64.urlsafe_b64encode(f"{_CURSOR_PREFIX}{created_us}:{pet_id}".encode()).decode()
+
+
+def decode_cursor(cursor: Optional[str]) -> Optional[Tuple[int, str]]:
+    """Page-order key behind an opaque cursor (None = from the start)."""
+    if not cursor:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode()).decode()
+        if raw.startswith(_CURSOR_PREFIX):
+            created_us, sep, pet_id = raw[len(_CURSOR_PREFIX):].partition(":")
+            if sep and pet_id:
+                return int(created_us), pet_id
+    except (ValueError, UnicodeDecodeError):
+        pass
+    raise ValueError("Invalid cursor")
+
+
+@strawberry.type
+class PageInfo:
+    has_next_page: bool
+    has_previous_page: bool
+    start_cursor: Optional[str] = None
+    end_cursor: Optional[str] = None
+
+@strawberry.type
+class TamagotchiEdge:
+    cursor: str
+    node: Tamagotchi
+
+@strawberry.type
+class TamagotchiConnection:
+    edges: List[TamagotchiEdge]
+    page_info: PageInfo
+    total_count: int
@@ -0,0 +1,19 @@
+import strawberry
+from typing import List, Optional
+
+from .tamagotchi import Tamagotchi
+
+@strawberry.type
+class PetPosition:
+    id: str
+    x: float
+    y: float
+    direction: float
+
+@strawberry.type
+class TamagotchiEvent:
+    # 'stats_update' | 'tamagotchi_created' | 'tamagotchi_removed' | 'position_update'
+    type: str
+    id: Optional[str] = None
+    tamagotchi: Optional[Tamagotchi] = None
+    positions: Optional[List[PetPosition]] = None
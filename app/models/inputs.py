@@ -19,6 +19,12 @@ class CreateTamagotchiInput:
 class ActionInput:
     tamagotchi_id: str
 
+@strawberry.input
+class TamagotchiLocationInput:
+    id: str
+    x: float
+    y: float
+
 @strawberry.input
 class MousePositionInput:
     x: float
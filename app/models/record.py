@@ -0,0 +1,117 @@
+import time
+from datetime import datetime
+from functools import lru_cache
+from typing import Optional
+
+# Timestamp fields, held as epoch seconds in memory and ISO strings on the
+# wire, in JSON snapshots / the journal and in SQLite
+TIMESTAMP_FIELDS = ('last_fed', 'last_played', 'last_slept', 'created_at')
+
+
+def to_epoch(value) -> float:
+    """Epoch seconds from an ISO string (naive local time, as written by the game) or a number."""
+    if isinstance(value, (int, float)):
+        return float(value)
+    try:
+        return datetime.fromisoformat(value).timestamp()
+    except (TypeError, ValueError):
+        return time.time()
+
+
+@lru_cache(maxsize=4096)  # a decay tick stamps every pet it touches with the same time
+def to_iso(epoch: float) -> str:
+    return datetime.fromtimestamp(epoch).isoformat()
+
+
+class PetRecord:
+    """In-memory pet: one slotted object per pet, canonical in GameStorage.
+
+    Compared with the nested dicts it replaces there is no per-pet dict or
+    position dict, and timestamps are floats, so decay math needs no ISO
+    parsing. ``to_dict``/``from_dict`` convert to and from the dict format
+    used on the wire, in JSON snapshots and in the journal; the Strawberry
+    ``Tamagotchi`` is built only when a resolver returns a pet.
+    """
+
+    __slots__ = (
+        'id', 'name', 'owner_id', 'happiness', 'hunger', 'energy', 'health', 'age',
+        'last_fed', 'last_played', 'last_slept', 'created_at', 'is_alive', 'status',
+        'x', 'y', 'direction', 'speed', 'emoji',
+    )
+
+    def __init__(self, id: str, name: str, owner_id: str, happiness: int = 100, hunger: int = 0,
+                 energy: int = 100, health: int = 100, age: int = 0, last_fed: float = 0.0,
+                 last_played: float = 0.0, last_slept: float = 0.0, created_at: float = 0.0,
+                 is_alive: bool = True, status: str = 'Happy', x: float = 0.0, y: float = 0.0,
+                 direction: float = 0.0, speed: float = 1.0, emoji: Optional[str] = None):
+        self.id = id
+        self.name = name
+        self.owner_id = owner_id
+        self.happiness = happiness
+        self.hunger = hunger
+        self.energy = energy
+        self.health = health
+        self.age = age
+        self.last_fed = last_fed
+        self.last_played = last_played
+        self.last_slept = last_slept
+        self.created_at = created_at
+        self.is_alive = is_alive
+        self.status = status
+        self.x = x
+        self.y = y
+        self.direction = direction
+        self.speed = speed
+        self.emoji = emoji
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'PetRecord':
+        pos = data.get('position') or {}
+        return cls(
+            id=data['id'],
+            name=data.get('name', ''),
+            owner_id=data.get('owner_id', ''),
+            happiness=data.get('happiness', 0),
+            hunger=data.get('hunger', 0),
+            energy=data.get('energy', 0),
+            health=data.get('health', 0),
+            age=data.get('age', 0) or 0,
+            last_fed=to_epoch(data.get('last_fed')),
+            last_played=to_epoch(data.get('last_played')),
+            last_slept=to_epoch(data.get('last_slept')),
+            created_at=to_epoch(data.get('created_at')),
+            is_alive=bool(data.get('is_alive', True)),
+            status=data.get('status', 'Happy'),
+            x=float(pos.get('x', 0.0)),
+            y=float(pos.get('y', 0.0)),
+            direction=float(pos.get('direction', 0.0)),
+            speed=float(pos.get('speed', 1.0)),
+            emoji=data.get('emoji'),
+        )
+
+    def to_dict(self) -> dict:
+        return {
+            'id': self.id,
+            'name': self.name,
+            'owner_id': self.owner_id,
+            'happiness': self.happiness,
+            'hunger': self.hunger,
+            'energy': self.energy,
+            'health': self.health,
+            'age': self.age,
+            'last_fed': to_iso(self.last_fed),
+            'last_played': to_iso(self.last_played),
+            'last_slept': to_iso(self.last_slept),
+            'created_at': to_iso(self.created_at),
+            'is_alive': self.is_alive,
+            'status': self.status,
+            'position': self.position(),
+            'emoji': self.emoji,
+        }
+
+    def position(self) -> dict:
+        return {'x': self.x, 'y': self.y, 'direction': self.direction, 'speed': self.speed}
+
+    def age_seconds(self, now: Optional[float] = None) -> int:
+        """Age derived from created_at, so pets no tick has touched stay current."""
+        return int((time.time() if now is None else now) - self.created_at)
@@ -1,4 +1,8 @@
 import strawberry
+from typing import Optional
+
+from .user import User
+from .record import PetRecord, to_iso
 
 @strawberry.type
 class Position:
@@ -24,4 +28,31 @@ class Tamagotchi:
     is_alive: bool
     status: str
     position: Position
-    emoji: str
\ No newline at end of file
+    emoji: str
+
+    @classmethod
+    def from_record(cls, record: PetRecord) -> 'Tamagotchi':
+        """GraphQL view of a stored pet (positions must already be synced)."""
+        return cls(
+            id=record.id,
+            name=record.name,
+            owner_id=record.owner_id,
+            happiness=record.happiness,
+            hunger=record.hunger,
+            energy=record.energy,
+            health=record.health,
+            age=record.age_seconds(),
+            last_fed=to_iso(record.last_fed),
+            last_played=to_iso(record.last_played),
+            last_slept=to_iso(record.last_slept),
+            created_at=to_iso(record.created_at),
+            is_alive=record.is_alive,
+            status=record.status,
+            position=Position(x=record.x, y=record.y, direction=record.direction, speed=record.speed),
+            emoji=record.emoji,
+        )
+
+    @strawberry.field
+    async def owner(self, info) -> Optional[User]:
+        """Owning user, batched with every other owner in the request."""
+        return await info.context["user_loader"].load(self.owner_id)
\ No newline at end of file
@@ -1,3 +1,5 @@
 from .websocket import setup_websocket_routes
+from .metrics import setup_metrics_routes
+from .snapshot import setup_snapshot_routes
 
-__all__ = ["setup_websocket_routes"]
\ No newline at end of file
+__all__ = ["setup_websocket_routes", "setup_metrics_routes", "setup_snapshot_routes"]
@@ -0,0 +1,27 @@
+from fastapi import FastAPI
+
+from ..services.storage import GameStorage
+from ..services.websocket import ConnectionManager
+from ..services.auth import TokenCache
+from ..graphql.document_cache import DocumentCache
+from ..graphql.persisted import PersistedQueries
+
+def setup_metrics_routes(app: FastAPI, storage: GameStorage, manager: ConnectionManager, token_cache: TokenCache,
+                         document_cache: DocumentCache, persisted_queries: PersistedQueries):
+    @app.get("/metrics")
+    async def metrics():
+        """Operational counters for the realtime layer."""
+        return {
+            "connections": manager.connection_stats(),
+            "evicted_connections": manager.evicted_count,
+            "persistence": storage.writer.stats(),
+            "password_hashing": storage.hasher.stats(),
+            "token_cache": token_cache.stats(),
+            "subscriptions": storage.broker.stats(),
+            "graphql_documents": document_cache.stats(),
+            "persisted_queries": persisted_queries.stats(),
+            "world_snapshots": storage.snapshots.stats(),
+            "game_clock": storage.clock.stats(),
+            "simulation": storage.shards.stats() if storage.shards else None,
+            "cluster": storage.cluster.stats() if storage.cluster else None,
+        }
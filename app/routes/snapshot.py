@@ -0,0 +1,25 @@
+from fastapi import FastAPI, Request
+from fastapi.responses import Response
+
+from ..services.storage import GameStorage
+
+def setup_snapshot_routes(app: FastAPI, storage: GameStorage):
+    @app.get("/snapshot")
+    async def snapshot(request: Request):
+        """World without positions and cursors; revalidate with If-None-Match to get a 304 while it is unchanged."""
+        headers = {"ETag": storage.snapshots.etag, "Cache-Control": "no-cache"}
+        if storage.snapshots.etag_matches(request.headers.get("if-none-match")):
+            return Response(status_code=304, headers=headers)
+        etag, body = storage.world_snapshot()
+        headers["ETag"] = etag
+        return Response(content=body, media_type="application/json", headers=headers)
+
+    @app.get("/snapshot/live")
+    async def live_snapshot(request: Request):
+        """Pet positions and user cursors, under their own ETag (changes every movement tick)."""
+        headers = {"ETag": storage.live_etag, "Cache-Control": "no-cache"}
+        if storage.snapshots.etag_matches(request.headers.get("if-none-match"), storage.live_etag):
+            return Response(status_code=304, headers=headers)
+        etag, body = storage.live_snapshot()
+        headers["ETag"] = etag
+        return Response(content=body, media_type="application/json", headers=headers)
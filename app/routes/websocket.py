@@ -3,6 +3,7 @@ from fastapi import FastAPI, WebSocket, WebSocketDisconnect
 
 from ..services.storage import GameStorage
 from ..services.websocket import ConnectionManager
+from ..services.spatial import parse_viewport
 
 def setup_websocket_routes(app: FastAPI, storage: GameStorage, manager: ConnectionManager):
     @app.websocket("/ws/{user_id}")
@@ -11,7 +12,7 @@ def setup_websocket_routes(app: FastAPI, storage: GameStorage, manager: Connecti
         
         # Set user as online
         if user_id in storage.users:
-            storage.set_user_online(user_id, True)
+            await storage.submit('set_user_online', user_id, True)
         
         try:
             while True:
@@ -19,17 +20,23 @@ def setup_websocket_routes(app: FastAPI, storage: GameStorage, manager: Connecti
                 message = json.loads(data)
                 
                 if message['type'] == 'mouse_position':
-                    storage.update_mouse_position(
-                        user_id, 
-                        message['x'], 
-                        message['y']
-                    )
+                    await storage.submit('update_mouse_position', user_id, message['x'], message['y'])
                 elif message['type'] == 'flush_save':
                     # Immediate persistence on client close
-                    storage.flush_save()
+                    await storage.submit('flush_save')
+                elif message['type'] == 'hello':
+                    # Opt in to packed binary position frames
+                    if message.get('binary_positions'):
+                        manager.enable_binary_positions(connection_id)
+                elif message['type'] == 'viewport':
+                    # Only stream positions for pets in (or near) this rectangle
+                    manager.set_viewport(connection_id, parse_viewport(message))
+                elif message['type'] == 'resync':
+                    # Client saw a gap in stats_update versions; send this socket full stats
+                    await manager.send_to_connection(connection_id, await storage.submit('stats_keyframe'))
         except WebSocketDisconnect:
             manager.disconnect(connection_id, user_id)
             
             # Set user as offline
             if user_id in storage.users:
-                storage.set_user_online(user_id, False)
\ No newline at end of file
+                await storage.submit('set_user_online', user_id, False)
\ No newline at end of file
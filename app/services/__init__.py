@@ -1,5 +1,5 @@
-from .auth import create_access_token, verify_token
+from .auth import create_access_token, decode_token, verify_token
 from .storage import GameStorage
 from .websocket import ConnectionManager
 
-__all__ = ["create_access_token", "verify_token", "GameStorage", "ConnectionManager"]
\ No newline at end of file
+__all__ = ["create_access_token", "decode_token", "verify_token", "GameStorage", "ConnectionManager"]
\ No newline at end of file
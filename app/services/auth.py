@@ -1,10 +1,79 @@
+import time
+from collections import OrderedDict
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Optional, Tuple
 from fastapi import Depends, HTTPException
 from fastapi.security import HTTPAuthorizationCredentials
 from jose import JWTError, jwt
 
-from ..config import SECRET_KEY, ALGORITHM, security
+from ..config import SECRET_KEY, ALGORITHM, TOKEN_CACHE_SIZE, security
+
+
+class TokenCache:
+    """Bounded LRU of verified tokens -> (user_id, exp).
+
+    Signature checks run once per token; later requests with the same token
+    are a dict lookup until the token's ``exp`` passes. Only successfully
+    verified tokens are stored.
+    """
+
+    def __init__(self, max_size: int = TOKEN_CACHE_SIZE):
+        self.max_size = max_size
+        self._entries: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, token: str) -> Optional[str]:
+        entry = self._entries.get(token)
+        if entry is None:
+            self.misses += 1
+            return None
+        user_id, exp = entry
+        if exp <= time.time():
+            del self._entries[token]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(token)
+        self.hits += 1
+        return user_id
+
+    def put(self, token: str, user_id: str, exp: float):
+        self._entries[token] = (user_id, exp)
+        self._entries.move_to_end(token)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        return {
+            'size': len(self._entries),
+            'max_size': self.max_size,
+            'hits': self.hits,
+            'misses': self.misses,
+        }
+
+
+token_cache = TokenCache()
+
+
+def decode_token(token: str) -> Optional[str]:
+    """Return the token's user id (``sub``), or None if it is invalid or expired."""
+    user_id = token_cache.get(token)
+    if user_id is not None:
+        return user_id
+    try:
+        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+    except JWTError:
+        return None
+    user_id = payload.get("sub")
+    exp = payload.get("exp")
+    if user_id is None:
+        return None
+    if isinstance(exp, (int, float)):
+        token_cache.put(token, user_id, exp)
+    return user_id
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode = data.copy()
@@ -17,11 +86,7 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     return encoded_jwt
 
 def verify_token(credentials: HTTPAuthorizationCredentials = Depends(security)):
-    try:
-        payload = jwt.decode(credentials.credentials, SECRET_KEY, algorithms=[ALGORITHM])
-        user_id: str = payload.get("sub")
-        if user_id is None:
-            raise HTTPException(status_code=401, detail="Invalid token")
-        return user_id
-    except JWTError:
-        raise HTTPException(status_code=401, detail="Invalid token")
\ No newline at end of file
+    user_id = decode_token(credentials.credentials)
+    if user_id is None:
+        raise HTTPException(status_code=401, detail="Invalid token")
+    return user_id
\ No newline at end of file
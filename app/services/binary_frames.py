@@ -0,0 +1,115 @@
+import struct
+import sys
+from array import array
+from typing import Dict, Iterable, List, Optional
+
+from .positions import PositionColumns
+
+# Subprotocol a client may request on /ws/{user_id} to receive binary positions.
+# Clients can also opt in after connecting with {"type": "hello", "binary_positions": true}.
+BINARY_SUBPROTOCOL = "tamagotchi.positions.v1"
+
+FRAME_POSITIONS = 1
+FRAME_VERSION = 1
+_HEADER = struct.Struct("<BBHI")  # frame type, version, reserved, count
+
+
+class PositionHandles:
+    """Process-wide pet id <-> small integer handle registry.
+
+    Handles of released pets go back to a free list and are reused, so the
+    table stays the size of the live world. Every assignment is appended to
+    a log: a session that has seen the log up to some ``seq`` learns the
+    newer ones from ``announce``, and a new session starts from ``snapshot``
+    (the live handles only).
+    """
+
+    def __init__(self):
+        self.handles: Dict[str, int] = {}
+        self.ids: List[Optional[str]] = []
+        self._free: List[int] = []
+        # Handles assigned since log position ``_base``
+        self._log: List[int] = []
+        self._base = 0
+
+    def __len__(self) -> int:
+        return len(self.handles)
+
+    @property
+    def seq(self) -> int:
+        """Log position after the newest assignment."""
+        return self._base + len(self._log)
+
+    def assign(self, pet_ids: Iterable[str]):
+        """Give every pet that has no handle one, reusing released handles first."""
+        handles = self.handles
+        for pet_id in pet_ids:
+            if pet_id in handles:
+                continue
+            if self._free:
+                h = self._free.pop()
+                self.ids[h] = pet_id
+            else:
+                h = len(self.ids)
+                self.ids.append(pet_id)
+            handles[pet_id] = h
+            self._log.append(h)
+
+    def release(self, pet_id: str):
+        h = self.handles.pop(pet_id, None)
+        if h is not None:
+            self.ids[h] = None
+            self._free.append(h)
+
+    def _message(self, handles: Iterable[int]) -> dict:
+        ids = self.ids
+        live = [h for h in handles if ids[h] is not None]
+        return {
+            'type': 'position_handles',
+            'handles': live,
+            'ids': [ids[h] for h in live],
+        }
+
+    def announce(self, since: int) -> Optional[dict]:
+        """``position_handles`` message for the assignments after log position ``since``."""
+        logged = self._log[since - self._base:]
+        if not logged:
+            return None
+        # A handle released and reassigned since is announced once, with its current pet
+        return self._message(dict.fromkeys(logged))
+
+    def snapshot(self) -> dict:
+        """``position_handles`` message mapping every live handle."""
+        return self._message(sorted(self.handles.values()))
+
+    def trim(self, seq: int):
+        """Forget log entries before ``seq`` (every session has seen them)."""
+        drop = seq - self._base
+        if drop > 0:
+            del self._log[:drop]
+            self._base = seq
+
+
+def encode_positions(handles: PositionHandles, positions: PositionColumns) -> bytes:
+    """Pack a position_update payload into a binary frame.
+
+    Layout (little-endian, 4-byte aligned so clients can view it with typed
+    arrays): uint8 frame type, uint8 version, uint16 reserved, uint32 count,
+    then uint32 handles[count], float32 x[count], float32 y[count],
+    float32 direction[count].
+    """
+    get = handles.handles.get
+    found = [get(pet_id) for pet_id in positions.ids]
+    if None in found:
+        # Pets released after this payload was built (a merged, re-encoded frame)
+        positions = positions.take(i for i, h in enumerate(found) if h is not None)
+        found = [h for h in found if h is not None]
+    hs = array('I', found)
+    xs = array('f', positions.x)
+    ys = array('f', positions.y)
+    ds = array('f', positions.direction)
+    if sys.byteorder != 'little':
+        for a in (hs, xs, ys, ds):
+            a.byteswap()
+    header = _HEADER.pack(FRAME_POSITIONS, FRAME_VERSION, 0, len(positions))
+    return b''.join((header, hs.tobytes(), xs.tobytes(), ys.tobytes(), ds.tobytes()))
@@ -0,0 +1,119 @@
+import asyncio
+from collections import deque
+from typing import Deque, Dict, Hashable, Iterable, Optional, Set, Tuple
+
+from ..config import SUBSCRIPTION_QUEUE_SIZE
+
+# Topics GameStorage publishes to
+TOPIC_STATS = 'stats'
+TOPIC_POSITIONS = 'positions'
+TOPIC_CREATED = 'created'
+TOPIC_REMOVED = 'removed'
+TOPIC_CURSORS = 'cursors'
+
+Route = Tuple[str, Optional[Hashable]]
+
+
+class Subscriber:
+    """Bounded event queue for one subscription.
+
+    Publishing never waits: when the queue is full the oldest event is
+    dropped (and counted), so one slow subscriber cannot hold up the game
+    loops or other subscribers.
+    """
+
+    def __init__(self, broker: 'Broker', routes: Tuple[Route, ...], max_size: int):
+        self.broker = broker
+        self.routes = routes
+        self.max_size = max_size
+        self._events: Deque[Tuple[str, object]] = deque()
+        self._ready = asyncio.Event()
+        self.dropped = 0
+        self.closed = False
+
+    def put(self, topic: str, event: object):
+        if len(self._events) >= self.max_size:
+            self._events.popleft()
+            self.dropped += 1
+        self._events.append((topic, event))
+        self._ready.set()
+
+    async def get(self) -> Tuple[str, object]:
+        """Next ``(topic, event)``, waiting if none is queued."""
+        while not self._events:
+            self._ready.clear()
+            await self._ready.wait()
+        return self._events.popleft()
+
+    def close(self):
+        if not self.closed:
+            self.closed = True
+            self.broker._unsubscribe(self)
+
+    def __enter__(self) -> 'Subscriber':
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class Broker:
+    """In-process topic broker for GraphQL subscriptions.
+
+    A subscriber listens on ``(topic, key)`` routes. ``key=None`` receives
+    every event on the topic; a key (a pet id, an owner id) receives only
+    events published with that key, so delivery is a dict lookup per key
+    rather than a filter over all subscribers.
+    """
+
+    def __init__(self, max_size: int = SUBSCRIPTION_QUEUE_SIZE):
+        self.max_size = max_size
+        self._routes: Dict[Route, Set[Subscriber]] = {}
+        self._topics: Dict[str, int] = {}
+        self.published = 0
+
+    def subscribe(self, routes: Iterable[Route], max_size: Optional[int] = None) -> Subscriber:
+        routes = tuple(routes)
+        sub = Subscriber(self, routes, max_size or self.max_size)
+        for route in routes:
+            self._routes.setdefault(route, set()).add(sub)
+            self._topics[route[0]] = self._topics.get(route[0], 0) + 1
+        return sub
+
+    def _unsubscribe(self, sub: Subscriber):
+        for route in sub.routes:
+            subs = self._routes.get(route)
+            if subs is not None:
+                subs.discard(sub)
+                if not subs:
+                    del self._routes[route]
+            remaining = self._topics.get(route[0], 0) - 1
+            if remaining > 0:
+                self._topics[route[0]] = remaining
+            else:
+                self._topics.pop(route[0], None)
+
+    def has_subscribers(self, topic: str) -> bool:
+        """Cheap check so publishers can skip building events nobody receives."""
+        return topic in self._topics
+
+    def publish(self, topic: str, event: object, keys: Iterable[Hashable] = ()):
+        if topic not in self._topics:
+            return
+        self.published += 1
+        routes = self._routes
+        delivered = set()
+        for key in (None, *keys):
+            for sub in routes.get((topic, key), ()):
+                if sub not in delivered:
+                    delivered.add(sub)
+                    sub.put(topic, event)
+
+    def stats(self) -> dict:
+        subs = {sub for subs in self._routes.values() for sub in subs}
+        return {
+            'subscribers': len(subs),
+            'published': self.published,
+            'queued': sum(len(sub._events) for sub in subs),
+            'dropped': sum(sub.dropped for sub in subs),
+        }
@@ -0,0 +1,122 @@
+import asyncio
+import logging
+import time
+from typing import Awaitable, Callable, List
+
+from ..config import CLOCK_ERROR_LOG_INTERVAL_SEC, CLOCK_MAX_CATCH_UP_TICKS
+
+logger = logging.getLogger(__name__)
+
+
+class Phase:
+    """One fixed-timestep phase of the game clock, with its timing counters."""
+
+    def __init__(self, name: str, interval: float, tick: Callable[[], Awaitable[None]]):
+        self.name = name
+        self.interval = interval
+        self.tick = tick
+        self.next_at = 0.0
+        self.ticks = 0
+        self.skipped = 0
+        self.overruns = 0
+        self.errors = 0
+        self.errors_logged = 0
+        self.last_error_log = float('-inf')
+        self.last_ms = 0.0
+        self.max_ms = 0.0
+        self.total_ms = 0.0
+        self.last_late_ms = 0.0
+        self.max_late_ms = 0.0
+        self.total_late_ms = 0.0
+
+    def record(self, late: float, duration: float):
+        self.ticks += 1
+        self.last_ms = duration * 1000
+        self.max_ms = max(self.max_ms, self.last_ms)
+        self.total_ms += self.last_ms
+        self.last_late_ms = late * 1000
+        self.max_late_ms = max(self.max_late_ms, self.last_late_ms)
+        self.total_late_ms += self.last_late_ms
+        if duration > self.interval:
+            self.overruns += 1
+
+    def record_error(self):
+        """Count a failed tick; log its traceback at most every CLOCK_ERROR_LOG_INTERVAL_SEC."""
+        self.errors += 1
+        now = time.monotonic()
+        if now - self.last_error_log < CLOCK_ERROR_LOG_INTERVAL_SEC:
+            return
+        suppressed = self.errors - self.errors_logged - 1
+        self.errors_logged = self.errors
+        self.last_error_log = now
+        logger.exception("Game clock phase %r tick failed (%d similar errors not logged)", self.name, suppressed)
+
+    def stats(self) -> dict:
+        ticks = self.ticks or 1
+        return {
+            'interval_ms': round(self.interval * 1000, 3),
+            'ticks': self.ticks,
+            'skipped': self.skipped,
+            'overruns': self.overruns,
+            'errors': self.errors,
+            'last_ms': round(self.last_ms, 3),
+            'avg_ms': round(self.total_ms / ticks, 3),
+            'max_ms': round(self.max_ms, 3),
+            'last_late_ms': round(self.last_late_ms, 3),
+            'avg_late_ms': round(self.total_late_ms / ticks, 3),
+            'max_late_ms': round(self.max_late_ms, 3),
+        }
+
+
+class GameClock:
+    """Fixed-timestep scheduler for the game loops on the monotonic clock.
+
+    Each phase ticks on its own grid of deadlines (``start + k * interval``)
+    instead of sleeping a fixed time after its work, so the period does not
+    stretch by the work time and phases do not drift apart. A phase that
+    falls behind runs its missed ticks back to back, up to
+    ``max_catch_up``; beyond that the backlog is skipped (and counted) so a
+    stall cannot snowball. Every tick records its duration and its lateness
+    against the deadline.
+    """
+
+    def __init__(self, max_catch_up: int = CLOCK_MAX_CATCH_UP_TICKS):
+        self.max_catch_up = max_catch_up
+        self.phases: List[Phase] = []
+
+    def add(self, name: str, interval: float, tick: Callable[[], Awaitable[None]]) -> Phase:
+        phase = Phase(name, interval, tick)
+        self.phases.append(phase)
+        return phase
+
+    async def run(self):
+        start = time.monotonic()
+        for phase in self.phases:
+            phase.next_at = start + phase.interval
+        while True:
+            # Earliest deadline first; ties go to the phase added first
+            phase = min(self.phases, key=lambda p: p.next_at)
+            now = time.monotonic()
+            if phase.next_at > now:
+                await asyncio.sleep(phase.next_at - now)
+                continue
+            behind = int((now - phase.next_at) // phase.interval)
+            if behind > self.max_catch_up:
+                skip = behind - self.max_catch_up
+                phase.skipped += skip
+                phase.next_at += skip * phase.interval
+            if behind:
+                # Catching up: let sockets and requests in between the extra ticks
+                await asyncio.sleep(0)
+            late = now - phase.next_at
+            started = time.perf_counter()
+            try:
+                await phase.tick()
+            except Exception:
+                # A failing tick must not stop the clock (or the other phase)
+                phase.record_error()
+            phase.record(late, time.perf_counter() - started)
+            phase.next_at += phase.interval
+
+    def stats(self) -> dict:
+        return {phase.name: phase.stats() for phase in self.phases}
@@ -0,0 +1,562 @@
+import abc
+import asyncio
+import builtins
+import fcntl
+import inspect
+import json
+import logging
+import os
+import struct
+from typing import AsyncIterator, Awaitable, Callable, Dict, Optional, Set
+
+from ..config import (
+    CLUSTER_REQUEST_TIMEOUT_SEC,
+    CLUSTER_PEER_BUFFER_BYTES,
+    CLUSTER_WORLD_CHUNK,
+    CLUSTER_RESYNC_RETRY_SEC,
+    POSITION_UPDATE_INTERVAL,
+)
+from ..models import User
+from .positions import PositionColumns
+
+logger = logging.getLogger(__name__)
+
+# GameStorage methods a follower forwards to the owner, and how each result
+# travels back: 'pet' / 'pets' as PetRecord dicts, 'user' as the cached user
+# dict, None as plain JSON
+FORWARDED = {
+    'create_tamagotchi': 'pet',
+    'update_tamagotchi_location': 'pet',
+    'update_tamagotchi_locations': 'pets',
+    'support_tamagotchi': 'pet',
+    'feed_tamagotchi': 'pet',
+    'play_tamagotchi': 'pet',
+    'sleep_tamagotchi': 'pet',
+    'revive_tamagotchi': 'pet',
+    'release_tamagotchi': None,
+    'set_user_difficulty': 'user',
+    'refresh_user': 'user',
+    'stats_keyframe': None,
+    'update_mouse_position': None,
+    'set_user_online': None,
+    'flush_save': None,
+}
+# Sent without waiting for a reply (cursor moves arrive many times a second)
+NOTIFY = ('update_mouse_position', 'set_user_online', 'flush_save')
+
+_LENGTH = struct.Struct('>I')
+
+Message = dict
+MessageHandler = Callable[[Message], Awaitable[None]]
+# Returns the result, or an async iterator of frames streamed to the caller
+# (in order with everything else it receives) before an empty reply
+CallHandler = Callable[[str, list], object]
+
+
+def _frame(message: Message) -> bytes:
+    body = json.dumps(message, separators=(',', ':')).encode()
+    return _LENGTH.pack(len(body)) + body
+
+
+def _error_reply(error: Exception) -> dict:
+    return {'error': str(error), 'error_type': type(error).__name__}
+
+
+def _rebuild_error(reply: dict) -> Exception:
+    """The owner's exception as the same built-in type (plain Exception otherwise)."""
+    error_type = getattr(builtins, reply.get('error_type') or '', None)
+    if not (isinstance(error_type, type) and issubclass(error_type, Exception)):
+        error_type = Exception
+    return error_type(reply['error'])
+
+
+async def _read_frame(reader: asyncio.StreamReader) -> Optional[Message]:
+    try:
+        header = await reader.readexactly(_LENGTH.size)
+        return json.loads(await reader.readexactly(_LENGTH.unpack(header)[0]))
+    except (asyncio.IncompleteReadError, ConnectionError):
+        return None
+
+
+class EventBus(abc.ABC):
+    """Transport between the process that owns the simulation and the other workers.
+
+    Exactly one process holds ownership at a time. The owner ``publish``es
+    frames to every follower and answers their ``call``s; followers receive
+    frames in publish order. Implementations only move frames: roles and
+    replication live in ``Cluster``.
+    """
+
+    @abc.abstractmethod
+    def try_own(self) -> bool:
+        """Claim ownership without waiting; True if this process now owns the simulation."""
+
+    @abc.abstractmethod
+    async def serve(self, handle_call: CallHandler):
+        """Start accepting followers (owner only)."""
+
+    @abc.abstractmethod
+    async def connect(self, on_message: MessageHandler, on_lost: Callable[[], None],
+                      on_desync: Callable[[], None]):
+        """Join the current owner (follower only); raises OSError if it is not reachable.
+
+        ``on_desync`` is called when a frame could not be applied, so the
+        replica has to be rebuilt.
+        """
+
+    @abc.abstractmethod
+    async def disconnect(self):
+        """Leave the owner (follower only) without reporting the connection as lost."""
+
+    @abc.abstractmethod
+    def has_peers(self) -> bool:
+        """Whether any follower is connected (owner only)."""
+
+    @abc.abstractmethod
+    def publish(self, message: Message):
+        """Send a frame to every follower (owner only)."""
+
+    @abc.abstractmethod
+    async def call(self, method: str, args: list):
+        """Run ``method`` on the owner and return its result, re-raising its error."""
+
+    @abc.abstractmethod
+    def notify(self, method: str, args: list):
+        """Run ``method`` on the owner without waiting for it."""
+
+    @abc.abstractmethod
+    async def close(self):
+        """Leave the bus, giving up ownership if held."""
+
+    def stats(self) -> dict:
+        return {}
+
+
+class LocalSocketBus(EventBus):
+    """EventBus over a Unix domain socket, for workers on one host.
+
+    Ownership is an exclusive ``flock`` on ``<path>.lock``; the kernel drops
+    it when the owner exits, so a follower can take over. The owner listens
+    on ``path``. Frames are length-prefixed JSON. A follower whose socket
+    buffer grows past ``max_buffer`` is disconnected; it rejoins and
+    resyncs instead of holding owner memory.
+    """
+
+    def __init__(self, path: str, request_timeout: float = CLUSTER_REQUEST_TIMEOUT_SEC,
+                 max_buffer: int = CLUSTER_PEER_BUFFER_BYTES):
+        self.path = path
+        self.request_timeout = request_timeout
+        self.max_buffer = max_buffer
+        self._lock_file = None
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._peers: Set[asyncio.StreamWriter] = set()
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._reader_task: Optional[asyncio.Task] = None
+        self._pending: Dict[int, asyncio.Future] = {}
+        self._next_call = 0
+        self.published = 0
+        self.calls_served = 0
+        self.calls_sent = 0
+        self.dropped_peers = 0
+
+    def try_own(self) -> bool:
+        lock_file = open(self.path + '.lock', 'a+')
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            return False
+        self._lock_file = lock_file
+        return True
+
+    async def serve(self, handle_call: CallHandler):
+        self._handle_call = handle_call
+        # A socket file left by an owner that died; we hold the lock, so nobody listens on it
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+        self._server = await asyncio.start_unix_server(self._serve_peer, path=self.path)
+
+    async def _serve_peer(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self._peers.add(writer)
+        try:
+            while True:
+                message = await _read_frame(reader)
+                if message is None:
+                    break
+                self.calls_served += 1
+                try:
+                    result = self._handle_call(message['method'], message.get('args') or [])
+                    if inspect.isasyncgen(result):
+                        await self._stream(writer, result)
+                        result = None
+                    reply = {'result': result}
+                except Exception as e:
+                    reply = _error_reply(e)
+                call_id = message.get('id')
+                if call_id is not None:
+                    reply['kind'] = 'reply'
+                    reply['id'] = call_id
+                    self._send(writer, _frame(reply))
+        finally:
+            self._drop(writer)
+
+    async def _stream(self, writer: asyncio.StreamWriter, frames: AsyncIterator[Message]):
+        """Send a streamed call result frame by frame, paced by the socket."""
+        async for message in frames:
+            if writer.is_closing():
+                raise ConnectionError("follower went away")
+            writer.write(_frame(message))
+            await writer.drain()
+
+    def _send(self, writer: asyncio.StreamWriter, frame: bytes):
+        if writer.is_closing():
+            return
+        if writer.transport.get_write_buffer_size() > self.max_buffer:
+            self.dropped_peers += 1
+            self._drop(writer)
+            return
+        writer.write(frame)
+
+    def _drop(self, writer: asyncio.StreamWriter):
+        self._peers.discard(writer)
+        writer.close()
+
+    def has_peers(self) -> bool:
+        return bool(self._peers)
+
+    def publish(self, message: Message):
+        if not self._peers:
+            return
+        self.published += 1
+        frame = _frame(message)
+        for writer in list(self._peers):
+            self._send(writer, frame)
+
+    async def connect(self, on_message: MessageHandler, on_lost: Callable[[], None],
+                      on_desync: Callable[[], None]):
+        reader, self._writer = await asyncio.open_unix_connection(self.path)
+        self._reader_task = asyncio.create_task(self._read_loop(reader, on_message, on_lost, on_desync))
+
+    async def _read_loop(self, reader: asyncio.StreamReader, on_message: MessageHandler,
+                         on_lost: Callable[[], None], on_desync: Callable[[], None]):
+        try:
+            while True:
+                message = await _read_frame(reader)
+                if message is None:
+                    break
+                if message.get('kind') == 'reply':
+                    future = self._pending.pop(message['id'], None)
+                    if future is not None and not future.done():
+                        future.set_result(message)
+                else:
+                    try:
+                        await on_message(message)
+                    except Exception:
+                        # One bad frame must not stop the relay, but the
+                        # replica may now be missing it: rebuild it
+                        logger.exception("Could not apply %r frame from the simulation owner; resyncing",
+                                         message.get('kind'))
+                        on_desync()
+        except asyncio.CancelledError:
+            return
+        self._fail_pending()
+        self._writer = None
+        on_lost()
+
+    def _fail_pending(self):
+        pending, self._pending = self._pending, {}
+        for future in pending.values():
+            if not future.done():
+                future.set_exception(ConnectionError("simulation owner unavailable"))
+
+    async def call(self, method: str, args: list):
+        if self._writer is None:
+            raise ConnectionError("simulation owner unavailable")
+        self._next_call += 1
+        call_id = self._next_call
+        future = asyncio.get_running_loop().create_future()
+        self._pending[call_id] = future
+        self.calls_sent += 1
+        self._writer.write(_frame({'id': call_id, 'method': method, 'args': args}))
+        try:
+            reply = await asyncio.wait_for(future, self.request_timeout)
+        finally:
+            self._pending.pop(call_id, None)
+        if 'error' in reply:
+            raise _rebuild_error(reply)
+        return reply['result']
+
+    def notify(self, method: str, args: list):
+        if self._writer is None:
+            raise ConnectionError("simulation owner unavailable")
+        self.calls_sent += 1
+        self._writer.write(_frame({'method': method, 'args': args}))
+
+    async def disconnect(self):
+        if self._reader_task is not None:
+            self._reader_task.cancel()
+            self._reader_task = None
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+        self._fail_pending()
+
+    async def close(self):
+        await self.disconnect()
+        if self._server is not None:
+            self._server.close()
+            for writer in list(self._peers):
+                self._drop(writer)
+            self._server = None
+            try:
+                os.unlink(self.path)
+            except OSError:
+                pass
+        if self._lock_file is not None:
+            # Closing the file drops the flock; a follower may take over now
+            self._lock_file.close()
+            self._lock_file = None
+
+    def stats(self) -> dict:
+        return {
+            'path': self.path,
+            'peers': len(self._peers),
+            'published': self.published,
+            'calls_served': self.calls_served,
+            'calls_sent': self.calls_sent,
+            'pending_calls': len(self._pending),
+            'dropped_peers': self.dropped_peers,
+        }
+
+
+class Cluster:
+    """Owner / follower roles for running the game under several workers.
+
+    Every worker builds its own GameStorage and ConnectionManager. On
+    ``start`` the first worker to claim the bus owns the simulation: it runs
+    the game loops and persistence, and each broadcast goes to its own
+    sockets and, via the bus, to every follower. Before a broadcast it also
+    publishes the full records of pets and users changed since the last
+    one, so a follower's replica is current when the event arrives.
+
+    Followers run no loops and write nothing to disk. They serve reads from
+    the replica, relay the owner's broadcasts to their own sockets and
+    GraphQL subscriptions, and forward mutations (``GameStorage.submit``)
+    to the owner. The replica is (re)built from the world the owner streams
+    in chunks on join, and again whenever a frame fails to apply. If the
+    owner goes away a follower claims the bus, reloads the world from disk
+    and takes over.
+
+    Stands in for the ConnectionManager on GameStorage, which is how
+    broadcasts reach the bus.
+    """
+
+    def __init__(self, storage, manager, bus: EventBus):
+        self.storage = storage
+        self.manager = manager
+        self.bus = bus
+        self.is_owner = False
+        self.forwarded = 0
+        self.relayed = 0
+        self.resyncs = 0
+        self.promotions = 0
+        self._replicate_task: Optional[asyncio.Task] = None
+        self._resync_task: Optional[asyncio.Task] = None
+        self._following = False
+        self._stale = False
+        self._closing = False
+        storage.cluster = self
+        storage.set_connection_manager(self)
+
+    async def start(self):
+        """Claim the simulation or join the worker that has it."""
+        while not self._closing:
+            if self.bus.try_own():
+                await self._lead()
+                return
+            try:
+                await self._follow()
+                return
+            except (OSError, asyncio.TimeoutError):
+                # The owner is still starting (or just went away); try again
+                await asyncio.sleep(0.1)
+
+    async def _lead(self):
+        if self.storage.follower:
+            # Promoted: the previous owner's last save is the world
+            self.storage.lead()
+            self.promotions += 1
+        self.is_owner = True
+        await self.bus.serve(self._handle_call)
+        await self.storage.start_background_tasks()
+        self._replicate_task = asyncio.create_task(self._replicate_loop())
+
+    async def _follow(self):
+        self.storage.follow()
+        self._stale = False
+        await self.bus.connect(self._on_message, self._on_lost, self._on_desync)
+        try:
+            # The world arrives as 'world' frames ahead of the reply
+            await self.bus.call('world_state', [])
+        except BaseException:
+            await self.bus.disconnect()
+            raise
+        self.resyncs += 1
+        self._following = True
+        if self._stale:
+            self._on_desync()
+
+    def _on_lost(self):
+        if self._following and not self._closing:
+            self._following = False
+            asyncio.create_task(self.start())
+
+    def _on_desync(self):
+        self._stale = True
+        if self._following and self._resync_task is None:
+            self._resync_task = asyncio.create_task(self._resync())
+
+    async def _resync(self):
+        """Rebuild the replica from the owner's world until no frame has failed since."""
+        try:
+            while self._stale and self._following and not self._closing:
+                self._stale = False
+                try:
+                    await self.bus.call('world_state', [])
+                    self.resyncs += 1
+                except Exception:
+                    # A lost owner is handled by _on_lost; anything else is retried
+                    logger.exception("Resync with the simulation owner failed")
+                    self._stale = True
+                    await asyncio.sleep(CLUSTER_RESYNC_RETRY_SEC)
+        finally:
+            self._resync_task = None
+
+    async def close(self):
+        self._closing = True
+        for task in (self._replicate_task, self._resync_task):
+            if task is not None:
+                task.cancel()
+        self._replicate_task = self._resync_task = None
+        await self.bus.close()
+
+    # Owner
+
+    def _handle_call(self, method: str, args: list):
+        if method == 'world_state':
+            return self._world_state()
+        if method not in FORWARDED:
+            raise ValueError(f"Unknown storage method: {method}")
+        result = getattr(self.storage, method)(*args)
+        kind = FORWARDED[method]
+        if result is None or kind is None:
+            return result
+        if kind == 'pet':
+            return result.to_dict()
+        if kind == 'pets':
+            return [pet.to_dict() for pet in result]
+        return self.storage.users.get(result.id)
+
+    async def _world_state(self) -> AsyncIterator[Message]:
+        """The world for a follower, as 'world' frames of CLUSTER_WORLD_CHUNK pets.
+
+        The loop keeps running between frames. Each pet is serialized when
+        its frame is sent and the frames travel in order with the events
+        published meanwhile, so applying everything in arrival order leaves
+        the follower current. The first frame resets the replica.
+        """
+        pet_ids = list(self.storage.tamagotchis)
+        yield {
+            'kind': 'world',
+            'reset': True,
+            'users': list(self.storage.users.values()),
+            'tamagotchis': self.storage.replica_pets(pet_ids[:CLUSTER_WORLD_CHUNK]),
+        }
+        for start in range(CLUSTER_WORLD_CHUNK, len(pet_ids), CLUSTER_WORLD_CHUNK):
+            # Let ticks, requests and sockets run between chunks
+            await asyncio.sleep(0)
+            yield {
+                'kind': 'world',
+                'tamagotchis': self.storage.replica_pets(pet_ids[start:start + CLUSTER_WORLD_CHUNK]),
+            }
+
+    def _replicate(self):
+        changes = self.storage.take_replica_changes(build=self.bus.has_peers())
+        if changes:
+            self.bus.publish({'kind': 'state', **changes})
+
+    async def _replicate_loop(self):
+        # Changes that no broadcast carries (difficulty, online flags, ...)
+        while True:
+            await asyncio.sleep(POSITION_UPDATE_INTERVAL)
+            self._replicate()
+
+    # Follower
+
+    async def forward(self, method: str, args: tuple):
+        """Run a storage mutation on the owner and decode its result into the replica."""
+        self.forwarded += 1
+        if method in NOTIFY:
+            self.bus.notify(method, list(args))
+            return None
+        result = await self.bus.call(method, list(args))
+        kind = FORWARDED[method]
+        if result is None or kind is None:
+            return result
+        if kind == 'pet':
+            return self.storage.apply_replica_changes({'tamagotchis': [result]})[0]
+        if kind == 'pets':
+            return self.storage.apply_replica_changes({'tamagotchis': result})
+        self.storage.apply_replica_changes({'users': [result]})
+        return User(**result)
+
+    async def _on_message(self, message: Message):
+        kind = message.get('kind')
+        if kind == 'state':
+            self.storage.apply_replica_changes(message)
+        elif kind == 'world':
+            if message.get('reset'):
+                self.storage.load_replica(message)
+            else:
+                self.storage.apply_replica_changes(message)
+        elif kind == 'event':
+            event = message['message']
+            self.relayed += 1
+            self.storage.apply_remote_event(event)
+            await self.manager.broadcast(event)
+        elif kind == 'positions':
+            positions = PositionColumns(*message['columns'])
+            self.relayed += 1
+            self.storage.apply_remote_positions(positions)
+            await self.manager.broadcast_positions(positions)
+
+    # ConnectionManager interface used by GameStorage
+
+    async def broadcast(self, message: dict):
+        if self.is_owner:
+            self._replicate()
+            self.bus.publish({'kind': 'event', 'message': message})
+        await self.manager.broadcast(message)
+
+    async def broadcast_positions(self, positions: PositionColumns):
+        if self.is_owner:
+            self._replicate()
+            self.bus.publish({'kind': 'positions', 'columns': positions.columns()})
+        await self.manager.broadcast_positions(positions)
+
+    def refresh_interest(self, grid):
+        self.manager.refresh_interest(grid)
+
+    async def send_to_user(self, user_id: str, message: dict):
+        await self.manager.send_to_user(user_id, message)
+
+    def stats(self) -> dict:
+        return {
+            'role': 'owner' if self.is_owner else 'follower',
+            'pid': os.getpid(),
+            'forwarded': self.forwarded,
+            'relayed': self.relayed,
+            'resyncs': self.resyncs,
+            'promotions': self.promotions,
+            'bus': self.bus.stats(),
+        }
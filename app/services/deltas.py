@@ -0,0 +1,68 @@
+from typing import Dict, Iterable, List
+
+from ..models import PetRecord
+
+# Stat fields carried by stats_update frames. Age is left out on purpose:
+# clients derive it from created_at.
+STAT_FIELDS = ('happiness', 'hunger', 'energy', 'health', 'status', 'is_alive')
+
+
+class StatDeltaTracker:
+    """Last-sent stat values per pet, for delta-encoded stats_update frames.
+
+    ``version`` counts broadcast frames. For every pet the tracker remembers
+    the values clients were last sent, so a frame only carries fields that
+    moved since the previous one. Keyframes carry every field and let
+    clients that missed a frame (a gap in ``version``) resynchronise.
+    """
+
+    def __init__(self, fields: Iterable[str] = STAT_FIELDS):
+        self.fields = tuple(fields)
+        self.version = 0
+        self._sent: Dict[str, Dict[str, object]] = {}
+
+    def record(self, pet: PetRecord):
+        """Note a pet's current values as seen by clients (e.g. after a direct broadcast)."""
+        self._sent[pet.id] = {f: getattr(pet, f) for f in self.fields}
+
+    def forget(self, pet_id: str):
+        self._sent.pop(pet_id, None)
+
+    def delta(self, pets: Iterable[PetRecord]) -> List[dict]:
+        """Advance the frame version and return only the fields that changed."""
+        version = self.version + 1
+        entries = []
+        for pet in pets:
+            pet_id = pet.id
+            sent = self._sent.setdefault(pet_id, {})
+            changed = {'id': pet_id}
+            for f in self.fields:
+                value = getattr(pet, f)
+                if f not in sent or sent[f] != value:
+                    sent[f] = value
+                    changed[f] = value
+            if len(changed) > 1:
+                entries.append(changed)
+        if entries:
+            self.version = version
+        return entries
+
+    def keyframe(self, pets: Iterable[PetRecord], record: bool = True) -> List[dict]:
+        """Full stat blocks for every given pet.
+
+        With ``record`` the values become the new baseline for deltas (a
+        broadcast keyframe); without it the tracker is untouched (a keyframe
+        sent to a single resyncing client).
+        """
+        entries = []
+        for pet in pets:
+            entry = {'id': pet.id}
+            entry.update((f, getattr(pet, f)) for f in self.fields)
+            entries.append(entry)
+        if record:
+            self.version += 1
+            for entry in entries:
+                sent = self._sent.setdefault(entry['id'], {})
+                for f in self.fields:
+                    sent[f] = entry[f]
+        return entries
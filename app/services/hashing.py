@@ -0,0 +1,103 @@
+import asyncio
+import signal
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional, Tuple
+
+from ..config import pwd_context, HASH_WORKERS, HASH_MAX_CONCURRENCY
+
+
+def _init_worker():
+    # Ctrl-C is handled by the parent, which shuts the pool down
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+
+def _hash(password: str) -> Tuple[str, float, float]:
+    started = time.monotonic()
+    return pwd_context.hash(password), started, time.monotonic()
+
+
+def _verify(password: str, password_hash: str) -> Tuple[bool, float, float]:
+    started = time.monotonic()
+    try:
+        ok = pwd_context.verify(password, password_hash)
+    except (ValueError, TypeError):
+        ok = False
+    return ok, started, time.monotonic()
+
+
+class PasswordHasher:
+    """Runs password hashing/verification in a small process pool.
+
+    pbkdf2 is deliberately slow and holds the GIL, so running it inline
+    stalls the game loops. At most ``max_concurrency`` jobs are submitted at
+    once; further callers wait their turn. Queue time (call until a worker
+    starts hashing) and hash time are tracked for /metrics.
+    """
+
+    def __init__(self, workers: int = HASH_WORKERS, max_concurrency: int = HASH_MAX_CONCURRENCY):
+        self.workers = workers
+        self.max_concurrency = max_concurrency
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self.in_flight = 0
+        self.waiting = 0
+        self.completed = 0
+        self.queue_ms_last = 0.0
+        self.queue_ms_max = 0.0
+        self.queue_ms_total = 0.0
+        self.hash_ms_total = 0.0
+
+    def _pool(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker)
+        return self._executor
+
+    async def _run(self, fn, *args):
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        submitted = time.monotonic()
+        self.waiting += 1
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self.waiting -= 1
+        self.in_flight += 1
+        try:
+            loop = asyncio.get_running_loop()
+            result, started, finished = await loop.run_in_executor(self._pool(), fn, *args)
+        finally:
+            self.in_flight -= 1
+            self._semaphore.release()
+        queue_ms = max(0.0, started - submitted) * 1000
+        self.completed += 1
+        self.queue_ms_last = queue_ms
+        self.queue_ms_max = max(self.queue_ms_max, queue_ms)
+        self.queue_ms_total += queue_ms
+        self.hash_ms_total += (finished - started) * 1000
+        return result
+
+    async def hash(self, password: str) -> str:
+        return await self._run(_hash, password)
+
+    async def verify(self, password: str, password_hash: str) -> bool:
+        return await self._run(_verify, password, password_hash)
+
+    def close(self):
+        executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+    def stats(self) -> dict:
+        done = self.completed
+        return {
+            'workers': self.workers,
+            'max_concurrency': self.max_concurrency,
+            'in_flight': self.in_flight,
+            'waiting': self.waiting,
+            'completed': done,
+            'queue_ms_last': round(self.queue_ms_last, 3),
+            'queue_ms_max': round(self.queue_ms_max, 3),
+            'queue_ms_avg': round(self.queue_ms_total / done, 3) if done else 0.0,
+            'hash_ms_avg': round(self.hash_ms_total / done, 3) if done else 0.0,
+        }
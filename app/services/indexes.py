@@ -0,0 +1,157 @@
+from bisect import bisect_right, insort
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from ..models import PetRecord
+
+# Page order: creation time in whole microseconds (what the ISO timestamp
+# persists), then id as the tie-break
+SortKey = Tuple[int, str]
+
+
+def sort_key(pet: PetRecord) -> SortKey:
+    """A pet's position in page order, stable across restarts and replicas."""
+    return int(round(pet.created_at * 1_000_000)), pet.id
+
+
+class PetIndex:
+    """Secondary indexes over pets: owner -> ids, alive / dead ids and status -> ids.
+
+    ``update`` re-files one pet after any change (a no-op when owner, alive
+    and status are unchanged), so lookups never scan the whole world. Every
+    bucket also keeps its pets as a list sorted by ``sort_key``, so a page
+    after a cursor is a bisect plus the rows it returns.
+    """
+
+    def __init__(self):
+        self.by_owner: Dict[str, Set[str]] = {}
+        self.by_status: Dict[str, Set[str]] = {}
+        self.alive: Set[str] = set()
+        self.dead: Set[str] = set()
+        self.order: Dict[str, SortKey] = {}
+        self._entries: Dict[str, Tuple[str, bool, str]] = {}
+        # ('owner', id) / ('status', status) / ('alive', bool) / ('all', None)
+        # -> sort keys of that bucket, in page order
+        self._sorted: Dict[tuple, List[SortKey]] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def clear(self):
+        self.by_owner = {}
+        self.by_status = {}
+        self.alive = set()
+        self.dead = set()
+        self.order = {}
+        self._entries = {}
+        self._sorted = {}
+
+    def update(self, pet: PetRecord):
+        pet_id = pet.id
+        entry = (pet.owner_id, bool(pet.is_alive), pet.status)
+        key = sort_key(pet)
+        old = self._entries.get(pet_id)
+        if old == entry and self.order.get(pet_id) == key:
+            return
+        if old is not None:
+            self._unfile(pet_id, old)
+        owner, alive, status = entry
+        self.by_owner.setdefault(owner, set()).add(pet_id)
+        self.by_status.setdefault(status, set()).add(pet_id)
+        (self.alive if alive else self.dead).add(pet_id)
+        self._entries[pet_id] = entry
+        self.order[pet_id] = key
+        for bucket in self._buckets(entry):
+            insort(self._sorted.setdefault(bucket, []), key)
+
+    def remove(self, pet_id: str):
+        old = self._entries.pop(pet_id, None)
+        if old is not None:
+            self._unfile(pet_id, old)
+            self.order.pop(pet_id, None)
+
+    @staticmethod
+    def _buckets(entry: Tuple[str, bool, str]) -> Tuple[tuple, ...]:
+        owner, alive, status = entry
+        return ('all', None), ('owner', owner), ('status', status), ('alive', alive)
+
+    def _unfile(self, pet_id: str, entry: Tuple[str, bool, str]):
+        owner, alive, status = entry
+        for index, key in ((self.by_owner, owner), (self.by_status, status)):
+            bucket = index.get(key)
+            if bucket is not None:
+                bucket.discard(pet_id)
+                if not bucket:
+                    del index[key]
+        (self.alive if alive else self.dead).discard(pet_id)
+        key = self.order[pet_id]
+        for bucket in self._buckets(entry):
+            keys = self._sorted.get(bucket)
+            if not keys:
+                continue
+            i = bisect_right(keys, key) - 1
+            if i >= 0 and keys[i] == key:
+                del keys[i]
+            if not keys:
+                del self._sorted[bucket]
+
+    def owned_by(self, owner_id: str) -> Set[str]:
+        return self.by_owner.get(owner_id, set())
+
+    def select(self, owner_id: Optional[str] = None, alive: Optional[bool] = None,
+               status: Optional[str] = None) -> Iterable[str]:
+        """Ids matching every given filter (None means "any")."""
+        sets = []
+        if owner_id is not None:
+            sets.append(self.owned_by(owner_id))
+        if status is not None:
+            sets.append(self.by_status.get(status, set()))
+        if alive is not None:
+            sets.append(self.alive if alive else self.dead)
+        if not sets:
+            return self._entries.keys()
+        sets.sort(key=len)
+        return sets[0].intersection(*sets[1:]) if len(sets) > 1 else sets[0]
+
+    def sorted_ids(self, owner_id: Optional[str] = None, alive: Optional[bool] = None,
+                   status: Optional[str] = None) -> List[str]:
+        """Every matching id in page order."""
+        return self.page(None, len(self._entries), owner_id, alive, status)[0]
+
+    def page(self, after: Optional[SortKey], limit: int, owner_id: Optional[str] = None,
+             alive: Optional[bool] = None, status: Optional[str] = None) -> Tuple[List[str], bool, bool]:
+        """Up to ``limit`` matching ids after ``after`` in page order, whether
+        any match precedes them and whether more follow.
+
+        Walks the smallest sorted bucket among the filters from a bisect, and
+        checks the other filters per row.
+        """
+        buckets = []
+        if owner_id is not None:
+            buckets.append(('owner', owner_id))
+        if status is not None:
+            buckets.append(('status', status))
+        if alive is not None:
+            buckets.append(('alive', alive))
+        if not buckets:
+            buckets.append(('all', None))
+        lists = [self._sorted.get(bucket, []) for bucket in buckets]
+        keys = min(lists, key=len)
+        entries = self._entries
+
+        def matches(pet_id: str) -> bool:
+            pet_owner, pet_alive, pet_status = entries[pet_id]
+            return ((owner_id is None or pet_owner == owner_id)
+                    and (status is None or pet_status == status)
+                    and (alive is None or pet_alive == alive))
+
+        start = bisect_right(keys, after) if after is not None else 0
+        # With a single filter every key in the bucket matches, so this stops at the first
+        has_previous = any(matches(keys[j][1]) for j in range(start - 1, -1, -1))
+        ids: List[str] = []
+        i = start
+        while i < len(keys) and len(ids) <= limit:
+            pet_id = keys[i][1]
+            i += 1
+            if matches(pet_id):
+                ids.append(pet_id)
+        return ids[:limit], has_previous, len(ids) > limit
@@ -0,0 +1,142 @@
+from typing import Dict, List
+
+from ..models import PetRecord
+from .positions import PositionColumns
+from ..shard_worker import np, step_slots
+
+
+class MovementEngine:
+    """Struct-of-arrays movement state advanced in one batched NumPy step.
+
+    Each pet owns a slot in contiguous x/y/direction/speed/alive arrays. Slots
+    are kept dense (removal swaps the last slot into the hole) so a step only
+    touches ``self.size`` entries. The engine is the authority for positions
+    while enabled; ``sync_position``/``write_back`` copy values into the pet
+    records that ``GameStorage`` persists and converts for GraphQL.
+    """
+
+    def __init__(self, width: float, height: float, capacity: int = 1024):
+        if np is None:
+            raise RuntimeError("NumPy is required for MovementEngine")
+        self.width = float(width)
+        self.height = float(height)
+        self.size = 0
+        self.ids: List[str] = []
+        self.slots: Dict[str, int] = {}
+        self._rng = np.random.default_rng()
+        self._allocate(max(1, capacity))
+
+    @staticmethod
+    def available() -> bool:
+        return np is not None
+
+    def _allocate(self, capacity: int):
+        self.x = np.zeros(capacity, dtype=np.float64)
+        self.y = np.zeros(capacity, dtype=np.float64)
+        self.direction = np.zeros(capacity, dtype=np.float64)
+        self.speed = np.ones(capacity, dtype=np.float64)
+        self.alive = np.zeros(capacity, dtype=bool)
+
+    def _grow(self):
+        size = self.size
+        old = (self.x, self.y, self.direction, self.speed, self.alive)
+        self._allocate(len(self.x) * 2)
+        for new, prev in zip((self.x, self.y, self.direction, self.speed, self.alive), old):
+            new[:size] = prev[:size]
+
+    def rebuild(self, tamagotchis: Dict[str, PetRecord]):
+        """Reset the arrays from the pet records (e.g. after load_data)."""
+        self.size = 0
+        self.ids = []
+        self.slots = {}
+        self._allocate(max(1024, len(tamagotchis)))
+        for data in tamagotchis.values():
+            self.add(data)
+
+    def add(self, pet: PetRecord):
+        pet_id = pet.id
+        if pet_id in self.slots:
+            self.remove(pet_id)
+        if self.size == len(self.x):
+            self._grow()
+        i = self.size
+        self.x[i] = pet.x
+        self.y[i] = pet.y
+        self.direction[i] = pet.direction
+        self.speed[i] = pet.speed
+        self.alive[i] = bool(pet.is_alive)
+        self.ids.append(pet_id)
+        self.slots[pet_id] = i
+        self.size += 1
+
+    def remove(self, pet_id: str):
+        i = self.slots.pop(pet_id, None)
+        if i is None:
+            return
+        last = self.size - 1
+        if i != last:
+            moved_id = self.ids[last]
+            for arr in (self.x, self.y, self.direction, self.speed, self.alive):
+                arr[i] = arr[last]
+            self.ids[i] = moved_id
+            self.slots[moved_id] = i
+        self.ids.pop()
+        self.size = last
+
+    def set_alive(self, pet_id: str, is_alive: bool):
+        i = self.slots.get(pet_id)
+        if i is not None:
+            self.alive[i] = bool(is_alive)
+
+    def set_position(self, pet_id: str, x: float, y: float):
+        i = self.slots.get(pet_id)
+        if i is not None:
+            self.x[i] = x
+            self.y[i] = y
+
+    def sync_position(self, pet: PetRecord):
+        """Copy one pet's slot into its record."""
+        i = self.slots.get(pet.id)
+        if i is None:
+            return
+        pet.x = float(self.x[i])
+        pet.y = float(self.y[i])
+        pet.direction = float(self.direction[i])
+        pet.speed = float(self.speed[i])
+
+    def write_back(self, tamagotchis: Dict[str, PetRecord]):
+        """Copy every slot into the pet records (before persisting a snapshot)."""
+        n = self.size
+        xs = self.x[:n].tolist()
+        ys = self.y[:n].tolist()
+        ds = self.direction[:n].tolist()
+        ss = self.speed[:n].tolist()
+        for i, pet_id in enumerate(self.ids):
+            pet = tamagotchis.get(pet_id)
+            if pet is None:
+                continue
+            pet.x = xs[i]
+            pet.y = ys[i]
+            pet.direction = ds[i]
+            pet.speed = ss[i]
+
+    def step(self):
+        """Advance every living pet by one frame.
+
+        Returns the slot indices that moved so callers can read ``self.x`` etc.
+        The arithmetic follows ``GameStorage._step_positions_scalar``: move along
+        the current heading, reflect and clamp on the walls, then occasionally
+        nudge the heading.
+        """
+        return step_slots(self.x, self.y, self.direction, self.speed, self.alive, self.size,
+                          self.width, self.height, self._rng)
+
+    def positions(self, idx) -> PositionColumns:
+        """The ``position_update`` payload for the given slots, as columns."""
+        ids = self.ids
+        return PositionColumns(
+            [ids[i] for i in idx.tolist()],
+            self.x[idx].tolist(),
+            self.y[idx].tolist(),
+            self.direction[idx].tolist(),
+        )
@@ -0,0 +1,112 @@
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional
+
+
+def write_json_atomic(path: str, data: dict, indent: Optional[int] = None):
+    """Write JSON to a temp file, fsync it, then atomically rename over ``path``."""
+    tmp_path = f"{path}.tmp"
+    separators = None if indent else (',', ':')
+    with open(tmp_path, 'w') as f:
+        json.dump(data, f, indent=indent, separators=separators)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+    # Persist the rename itself (best effort; not supported everywhere)
+    try:
+        dir_fd = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
+    except OSError:
+        pass
+
+
+class PersistenceWriter:
+    """Runs disk writes on one dedicated thread, in submission order.
+
+    Callers hand over immutable point-in-time data and return immediately.
+    Snapshot jobs coalesce: if a snapshot is still waiting to run when a newer
+    one is submitted, only the newer data is written. With ``background=False``
+    jobs run inline (benchmarks, scripts).
+    """
+
+    def __init__(self, background: bool = True):
+        self.background = background
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="persistence") if background else None
+        self._lock = threading.Lock()
+        self._next_snapshot = None
+        self._pending = 0
+        self.jobs = 0
+        self.failures = 0
+        self.last_error: Optional[str] = None
+        self.last_ms = 0.0
+        self.max_ms = 0.0
+        self.total_ms = 0.0
+
+    def submit(self, fn: Callable, *args):
+        """Queue ``fn(*args)`` on the writer thread."""
+        if self._executor is None:
+            self._run(False, fn, *args)
+            return
+        with self._lock:
+            self._pending += 1
+        self._executor.submit(self._run, True, fn, *args)
+
+    def submit_snapshot(self, path: str, data: dict, indent: Optional[int] = None,
+                        after: Optional[Callable] = None):
+        """Queue an atomic JSON snapshot; ``after`` runs once it is on disk."""
+        with self._lock:
+            queued = self._next_snapshot is not None
+            self._next_snapshot = (path, data, indent, after)
+        if not queued:
+            self.submit(self._write_latest_snapshot)
+
+    def _write_latest_snapshot(self):
+        with self._lock:
+            job, self._next_snapshot = self._next_snapshot, None
+        if job is None:
+            return
+        path, data, indent, after = job
+        write_json_atomic(path, data, indent)
+        if after is not None:
+            after()
+
+    def _run(self, queued: bool, fn: Callable, *args):
+        start = time.perf_counter()
+        try:
+            fn(*args)
+        except Exception as e:
+            self.failures += 1
+            self.last_error = repr(e)
+        finally:
+            elapsed = (time.perf_counter() - start) * 1000
+            with self._lock:
+                if queued:
+                    self._pending -= 1
+                self.jobs += 1
+                self.last_ms = elapsed
+                self.max_ms = max(self.max_ms, elapsed)
+                self.total_ms += elapsed
+
+    def close(self):
+        """Finish queued writes and stop the thread; later jobs run inline."""
+        executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                'jobs': self.jobs,
+                'pending': self._pending,
+                'failures': self.failures,
+                'last_error': self.last_error,
+                'last_ms': round(self.last_ms, 3),
+                'max_ms': round(self.max_ms, 3),
+                'avg_ms': round(self.total_ms / self.jobs, 3) if self.jobs else 0.0,
+            }
@@ -0,0 +1,81 @@
+from json.encoder import encode_basestring_ascii
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# One JSON position entry, rendered exactly as json.dumps would
+_ENTRY = '{"id": %s, "x": %r, "y": %r, "direction": %r}'.__mod__
+
+
+class PositionColumns:
+    """A ``position_update`` payload kept as parallel columns.
+
+    A movement frame covers every living pet, so it stays as lists (``ids``,
+    ``x``, ``y``, ``direction``) from the step that produced it to the
+    encoders: the binary frame packs the columns directly and the JSON frame
+    is rendered from them, without a dict per pet in between. ``entries()``
+    gives the dict form where one is needed (GraphQL, tests, small frames).
+    """
+
+    __slots__ = ('ids', 'x', 'y', 'direction')
+
+    def __init__(self, ids: Optional[List[str]] = None, x: Optional[List[float]] = None,
+                 y: Optional[List[float]] = None, direction: Optional[List[float]] = None):
+        self.ids = ids if ids is not None else []
+        self.x = x if x is not None else []
+        self.y = y if y is not None else []
+        self.direction = direction if direction is not None else []
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def append(self, pet_id: str, x: float, y: float, direction: float):
+        self.ids.append(pet_id)
+        self.x.append(x)
+        self.y.append(y)
+        self.direction.append(direction)
+
+    def extend(self, other: 'PositionColumns'):
+        self.ids.extend(other.ids)
+        self.x.extend(other.x)
+        self.y.extend(other.y)
+        self.direction.extend(other.direction)
+
+    @classmethod
+    def from_entries(cls, entries: Iterable[dict]) -> 'PositionColumns':
+        columns = cls()
+        for p in entries:
+            columns.append(p['id'], p['x'], p['y'], p['direction'])
+        return columns
+
+    def entries(self) -> List[dict]:
+        return [
+            {'id': pet_id, 'x': x, 'y': y, 'direction': d}
+            for pet_id, x, y, d in zip(self.ids, self.x, self.y, self.direction)
+        ]
+
+    def columns(self) -> list:
+        """``[ids, x, y, direction]``, the form sent between cluster workers."""
+        return [self.ids, self.x, self.y, self.direction]
+
+    def rows(self) -> Dict[str, int]:
+        """Pet id -> row, for picking out subsets with ``take``."""
+        return {pet_id: i for i, pet_id in enumerate(self.ids)}
+
+    def take(self, rows: Iterable[int]) -> 'PositionColumns':
+        ids, x, y, d = self.ids, self.x, self.y, self.direction
+        rows = sorted(rows)
+        return PositionColumns([ids[i] for i in rows], [x[i] for i in rows],
+                               [y[i] for i in rows], [d[i] for i in rows])
+
+    def merge(self, newer: 'PositionColumns') -> 'PositionColumns':
+        """This payload updated with ``newer`` (its entries win, per pet id)."""
+        merged: Dict[str, Tuple[float, float, float]] = dict(zip(self.ids, zip(self.x, self.y, self.direction)))
+        merged.update(zip(newer.ids, zip(newer.x, newer.y, newer.direction)))
+        if not merged:
+            return PositionColumns()
+        x, y, d = map(list, zip(*merged.values()))
+        return PositionColumns(list(merged), x, y, d)
+
+    def to_json(self) -> str:
+        """The JSON ``position_update`` frame (same text as json.dumps of ``entries()``)."""
+        body = ', '.join(map(_ENTRY, zip(map(encode_basestring_ascii, self.ids), self.x, self.y, self.direction)))
+        return '{"type": "position_update", "positions": [' + body + ']}'
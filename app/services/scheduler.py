@@ -0,0 +1,81 @@
+import heapq
+import time
+from typing import Callable, Dict, List, Set, Tuple
+
+
+class DecayScheduler:
+    """Min-heap of per-pet stat deadlines on a monotonic clock.
+
+    Each (pet, kind) pair has at most one live deadline. Rescheduling pushes a
+    new heap entry and records it as current; the old entry is skipped when it
+    surfaces (lazy deletion), and the heap is compacted once stale entries
+    dominate.
+    """
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic):
+        self.clock = clock
+        self._heap: List[Tuple[float, str, str]] = []
+        self._deadlines: Dict[str, Dict[str, float]] = {}
+        self._live = 0
+
+    def __len__(self) -> int:
+        return self._live
+
+    def schedule(self, pet_id: str, kind: str, delay: float):
+        """Set (or replace) the deadline for one stat of one pet."""
+        deadline = self.clock() + max(0.0, delay)
+        kinds = self._deadlines.setdefault(pet_id, {})
+        if kind not in kinds:
+            self._live += 1
+        kinds[kind] = deadline
+        heapq.heappush(self._heap, (deadline, pet_id, kind))
+        if len(self._heap) > 64 and len(self._heap) > 4 * self._live:
+            self._compact()
+
+    def has(self, pet_id: str, kind: str) -> bool:
+        return kind in self._deadlines.get(pet_id, ())
+
+    def cancel(self, pet_id: str, kind: str = None):
+        """Drop one deadline, or all of a pet's deadlines when kind is None."""
+        kinds = self._deadlines.get(pet_id)
+        if kinds is None:
+            return
+        if kind is None:
+            self._live -= len(kinds)
+            del self._deadlines[pet_id]
+            return
+        if kinds.pop(kind, None) is not None:
+            self._live -= 1
+        if not kinds:
+            del self._deadlines[pet_id]
+
+    def clear(self):
+        self._heap = []
+        self._deadlines = {}
+        self._live = 0
+
+    def pop_due(self, now: float = None) -> Dict[str, Set[str]]:
+        """Remove and return every deadline at or before now, grouped by pet."""
+        if now is None:
+            now = self.clock()
+        due: Dict[str, Set[str]] = {}
+        heap = self._heap
+        while heap and heap[0][0] <= now:
+            deadline, pet_id, kind = heapq.heappop(heap)
+            kinds = self._deadlines.get(pet_id)
+            if not kinds or kinds.get(kind) != deadline:
+                continue  # superseded or cancelled
+            del kinds[kind]
+            self._live -= 1
+            if not kinds:
+                del self._deadlines[pet_id]
+            due.setdefault(pet_id, set()).add(kind)
+        return due
+
+    def _compact(self):
+        self._heap = [
+            (deadline, pet_id, kind)
+            for pet_id, kinds in self._deadlines.items()
+            for kind, deadline in kinds.items()
+        ]
+        heapq.heapify(self._heap)
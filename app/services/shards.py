@@ -0,0 +1,335 @@
+import atexit
+import multiprocessing
+import uuid
+import zlib
+from contextlib import contextmanager
+from multiprocessing.shared_memory import SharedMemory
+from typing import Callable, Dict, List, Optional, Tuple, TypeVar
+
+from ..models import PetRecord
+from .positions import PositionColumns
+from ..shard_worker import (
+    COLUMNS, HEADER_LEN, STAT_COLUMNS,
+    CAPACITY, MOVE_TICKS, SEGMENT, SEQ, SIZE, STATS_TICKS, STOP, TICK_US,
+    columns, np, run_shard, segment_bytes,
+)
+
+# Lock-free reads retried after a worker tick tore them, before taking the lock
+SEQLOCK_RETRIES = 3
+
+T = TypeVar('T')
+
+class _Shard:
+    """Parent-side view of one shard: its shared memory, slot map and worker."""
+
+    def __init__(self, prefix: str, index: int, capacity: int, ctx):
+        self.prefix = prefix
+        self.index = index
+        # Reentrant, so a read-modify-write (see ShardedSimulation.editing)
+        # can call the other writers while it holds the shard
+        self.lock = ctx.RLock()
+        self.control = SharedMemory(name=f"{prefix}_{index}_ctl", create=True, size=HEADER_LEN * 8)
+        self.header = np.ndarray(HEADER_LEN, dtype=np.int64, buffer=self.control.buf)
+        self.header[:] = 0
+        self.segment: Optional[SharedMemory] = None
+        self.cols: Dict[str, 'np.ndarray'] = {}
+        self.capacity = 0
+        self.ids: List[str] = []
+        self.slots: Dict[str, int] = {}
+        self.seen_stats_tick = 0
+        self.process = None
+        self._map(capacity)
+
+    def _map(self, capacity: int):
+        """Move the shard into a fresh segment of ``capacity`` slots (caller holds the lock)."""
+        segment_id = int(self.header[SEGMENT]) + (self.segment is not None)
+        segment = SharedMemory(name=f"{self.prefix}_{self.index}_{segment_id}", create=True,
+                               size=segment_bytes(capacity))
+        cols = columns(segment.buf, capacity)
+        n = len(self.ids)
+        if self.cols:
+            for name, _ in COLUMNS:
+                cols[name][:n] = self.cols[name][:n]
+        old = self.segment
+        self.segment, self.cols, self.capacity = segment, cols, capacity
+        self.header[CAPACITY] = capacity
+        self.header[SEGMENT] = segment_id
+        if old is not None:
+            old.close()
+            old.unlink()
+
+    def add(self, pet: PetRecord, difficulty: float):
+        with self.lock:
+            if len(self.ids) == self.capacity:
+                self._map(self.capacity * 2)
+            i = len(self.ids)
+            self.ids.append(pet.id)
+            self.slots[pet.id] = i
+            self._write(i, pet, difficulty)
+            self.cols['x'][i] = pet.x
+            self.cols['y'][i] = pet.y
+            self.cols['direction'][i] = pet.direction
+            self.cols['speed'][i] = pet.speed
+            self.cols['changed'][i] = 0
+            self.header[SIZE] = len(self.ids)
+
+    def _write(self, i: int, pet: PetRecord, difficulty: float):
+        cols = self.cols
+        for name in STAT_COLUMNS:
+            cols[name][i] = getattr(pet, name)
+        cols['difficulty'][i] = difficulty
+        cols['alive'][i] = bool(pet.is_alive)
+
+    def _read(self, i: int, pet: PetRecord):
+        cols = self.cols
+        for name in STAT_COLUMNS:
+            setattr(pet, name, cols[name][i].item())
+        pet.is_alive = bool(cols['alive'][i])
+
+    def read(self, copy: Callable[[], T]) -> T:
+        """Run ``copy`` (which copies values out of the columns) without the lock.
+
+        The worker's seqlock tells whether a tick ran meanwhile; a torn copy
+        is retried, and after SEQLOCK_RETRIES (or while a tick is running)
+        the copy is taken under the lock instead.
+        """
+        header = self.header
+        for _ in range(SEQLOCK_RETRIES):
+            seq = int(header[SEQ])
+            if seq & 1:
+                break
+            result = copy()
+            if int(header[SEQ]) == seq:
+                return result
+        with self.lock:
+            return copy()
+
+    def remove(self, pet_id: str):
+        with self.lock:
+            i = self.slots.pop(pet_id, None)
+            if i is None:
+                return
+            last = len(self.ids) - 1
+            if i != last:
+                moved_id = self.ids[last]
+                for arr in self.cols.values():
+                    arr[i] = arr[last]
+                self.ids[i] = moved_id
+                self.slots[moved_id] = i
+            self.ids.pop()
+            self.header[SIZE] = len(self.ids)
+
+    def start(self, ctx, args: tuple):
+        if self.process is not None and self.process.is_alive():
+            return
+        self.header[STOP] = 0
+        process = ctx.Process(target=run_shard, args=(self.prefix, self.index, self.lock) + args,
+                              name=f"shard-{self.index}", daemon=True)
+        process.start()
+        self.process = process
+
+    def stop(self):
+        process, self.process = self.process, None
+        if process is None:
+            return
+        self.header[STOP] = 1
+        process.join(timeout=2.0)
+        if process.is_alive():
+            process.terminate()
+            process.join()
+
+    def release(self):
+        self.stop()
+        cols, self.cols = self.cols, {}
+        del cols
+        self.header = None
+        for shm in (self.segment, self.control):
+            if shm is not None:
+                shm.close()
+                shm.unlink()
+        self.segment = None
+
+
+class ShardedSimulation:
+    """Pets partitioned across worker processes that tick them over shared memory.
+
+    Each shard owns a shared-memory segment of per-pet columns (position,
+    stats, decay timestamps, difficulty) and one worker process running the
+    movement and decay ticks on it with NumPy. The event loop only reads the
+    columns in place: ``positions`` for movement broadcasts (lock-free,
+    checked against the worker's seqlock) and ``collect_decay`` for the
+    slots a stats tick touched. Mutations are written straight into the
+    owning shard under its lock, so other shards keep ticking. Workers run
+    ``app.shard_worker``, which imports nothing else from the app.
+
+    Implements the ``MovementEngine`` interface, so GameStorage uses it in
+    place of the in-process engine; ``step`` is a no-op because the workers
+    step themselves.
+    """
+
+    def __init__(self, workers: int, width: float, height: float, capacity: int,
+                 move_interval: float, stats_interval: float, decay_rules: Dict[str, Tuple[str, float]]):
+        self._ctx = multiprocessing.get_context('spawn')
+        self.prefix = f"tg{uuid.uuid4().hex[:10]}"
+        self.shards = [_Shard(self.prefix, i, capacity, self._ctx) for i in range(workers)]
+        self._owner: Dict[str, _Shard] = {}
+        steps = {'hunger': 1, 'happiness': -1, 'energy': -1}
+        rules = tuple((stat, stamp, float(base), steps[stat]) for stat, (stamp, base) in decay_rules.items())
+        self._args = (float(width), float(height), float(move_interval), float(stats_interval), rules)
+        self._released = False
+        atexit.register(self.release)
+
+    @staticmethod
+    def available() -> bool:
+        return np is not None
+
+    def _shard_for(self, pet_id: str) -> _Shard:
+        return self.shards[zlib.crc32(pet_id.encode()) % len(self.shards)]
+
+    def start(self):
+        for shard in self.shards:
+            shard.start(self._ctx, self._args)
+
+    def close(self):
+        """Stop the workers; shared memory stays mapped so the world can still be read and saved."""
+        for shard in self.shards:
+            shard.stop()
+
+    def release(self):
+        if self._released:
+            return
+        self._released = True
+        for shard in self.shards:
+            shard.release()
+
+    # MovementEngine interface
+
+    def rebuild(self, tamagotchis: Dict[str, PetRecord]):
+        for pet_id in list(self._owner):
+            self.remove(pet_id)
+        for pet in tamagotchis.values():
+            self.add(pet)
+
+    def add(self, pet: PetRecord, difficulty: float = 1.0):
+        if pet.id in self._owner:
+            self.remove(pet.id)
+        shard = self._shard_for(pet.id)
+        shard.add(pet, difficulty)
+        self._owner[pet.id] = shard
+
+    def remove(self, pet_id: str):
+        shard = self._owner.pop(pet_id, None)
+        if shard is not None:
+            shard.remove(pet_id)
+
+    def set_alive(self, pet_id: str, is_alive: bool):
+        shard = self._owner.get(pet_id)
+        if shard is not None:
+            with shard.lock:
+                shard.cols['alive'][shard.slots[pet_id]] = bool(is_alive)
+
+    def set_position(self, pet_id: str, x: float, y: float):
+        shard = self._owner.get(pet_id)
+        if shard is not None:
+            with shard.lock:
+                i = shard.slots[pet_id]
+                shard.cols['x'][i] = x
+                shard.cols['y'][i] = y
+
+    def sync_position(self, pet: PetRecord):
+        shard = self._owner.get(pet.id)
+        if shard is None:
+            return
+        i = shard.slots[pet.id]
+        cols = shard.cols
+        pet.x, pet.y, pet.direction, pet.speed = shard.read(lambda: (
+            cols['x'][i].item(), cols['y'][i].item(), cols['direction'][i].item(), cols['speed'][i].item()
+        ))
+
+    def write_back(self, tamagotchis: Dict[str, PetRecord]):
+        for shard in self.shards:
+            n = len(shard.ids)
+            cols = shard.cols
+            values = shard.read(lambda: [cols[name][:n].tolist() for name in ('x', 'y', 'direction', 'speed')])
+            for pet_id, x, y, d, s in zip(shard.ids, *values):
+                pet = tamagotchis.get(pet_id)
+                if pet is not None:
+                    pet.x, pet.y, pet.direction, pet.speed = x, y, d, s
+
+    def step(self):
+        return None
+
+    def positions(self, idx=None) -> PositionColumns:
+        """The ``position_update`` payload for every living pet, read in place from the shards."""
+        positions = PositionColumns()
+        for shard in self.shards:
+            n = len(shard.ids)
+            cols = shard.cols
+            ids = shard.ids
+
+            def copy():
+                live = np.flatnonzero(cols['alive'][:n])
+                return live.tolist(), cols['x'][live].tolist(), cols['y'][live].tolist(), cols['direction'][live].tolist()
+
+            live, xs, ys, ds = shard.read(copy)
+            positions.extend(PositionColumns([ids[i] for i in live], xs, ys, ds))
+        return positions
+
+    # Stats
+
+    def set_stats(self, pet: PetRecord, difficulty: float):
+        """Route a pet's stats, timestamps and alive flag to its shard after a mutation."""
+        shard = self._owner.get(pet.id)
+        if shard is not None:
+            with shard.lock:
+                shard._write(shard.slots[pet.id], pet, difficulty)
+
+    @contextmanager
+    def editing(self, pet: PetRecord):
+        """Hold a pet's shard for a read-modify-write of its stats.
+
+        Entering copies the slot's current stats into ``pet``. The worker
+        cannot tick the slot until the block ends, so the mutation written
+        back inside it (``set_stats``, ``set_alive``) cannot overwrite decay.
+        """
+        shard = self._owner.get(pet.id)
+        if shard is None:
+            yield
+            return
+        with shard.lock:
+            shard._read(shard.slots[pet.id], pet)
+            yield
+
+    def collect_decay(self, tamagotchis: Dict[str, PetRecord]) -> List[PetRecord]:
+        """Copy stat changes made by worker ticks since the last call into the records."""
+        changed = []
+        for shard in self.shards:
+            with shard.lock:
+                n = len(shard.ids)
+                tick = int(shard.header[STATS_TICKS])
+                idx = np.flatnonzero(shard.cols['changed'][:n] > shard.seen_stats_tick)
+                shard.seen_stats_tick = tick
+                if idx.size == 0:
+                    continue
+                values = {name: shard.cols[name][idx].tolist() for name in STAT_COLUMNS + ('alive',)}
+                ids = [shard.ids[i] for i in idx.tolist()]
+            for k, pet_id in enumerate(ids):
+                pet = tamagotchis.get(pet_id)
+                if pet is None:
+                    continue
+                for name in STAT_COLUMNS:
+                    setattr(pet, name, values[name][k])
+                pet.is_alive = values['alive'][k]
+                changed.append(pet)
+        return changed
+
+    def stats(self) -> dict:
+        return {
+            'workers': len(self.shards),
+            'running': sum(1 for s in self.shards if s.process is not None and s.process.is_alive()),
+            'pets': [len(s.ids) for s in self.shards],
+            'capacity': [s.capacity for s in self.shards],
+            'move_ticks': [int(s.header[MOVE_TICKS]) for s in self.shards],
+            'stats_ticks': [int(s.header[STATS_TICKS]) for s in self.shards],
+            'last_tick_ms': [round(int(s.header[TICK_US]) / 1000, 3) for s in self.shards],
+        }
@@ -0,0 +1,87 @@
+import uuid
+from typing import Callable, Dict, Iterable, Optional, Tuple
+
+
+class SnapshotCache:
+    """Read-model views of the world, cached per world generation.
+
+    GameStorage bumps ``generation`` on every structural change (stats,
+    pets created or removed, users). Positions and cursors move many times a
+    second, so they have their own versions (``bump_live``) and only views
+    that include them go stale when they move. A view (the pet list for
+    ``allTamagotchis``, the serialized HTTP snapshot, ...) is built at most
+    once per version and shared by every reader until the next bump. ETags
+    combine a per-process epoch with the versions, so a restart never
+    produces a false 304.
+    """
+
+    def __init__(self):
+        self.generation = 0
+        self.live: Dict[str, int] = {'positions': 0, 'cursors': 0}
+        self.epoch = uuid.uuid4().hex[:8]
+        self._views: Dict[str, Tuple[tuple, object]] = {}
+        self.hits = 0
+        self.builds = 0
+        self.not_modified = 0
+
+    def bump(self):
+        self.generation += 1
+
+    def bump_live(self, channel: str):
+        """Invalidate views that include ``channel`` ('positions' or 'cursors')."""
+        self.live[channel] += 1
+
+    def _stamp(self, live: Iterable[str]) -> tuple:
+        return (self.generation,) + tuple(self.live[channel] for channel in live)
+
+    def get(self, name: str, build: Callable[[], object], live: Tuple[str, ...] = ()) -> object:
+        """The named view, rebuilt if the generation or a ``live`` channel moved since."""
+        stamp = self._stamp(live)
+        cached = self._views.get(name)
+        if cached is not None and cached[0] == stamp:
+            self.hits += 1
+            return cached[1]
+        view = build()
+        self._views[name] = (stamp, view)
+        self.builds += 1
+        return view
+
+    @property
+    def etag(self) -> str:
+        return self.live_etag()
+
+    def live_etag(self, live: Tuple[str, ...] = ()) -> str:
+        """ETag for content at the current generation plus the given live channels."""
+        return '"{}-{}"'.format(self.epoch, '.'.join(str(v) for v in self._stamp(live)))
+
+    def etag_matches(self, if_none_match: Optional[str], etag: Optional[str] = None) -> bool:
+        """Whether an ``If-None-Match`` header names the current ``etag`` (default: structural)."""
+        if not if_none_match:
+            return False
+        tags = _parse_etags(if_none_match)
+        if '*' in tags or (etag or self.etag) in tags:
+            self.not_modified += 1
+            return True
+        return False
+
+    def stats(self) -> dict:
+        return {
+            'generation': self.generation,
+            'live': dict(self.live),
+            'views': len(self._views),
+            'hits': self.hits,
+            'builds': self.builds,
+            'not_modified': self.not_modified,
+        }
+
+
+def _parse_etags(header: str) -> Iterable[str]:
+    # Weak validators compare equal for If-None-Match (RFC 9110 13.1.2)
+    tags = set()
+    for tag in header.split(','):
+        tag = tag.strip()
+        if tag.startswith('W/'):
+            tag = tag[2:]
+        if tag:
+            tags.add(tag)
+    return tags
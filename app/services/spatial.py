@@ -0,0 +1,93 @@
+import math
+from typing import Dict, Set, Tuple
+
+from .positions import PositionColumns
+
+Cell = Tuple[int, int]
+
+
+class SpatialGrid:
+    """Uniform-grid index of pet positions for area-of-interest queries.
+
+    Pets are bucketed by ``(floor(x / cell_size), floor(y / cell_size))``.
+    Moving within a cell costs one lookup; only cell changes touch the
+    buckets, so per-frame maintenance is cheap even for large worlds.
+    """
+
+    def __init__(self, cell_size: float):
+        self.cell_size = float(cell_size)
+        self.cells: Dict[Cell, Set[str]] = {}
+        self.pet_cells: Dict[str, Cell] = {}
+
+    def __len__(self) -> int:
+        return len(self.pet_cells)
+
+    def _cell(self, x: float, y: float) -> Cell:
+        return (int(x // self.cell_size), int(y // self.cell_size))
+
+    def update(self, pet_id: str, x: float, y: float):
+        cell = self._cell(x, y)
+        old = self.pet_cells.get(pet_id)
+        if old == cell:
+            return
+        if old is not None:
+            bucket = self.cells.get(old)
+            if bucket is not None:
+                bucket.discard(pet_id)
+                if not bucket:
+                    del self.cells[old]
+        self.cells.setdefault(cell, set()).add(pet_id)
+        self.pet_cells[pet_id] = cell
+
+    def update_many(self, positions: PositionColumns):
+        """Apply a position_update payload."""
+        size = self.cell_size
+        pet_cells = self.pet_cells
+        for pet_id, x, y in zip(positions.ids, positions.x, positions.y):
+            cell = (int(x // size), int(y // size))
+            if pet_cells.get(pet_id) != cell:
+                self.update(pet_id, x, y)
+
+    def remove(self, pet_id: str):
+        old = self.pet_cells.pop(pet_id, None)
+        if old is None:
+            return
+        bucket = self.cells.get(old)
+        if bucket is not None:
+            bucket.discard(pet_id)
+            if not bucket:
+                del self.cells[old]
+
+    def clear(self):
+        self.cells = {}
+        self.pet_cells = {}
+
+    def query(self, x: float, y: float, width: float, height: float, margin: float = 0.0) -> Set[str]:
+        """Ids of pets in every cell overlapping the (margin-expanded) rectangle."""
+        cx0, cy0 = self._cell(x - margin, y - margin)
+        cx1, cy1 = self._cell(x + width + margin, y + height + margin)
+        found: Set[str] = set()
+        cells = self.cells
+        if (cx1 - cx0 + 1) * (cy1 - cy0 + 1) > len(cells):
+            # Viewport covers more cells than are occupied: scan occupied ones
+            for (cx, cy), bucket in cells.items():
+                if cx0 <= cx <= cx1 and cy0 <= cy <= cy1:
+                    found |= bucket
+            return found
+        for cx in range(cx0, cx1 + 1):
+            for cy in range(cy0, cy1 + 1):
+                bucket = cells.get((cx, cy))
+                if bucket:
+                    found |= bucket
+        return found
+
+
+def parse_viewport(message: dict):
+    """Validate a viewport message into (x, y, width, height), or None to clear it."""
+    try:
+        rect = tuple(float(message[k]) for k in ('x', 'y', 'width', 'height'))
+    except (KeyError, TypeError, ValueError):
+        return None
+    if not all(math.isfinite(v) for v in rect) or rect[2] <= 0 or rect[3] <= 0:
+        return None
+    return rect
@@ -1,9 +1,13 @@
 import asyncio
 import json
+import logging
 import math
 import os
 import random
+import sqlite3
+import time
 import uuid
+from contextlib import contextmanager
 from datetime import datetime
 from typing import Dict, List, Optional
 
@@ -14,20 +18,126 @@ from ..config import (
     GAME_AREA_HEIGHT,
     DEBOUNCE_DELAY_SEC,
     BACKUP_INTERVAL_SEC,
+    MOUSE_FLUSH_INTERVAL_SEC,
+    POSITION_FLUSH_INTERVAL_SEC,
+    CURSOR_BROADCAST_HZ,
+    CURSOR_MIN_DISTANCE,
+    VECTORIZED_MOVEMENT,
+    SIMULATION_WORKERS,
+    SIMULATION_SHARD_CAPACITY,
+    POSITION_UPDATE_INTERVAL,
+    STATS_UPDATE_INTERVAL,
+    STATS_KEYFRAME_INTERVAL_SEC,
+    HUNGER_DECAY_SEC,
+    HAPPINESS_DECAY_SEC,
+    ENERGY_DECAY_SEC,
+    AOI_CELL_SIZE,
+    PERSISTENCE_MODE,
+    DATA_FILE,
+    JOURNAL_FILE,
+    JOURNAL_COMPACT_RECORDS,
+    JOURNAL_COMPACT_INTERVAL_SEC,
+    ASYNC_PERSISTENCE,
 )
-from ..models import User, Tamagotchi, Position
-from ..db import get_connection, init_db_and_migrate_json_users
+from ..models import User, PetRecord
+from ..db import (
+    get_connection,
+    init_db_and_migrate_json_users,
+    load_tamagotchis,
+    load_user_rows,
+    save_mouse_positions,
+    save_tamagotchi_positions,
+    save_tamagotchi_rows,
+    tamagotchi_to_row,
+)
+from .movement import MovementEngine
+from .shards import ShardedSimulation
+from .scheduler import DecayScheduler
+from .deltas import StatDeltaTracker
+from .spatial import SpatialGrid
+from .positions import PositionColumns
+from .indexes import PetIndex
+from .broker import Broker, TOPIC_STATS, TOPIC_POSITIONS, TOPIC_CREATED, TOPIC_REMOVED, TOPIC_CURSORS
+from .journal import Journal
+from .persistence import PersistenceWriter
+from .hashing import PasswordHasher
+from .snapshot import SnapshotCache
+from .clock import GameClock
+
+logger = logging.getLogger(__name__)
+
 
 class GameStorage:
+    # Decaying stat -> (timestamp field it is measured from, base seconds per point)
+    DECAY_RULES = {
+        'hunger': ('last_fed', HUNGER_DECAY_SEC),
+        'happiness': ('last_played', HAPPINESS_DECAY_SEC),
+        'energy': ('last_slept', ENERGY_DECAY_SEC),
+    }
+    # Live channels served by /snapshot/live instead of the structural snapshot
+    _LIVE_SNAPSHOT = ('positions', 'cursors')
+
     def __init__(self):
         self.users: Dict[str, dict] = {}
-        self.tamagotchis: Dict[str, dict] = {}
+        # Slotted pet records; converted to GraphQL types only by resolvers
+        self.tamagotchis: Dict[str, PetRecord] = {}
         self.mouse_positions: Dict[str, dict] = {}
+        # Batched NumPy movement (None -> scalar per-pet loop). With simulation
+        # workers the shards stand in for the engine and also own stat decay.
+        self._movement: Optional[MovementEngine] = None
+        self.shards: Optional[ShardedSimulation] = None
+        self._init_simulation()
+        # Multi-worker role (see services/cluster.py). A follower runs no game
+        # loops: it serves a replica fed by the owner and forwards mutations.
+        self.cluster = None
+        self.follower = False
+        # Pets / users changed since the owner last published them to followers
+        self._replica_pets: set = set()
+        self._replica_users: set = set()
+        # Next-due stat deadlines and owner -> pet ids, so ticks and difficulty
+        # changes only touch the pets they affect
+        self._decay = DecayScheduler()
+        self._index = PetIndex()
+        # Event topics for GraphQL subscriptions
+        self.broker = Broker()
+        # World generation + read views built once per generation
+        self.snapshots = SnapshotCache()
+        # Last stat values clients were sent, for delta stats_update frames
+        self._stat_deltas = StatDeltaTracker()
+        self._stats_ticks = 0
+        # Fixed-timestep driver for the stats and position ticks
+        self.clock = GameClock()
+        self.clock.add('stats', STATS_UPDATE_INTERVAL, self.stats_tick)
+        self.clock.add('positions', POSITION_UPDATE_INTERVAL, self.positions_tick)
+        # Uniform grid of pet positions for viewport (area of interest) filtering
+        self._grid = SpatialGrid(AOI_CELL_SIZE)
+        # Pets / mouse entries changed since the last save (deleted pets stay
+        # listed so the journal can record their removal)
+        self._dirty_pets: set = set()
+        self._dirty_mice: set = set()
+        # Latest cursor per user not yet written to the users table
+        # (last writer wins; flushed in one batch every MOUSE_FLUSH_INTERVAL_SEC)
+        self._pending_mouse: Dict[str, tuple] = {}
+        # Cursors moved since the last 'cursors' frame, and the coordinates
+        # each user's cursor was last broadcast at
+        self._cursor_moves: Dict[str, dict] = {}
+        self._cursor_sent: Dict[str, tuple] = {}
+        # 'sqlite' (dirty rows), 'journal' (append-only log + compacted snapshot)
+        # or 'snapshot' (full JSON rewrite); see PERSISTENCE_MODE in config
+        self._persistence_mode = PERSISTENCE_MODE
+        self._journal: Optional[Journal] = Journal(JOURNAL_FILE) if PERSISTENCE_MODE == 'journal' else None
+        self._last_snapshot = time.monotonic()
+        # Disk writes run on a dedicated thread; the loop only captures
+        # point-in-time copies of what changed
+        self.writer = PersistenceWriter(background=ASYNC_PERSISTENCE)
+        # Password hashing off the event loop (see create_user_async)
+        self.hasher = PasswordHasher()
         # Ensure DB exists and migrate any JSON-stored users
         init_db_and_migrate_json_users()
         self.load_data()
         # Load users from SQLite rather than JSON
         self._load_users_from_db()
+        self._rebuild_indexes()
         self._tasks_started = False
         self.manager = None  # Will be set by dependency injection
         # Debounced + interval persistence for stats (configurable)
@@ -37,6 +147,27 @@ class GameStorage:
         self._backup_task = None
         self._dirty = False
     
+    def _init_simulation(self):
+        if SIMULATION_WORKERS and ShardedSimulation.available():
+            self.shards = ShardedSimulation(
+                SIMULATION_WORKERS, GAME_AREA_WIDTH, GAME_AREA_HEIGHT, SIMULATION_SHARD_CAPACITY,
+                POSITION_UPDATE_INTERVAL, STATS_UPDATE_INTERVAL, self.DECAY_RULES,
+            )
+            self._movement = self.shards
+        elif VECTORIZED_MOVEMENT and MovementEngine.available():
+            self._movement = MovementEngine(GAME_AREA_WIDTH, GAME_AREA_HEIGHT)
+
+    def _log_engine(self):
+        """Say which engine runs movement (and decay) for this process."""
+        if self.shards:
+            logger.info("Simulation: %d NumPy shard workers", len(self.shards.shards))
+        elif self._movement:
+            logger.info("Simulation: NumPy movement engine")
+        elif VECTORIZED_MOVEMENT or SIMULATION_WORKERS:
+            logger.warning("NumPy is not installed; movement runs on the per-pet Python loop")
+        else:
+            logger.info("Simulation: per-pet Python loop")
+
     def set_connection_manager(self, manager):
         """Set the connection manager for broadcasting"""
         self.manager = manager
@@ -44,9 +175,14 @@ class GameStorage:
     async def start_background_tasks(self):
         """Start background tasks - call this when the app starts"""
         if not self._tasks_started:
-            asyncio.create_task(self.update_stats_loop())
-            asyncio.create_task(self.update_positions_loop())
+            self._log_engine()
+            if self.shards:
+                self.shards.start()
+            asyncio.create_task(self.clock.run())
             asyncio.create_task(self._backup_save_loop())
+            asyncio.create_task(self._mouse_flush_loop())
+            asyncio.create_task(self._position_flush_loop())
+            asyncio.create_task(self._cursor_broadcast_loop())
             self._tasks_started = True
 
     def _cancel_save_task(self):
@@ -85,143 +221,403 @@ class GameStorage:
         while True:
             await asyncio.sleep(self._backup_interval_sec)
             # Only persist if at least one alive tamagotchi exists.
-            if any(t.get('is_alive') for t in self.tamagotchis.values()):
+            if any(pet.is_alive for pet in self.tamagotchis.values()):
                 self.save_data()
 
-    def save_data(self):
+    async def _mouse_flush_loop(self):
+        while True:
+            await asyncio.sleep(MOUSE_FLUSH_INTERVAL_SEC)
+            self.flush_mouse_positions()
+
+    def flush_mouse_positions(self):
+        """Queue buffered cursor coordinates for one batched users-table update."""
+        if not self._pending_mouse:
+            return
+        pending, self._pending_mouse = self._pending_mouse, {}
+        rows = [(x, y, user_id) for user_id, (x, y) in pending.items()]
+        self.writer.submit(save_mouse_positions, rows)
+
+    async def _position_flush_loop(self):
+        while True:
+            await asyncio.sleep(POSITION_FLUSH_INTERVAL_SEC)
+            self.flush_positions()
+
+    def flush_positions(self):
+        """Persist where the movement tick has moved living pets, in one batch.
+
+        Movement changes every living pet on every position tick, so it is not
+        tracked per pet like stat changes; instead the latest positions are
+        written in one batch every POSITION_FLUSH_INTERVAL_SEC. Snapshot mode
+        already rewrites every position with each save.
+        """
+        if self.follower or self._persistence_mode == 'snapshot':
+            return
+        if self._movement:
+            self._movement.write_back(self.tamagotchis)
+        living = [pet for pet in self.tamagotchis.values() if pet.is_alive]
+        if not living:
+            return
+        if self._journal is None:
+            rows = [(pet.x, pet.y, pet.direction, pet.id) for pet in living]
+            self.writer.submit(save_tamagotchi_positions, rows)
+            return
+        records = [{'op': 'pos', 'data': {pet.id: [pet.x, pet.y, pet.direction] for pet in living}}]
+        self._journal.stamp(records)
+        self.writer.submit(self._journal.write, records)
+
+    async def _cursor_broadcast_loop(self):
+        while True:
+            await asyncio.sleep(1.0 / CURSOR_BROADCAST_HZ)
+            frame = self.next_cursors_frame()
+            if frame:
+                self.broker.publish(TOPIC_CURSORS, frame['data'])
+                if self.manager:
+                    await self.manager.broadcast(frame)
+
+    def next_cursors_frame(self) -> Optional[dict]:
+        """One 'cursors' frame with every cursor that moved far enough since it was last sent."""
+        if not self._cursor_moves:
+            return None
+        moves, self._cursor_moves = self._cursor_moves, {}
+        cursors = []
+        for user_id, mouse_data in moves.items():
+            x, y = mouse_data['x'], mouse_data['y']
+            last = self._cursor_sent.get(user_id)
+            if last is not None and math.hypot(x - last[0], y - last[1]) < CURSOR_MIN_DISTANCE:
+                continue
+            self._cursor_sent[user_id] = (x, y)
+            cursors.append(mouse_data)
+        if not cursors:
+            return None
+        return {'type': 'cursors', 'data': cursors}
+
+    def _mark_dirty(self, tamagotchi_id: str):
+        """Record that a pet changed (or was removed) since the last save."""
+        self._dirty_pets.add(tamagotchi_id)
+        self._dirty = True
+        self.snapshots.bump()
+        if self.cluster:
+            self._replica_pets.add(tamagotchi_id)
+
+    def _user_changed(self, user_id: str):
+        self.snapshots.bump()
+        if self.cluster:
+            self._replica_users.add(user_id)
+
+    @property
+    def generation(self) -> int:
+        """World generation; bumped by every structural mutation and stats tick.
+
+        Movement and cursors bump their own live versions instead (see
+        SnapshotCache.bump_live).
+        """
+        return self.snapshots.generation
+
+    def get_world_users(self) -> List[User]:
+        """Every cached user, built once per generation / cursor version and shared by readers."""
+        return self.snapshots.get(
+            'users', lambda: [User(**data) for data in self.users.values()], live=('cursors',)
+        )
+
+    def world_snapshot(self) -> tuple:
+        """``(etag, body)``: the pre-serialized world without positions and cursors.
+
+        It only changes with the generation, so clients revalidating it get
+        304s between structural changes; see ``live_snapshot`` for the rest.
+        """
+        return self.snapshots.etag, self.snapshots.get('http', self._serialize_world)
+
+    @property
+    def live_etag(self) -> str:
+        return self.snapshots.live_etag(self._LIVE_SNAPSHOT)
+
+    def live_snapshot(self) -> tuple:
+        """``(etag, body)``: every pet position and user cursor, with its own ETag."""
+        return self.live_etag, self.snapshots.get('http_live', self._serialize_live, live=self._LIVE_SNAPSHOT)
+
+    def _serialize_world(self) -> bytes:
+        # Age is left out (clients derive it from created_at) so the world,
+        # and its ETag, only change when a pet or user does
+        pets = []
+        for pet in self.tamagotchis.values():
+            data = pet.to_dict()
+            del data['position'], data['age']
+            pets.append(data)
+        users = []
+        for user in self.users.values():
+            data = dict(user)
+            del data['mouse_x'], data['mouse_y']
+            users.append(data)
+        return json.dumps({
+            'generation': self.generation,
+            'tamagotchis': pets,
+            'users': users,
+        }, separators=(',', ':')).encode()
+
+    def _serialize_live(self) -> bytes:
+        if self._movement:
+            self._movement.write_back(self.tamagotchis)
+        return json.dumps({
+            'generation': self.generation,
+            'positions': [
+                {'id': pet.id, 'x': pet.x, 'y': pet.y, 'direction': pet.direction}
+                for pet in self.tamagotchis.values()
+            ],
+            'cursors': [
+                {'user_id': user['id'], 'x': user['mouse_x'], 'y': user['mouse_y']}
+                for user in self.users.values()
+            ],
+        }, separators=(',', ':')).encode()
+
+    def save_data(self, full: bool = False):
+        """Persist pending changes; ``full`` writes the complete world (e.g. on shutdown)."""
+        if self._persistence_mode == 'sqlite':
+            self._save_rows(full)
+            return
+        if self._journal is None or full:
+            self._write_snapshot()
+            return
+        # Journal mode: append only what changed; compact into a snapshot
+        # once the journal is long or old enough
+        records = self._drain_journal_records()
+        if records:
+            self._journal.stamp(records)
+            self.writer.submit(self._journal.write, records)
+        if (self._journal.records >= JOURNAL_COMPACT_RECORDS
+                or time.monotonic() - self._last_snapshot >= JOURNAL_COMPACT_INTERVAL_SEC):
+            self._write_snapshot()
+
+    def _drain_journal_records(self) -> List[dict]:
+        """Change records for every dirty pet and mouse entry; clears the dirty sets."""
+        records = []
+        for pet_id in self._dirty_pets:
+            pet = self.tamagotchis.get(pet_id)
+            if pet is None:
+                records.append({'op': 'del', 'id': pet_id})
+            else:
+                if self._movement:
+                    self._movement.sync_position(pet)
+                records.append({'op': 'put', 'id': pet_id, 'pet': pet.to_dict()})
+        for user_id in self._dirty_mice:
+            if user_id in self.mouse_positions:
+                records.append({'op': 'mouse', 'id': user_id, 'data': dict(self.mouse_positions[user_id])})
+        self._dirty_pets = set()
+        self._dirty_mice = set()
+        return records
+
+    def _save_rows(self, full: bool = False):
+        """Write dirty pets (or all of them) to SQLite in one transaction."""
+        if full:
+            if self._movement:
+                self._movement.write_back(self.tamagotchis)
+            changed = self.tamagotchis.values()
+        else:
+            changed = []
+            for pet_id in self._dirty_pets:
+                pet = self.tamagotchis.get(pet_id)
+                if pet is not None:
+                    if self._movement:
+                        self._movement.sync_position(pet)
+                    changed.append(pet)
+        deleted = [pet_id for pet_id in self._dirty_pets if pet_id not in self.tamagotchis]
+        self._dirty_pets = set()
+        # Cursor coordinates already live in the users table
+        self._dirty_mice = set()
+        if not changed and not deleted:
+            return
+        # Row tuples are immutable copies, safe to hand to the writer thread
+        rows = [tamagotchi_to_row(pet) for pet in changed]
+        self.writer.submit(save_tamagotchi_rows, rows, deleted)
+
+    def _write_snapshot(self):
         # Persist only non-sensitive game data to JSON; users are in SQLite
+        if self._movement:
+            self._movement.write_back(self.tamagotchis)
         data = {
-            'tamagotchis': self.tamagotchis,
-            'mouse_positions': self.mouse_positions
+            'tamagotchis': {pet_id: pet.to_dict() for pet_id, pet in self.tamagotchis.items()},
+            'mouse_positions': {user_id: dict(m) for user_id, m in self.mouse_positions.items()},
         }
-        with open('game_data.json', 'w') as f:
-            json.dump(data, f, indent=2)
+        self._dirty_pets = set()
+        self._dirty_mice = set()
+        if self._journal is None:
+            self.writer.submit_snapshot(DATA_FILE, data, indent=2)
+            return
+        # The snapshot records the last journal seq it covers; recovery replays
+        # only newer records. Journal writes queued before it land first, and
+        # the truncate runs on the writer once the snapshot is on disk.
+        data['journal_seq'] = self._journal.seq
+        self._journal.reset()
+        self._last_snapshot = time.monotonic()
+        self.writer.submit_snapshot(DATA_FILE, data, after=self._journal.truncate)
     
     def load_data(self):
-        if os.path.exists('game_data.json'):
-            with open('game_data.json', 'r') as f:
+        snapshot_seq = 0
+        if self._persistence_mode == 'sqlite':
+            # Pets live in SQLite (migrated from JSON on first start)
+            self.tamagotchis = load_tamagotchis()
+        elif os.path.exists(DATA_FILE):
+            with open(DATA_FILE, 'r') as f:
                 data = json.load(f)
-                self.tamagotchis = data.get('tamagotchis', {})
+                self.tamagotchis = {
+                    pet_id: PetRecord.from_dict(pet) for pet_id, pet in data.get('tamagotchis', {}).items()
+                }
                 self.mouse_positions = data.get('mouse_positions', {})
+                snapshot_seq = int(data.get('journal_seq', 0) or 0)
+        if self._journal:
+            # Replay changes made after the snapshot
+            for record in self._journal.replay(snapshot_seq):
+                op = record.get('op')
+                if op == 'put':
+                    self.tamagotchis[record['id']] = PetRecord.from_dict(record['pet'])
+                elif op == 'del':
+                    self.tamagotchis.pop(record['id'], None)
+                elif op == 'mouse':
+                    self.mouse_positions[record['id']] = record['data']
+                elif op == 'pos':
+                    for pet_id, (x, y, direction) in record['data'].items():
+                        pet = self.tamagotchis.get(pet_id)
+                        if pet is not None:
+                            pet.x, pet.y, pet.direction = x, y, direction
+        if self._movement:
+            self._movement.rebuild(self.tamagotchis)
+
+    def _rebuild_indexes(self):
+        """Rebuild owner index and decay deadlines (needs users for difficulty)."""
+        self._index.clear()
+        self._decay.clear()
+        self._grid.clear()
+        for pet in self.tamagotchis.values():
+            self._index.update(pet)
+            self._schedule_decay(pet)
+            self._grid.update(pet.id, pet.x, pet.y)
 
     def _load_users_from_db(self):
         """Populate in-memory user cache from SQLite (without password hashes)."""
-        conn = get_connection()
-        try:
-            cur = conn.cursor()
-            cur.execute(
-                "SELECT id, username, created_at, mouse_x, mouse_y, is_online, difficulty FROM users"
-            )
-            rows = cur.fetchall()
-            self.users = {}
-            for r in rows:
-                self.users[r['id']] = {
-                    'id': r['id'],
-                    'username': r['username'],
-                    'created_at': r['created_at'],
-                    'mouse_x': float(r['mouse_x'] or 0.0),
-                    'mouse_y': float(r['mouse_y'] or 0.0),
-                    'is_online': bool(r['is_online']),
-                    'difficulty': float(r['difficulty'] or 1.0),
-                }
-        finally:
-            conn.close()
+        cur = get_connection().execute(
+            "SELECT id, username, created_at, mouse_x, mouse_y, is_online, difficulty FROM users"
+        )
+        rows = cur.fetchall()
+        self.users = {}
+        for r in rows:
+            self.users[r['id']] = {
+                'id': r['id'],
+                'username': r['username'],
+                'created_at': r['created_at'],
+                'mouse_x': float(r['mouse_x'] or 0.0),
+                'mouse_y': float(r['mouse_y'] or 0.0),
+                'is_online': bool(r['is_online']),
+                'difficulty': float(r['difficulty'] or 1.0),
+            }
     
     def create_user(self, username: str, password: str) -> User:
         """Create a new user and persist to SQLite (password hashed)."""
-        conn = get_connection()
+        self._check_username_free(username)
+        return self._insert_user(username, pwd_context.hash(password))
+
+    async def create_user_async(self, username: str, password: str) -> User:
+        """create_user with the password hashed in the hasher's process pool."""
+        self._check_username_free(username)
+        hashed_password = await self.hasher.hash(password)
+        user = self._insert_user(username, hashed_password)
+        if self.follower:
+            # The owner tracks presence and difficulty; have it load the new row
+            await self.submit('refresh_user', user.id)
+        return user
+
+    def _check_username_free(self, username: str):
+        if get_connection().execute("SELECT 1 FROM users WHERE username = ?", (username,)).fetchone():
+            raise ValueError("Username already exists")
+
+    def _insert_user(self, username: str, hashed_password: str) -> User:
+        user_id = str(uuid.uuid4())
+        now = datetime.now().isoformat()
         try:
-            cur = conn.cursor()
-            # Check username uniqueness
-            cur.execute("SELECT 1 FROM users WHERE username = ?", (username,))
-            if cur.fetchone():
-                raise ValueError("Username already exists")
-
-            user_id = str(uuid.uuid4())
-            hashed_password = pwd_context.hash(password)
-            now = datetime.now().isoformat()
-
-            cur.execute(
-                """
-                INSERT INTO users (
-                    id, username, password_hash, created_at, mouse_x, mouse_y, is_online, difficulty
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-                """,
-                (user_id, username, hashed_password, now, 0.0, 0.0, 0, 1.0),
-            )
-            conn.commit()
-
-            # Update in-memory cache (no password)
-            self.users[user_id] = {
-                'id': user_id,
-                'username': username,
-                'created_at': now,
-                'mouse_x': 0.0,
-                'mouse_y': 0.0,
-                'is_online': False,
-                'difficulty': 1.0,
-            }
-            return User(**self.users[user_id])
-        finally:
-            conn.close()
+            with get_connection() as conn:
+                conn.execute(
+                    """
+                    INSERT INTO users (
+                        id, username, password_hash, created_at, mouse_x, mouse_y, is_online, difficulty
+                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                    """,
+                    (user_id, username, hashed_password, now, 0.0, 0.0, 0, 1.0),
+                )
+        except sqlite3.IntegrityError:
+            # Taken by a concurrent registration while the password was hashing
+            raise ValueError("Username already exists")
+
+        # Update in-memory cache (no password)
+        self.users[user_id] = {
+            'id': user_id,
+            'username': username,
+            'created_at': now,
+            'mouse_x': 0.0,
+            'mouse_y': 0.0,
+            'is_online': False,
+            'difficulty': 1.0,
+        }
+        self._user_changed(user_id)
+        return User(**self.users[user_id])
     
     def authenticate_user(self, username: str, password: str) -> Optional[User]:
         """Verify credentials against SQLite and return the user sans password on success."""
-        conn = get_connection()
-        try:
-            cur = conn.cursor()
-            cur.execute(
-                "SELECT id, username, password_hash, created_at, mouse_x, mouse_y, is_online, difficulty FROM users WHERE username = ?",
-                (username,)
-            )
-            row = cur.fetchone()
-            if not row:
-                return None
-            if not pwd_context.verify(password, row['password_hash']):
-                return None
-            user = {
-                'id': row['id'],
-                'username': row['username'],
-                'created_at': row['created_at'],
-                'mouse_x': float(row['mouse_x'] or 0.0),
-                'mouse_y': float(row['mouse_y'] or 0.0),
-                'is_online': bool(row['is_online']),
-                'difficulty': float(row['difficulty'] or 1.0),
-            }
-            # Keep cache in sync
+        row = self._credentials(username)
+        if not row or not pwd_context.verify(password, row['password_hash']):
+            return None
+        return self._cache_user_row(row)
+
+    async def authenticate_user_async(self, username: str, password: str) -> Optional[User]:
+        """authenticate_user with verification in the hasher's process pool."""
+        row = self._credentials(username)
+        if not row or not await self.hasher.verify(password, row['password_hash']):
+            return None
+        return self._cache_user_row(row)
+
+    def _credentials(self, username: str):
+        return get_connection().execute(
+            "SELECT id, username, password_hash, created_at, mouse_x, mouse_y, is_online, difficulty FROM users WHERE username = ?",
+            (username,)
+        ).fetchone()
+
+    def _cache_user_row(self, row) -> User:
+        user = {
+            'id': row['id'],
+            'username': row['username'],
+            'created_at': row['created_at'],
+            'mouse_x': float(row['mouse_x'] or 0.0),
+            'mouse_y': float(row['mouse_y'] or 0.0),
+            'is_online': bool(row['is_online']),
+            'difficulty': float(row['difficulty'] or 1.0),
+        }
+        # Keep cache in sync
+        if self.users.get(user['id']) != user:
             self.users[user['id']] = user
-            return User(**user)
-        finally:
-            conn.close()
+            self._user_changed(user['id'])
+        return User(**user)
     
     def get_user(self, user_id: str) -> Optional[User]:
         """Fetch user by id from cache or SQLite."""
         data = self.users.get(user_id)
         if data:
             return User(**data)
-        conn = get_connection()
-        try:
-            cur = conn.cursor()
-            cur.execute(
-                "SELECT id, username, created_at, mouse_x, mouse_y, is_online, difficulty FROM users WHERE id = ?",
-                (user_id,)
-            )
-            row = cur.fetchone()
-            if not row:
-                return None
-            data = {
-                'id': row['id'],
-                'username': row['username'],
-                'created_at': row['created_at'],
-                'mouse_x': float(row['mouse_x'] or 0.0),
-                'mouse_y': float(row['mouse_y'] or 0.0),
-                'is_online': bool(row['is_online']),
-                'difficulty': float(row['difficulty'] or 1.0),
-            }
-            self.users[user_id] = data
-            return User(**data)
-        finally:
-            conn.close()
+        row = get_connection().execute(
+            "SELECT id, username, created_at, mouse_x, mouse_y, is_online, difficulty FROM users WHERE id = ?",
+            (user_id,)
+        ).fetchone()
+        if not row:
+            return None
+        return self._cache_user_row(row)
+
+    def refresh_user(self, user_id: str) -> Optional[User]:
+        """Reload one user from SQLite (a row another worker inserted)."""
+        self.users.pop(user_id, None)
+        return self.get_user(user_id)
+
+    def get_users(self, user_ids: List[str]) -> List[Optional[User]]:
+        """Fetch many users (in order) from cache, loading all misses with batched queries."""
+        missing = {uid for uid in user_ids if uid not in self.users}
+        for row in load_user_rows(missing):
+            self._cache_user_row(row)
+        return [User(**self.users[uid]) if uid in self.users else None for uid in user_ids]
 
     def set_user_difficulty(self, user_id: str, difficulty: float) -> Optional[User]:
         """Set per-user stat deterioration multiplier (clamped between 0.25 and 4)."""
@@ -236,107 +632,103 @@ class GameStorage:
         d = max(0.25, min(4.0, d))
         data['difficulty'] = d
         self.users[user_id] = data
+        self._user_changed(user_id)
         # Persist to SQLite
-        conn = get_connection()
-        try:
-            cur = conn.cursor()
-            cur.execute("UPDATE users SET difficulty = ? WHERE id = ?", (d, user_id))
-            conn.commit()
-        finally:
-            conn.close()
+        with get_connection() as conn:
+            conn.execute("UPDATE users SET difficulty = ? WHERE id = ?", (d, user_id))
+        # Decay rates changed: move this owner's deadlines only
+        for pet_id in self._index.owned_by(user_id):
+            with self._editing(pet_id) as pet:
+                if pet:
+                    self._schedule_decay(pet)
         self.schedule_save()
         return self.get_user(user_id)
     
-    def create_tamagotchi(self, name: str, owner_id: str) -> Tamagotchi:
+    def create_tamagotchi(self, name: str, owner_id: str) -> PetRecord:
         tamagotchi_id = str(uuid.uuid4())
-        now = datetime.now().isoformat()
+        now = time.time()
         
         # Random starting position
         x = random.uniform(50, GAME_AREA_WIDTH - 50)
         y = random.uniform(50, GAME_AREA_HEIGHT - 50)
         direction = random.uniform(0, 2 * math.pi)
         
-        tamagotchi_data = {
-            'id': tamagotchi_id,
-            'name': name,
-            'owner_id': owner_id,
-            'happiness': 100,
-            'hunger': 0,
-            'energy': 100,
-            'health': 100,
-            'age': 0,
-            'last_fed': now,
-            'last_played': now,
-            'last_slept': now,
-            'created_at': now,
-            'is_alive': True,
-            'status': 'Happy',
-            'position': {
-                'x': x,
-                'y': y,
-                'direction': direction,
-                'speed': 1.0
-            },
-            'emoji': random.choice(TAMAGOTCHI_EMOJIS)
-        }
+        pet = PetRecord(
+            id=tamagotchi_id,
+            name=name,
+            owner_id=owner_id,
+            last_fed=now,
+            last_played=now,
+            last_slept=now,
+            created_at=now,
+            x=x,
+            y=y,
+            direction=direction,
+            emoji=random.choice(TAMAGOTCHI_EMOJIS),
+        )
         
-        self.tamagotchis[tamagotchi_id] = tamagotchi_data
+        self.tamagotchis[tamagotchi_id] = pet
+        if self._movement:
+            self._movement.add(pet)
+        self._index.update(pet)
+        self._schedule_decay(pet)
+        self._grid.update(tamagotchi_id, x, y)
+        self._mark_dirty(tamagotchi_id)
         # Major event: flush immediately to persist creation
         self.flush_save()
         
         # Broadcast new tamagotchi
+        self._publish_pet(TOPIC_CREATED, pet)
         if self.manager:
             asyncio.create_task(self.manager.broadcast({
                 'type': 'tamagotchi_created',
-                'tamagotchi': tamagotchi_data
+                'tamagotchi': pet.to_dict()
             }))
         
-        return self._dict_to_tamagotchi(tamagotchi_data)
-    
-    def _dict_to_tamagotchi(self, data: dict) -> Tamagotchi:
-        position = Position(**data['position'])
-        return Tamagotchi(
-            id=data['id'],
-            name=data['name'],
-            owner_id=data['owner_id'],
-            happiness=data['happiness'],
-            hunger=data['hunger'],
-            energy=data['energy'],
-            health=data['health'],
-            age=data['age'],
-            last_fed=data['last_fed'],
-            last_played=data['last_played'],
-            last_slept=data['last_slept'],
-            created_at=data['created_at'],
-            is_alive=data['is_alive'],
-            status=data['status'],
-            position=position,
-            emoji=data['emoji']
-        )
+        return pet
     
-    def get_all_tamagotchis(self) -> List[Tamagotchi]:
-        return [self._dict_to_tamagotchi(data) for data in self.tamagotchis.values()]
+    def _synced(self, pet: PetRecord) -> PetRecord:
+        """The record with its position copied from the movement engine."""
+        if self._movement:
+            self._movement.sync_position(pet)
+        return pet
+
+    def get_all_tamagotchis(self, owner_id: Optional[str] = None, alive: Optional[bool] = None,
+                            status: Optional[str] = None) -> List[PetRecord]:
+        if owner_id is None and alive is None and status is None:
+            if self._movement:
+                self._movement.write_back(self.tamagotchis)
+            return list(self.tamagotchis.values())
+        ids = self._index.sorted_ids(owner_id, alive, status)
+        return [self._synced(self.tamagotchis[pet_id]) for pet_id in ids]
     
-    def get_user_tamagotchis(self, user_id: str) -> List[Tamagotchi]:
-        return [self._dict_to_tamagotchi(data) for data in self.tamagotchis.values() 
-                if data['owner_id'] == user_id]
+    def get_tamagotchi(self, tamagotchi_id: str) -> Optional[PetRecord]:
+        pet = self.tamagotchis.get(tamagotchi_id)
+        return self._synced(pet) if pet else None
+
+    def get_user_tamagotchis(self, user_id: str) -> List[PetRecord]:
+        return self.get_all_tamagotchis(owner_id=user_id)
+
+    def page_tamagotchis(self, first: int, after: Optional[tuple] = None, owner_id: Optional[str] = None,
+                         alive: Optional[bool] = None, status: Optional[str] = None):
+        """One page of matching pets in creation order.
+
+        ``after`` is the ``(created_at microseconds, id)`` key of the last pet
+        already seen. Returns ``(edges, has_previous, has_next, total)`` where
+        edges are ``(key, PetRecord)``.
+        """
+        page, has_previous, has_next = self._index.page(after, first, owner_id, alive, status)
+        edges = [(self._index.order[pet_id], self._synced(self.tamagotchis[pet_id])) for pet_id in page]
+        return edges, has_previous, has_next, len(self._index.select(owner_id, alive, status))
     
     def update_mouse_position(self, user_id: str, x: float, y: float):
         if user_id in self.users:
             self.users[user_id]['mouse_x'] = x
             self.users[user_id]['mouse_y'] = y
-            # Persist to SQLite
-            conn = get_connection()
-            try:
-                cur = conn.cursor()
-                cur.execute(
-                    "UPDATE users SET mouse_x = ?, mouse_y = ? WHERE id = ?",
-                    (float(x), float(y), user_id)
-                )
-                conn.commit()
-            finally:
-                conn.close()
-            
+            self.snapshots.bump_live('cursors')
+            # Persisted in batches by _mouse_flush_loop
+            self._pending_mouse[user_id] = (float(x), float(y))
+
             mouse_data = {
                 'user_id': user_id,
                 'username': self.users[user_id]['username'],
@@ -346,129 +738,177 @@ class GameStorage:
             }
             
             self.mouse_positions[user_id] = mouse_data
-            
-            # Broadcast mouse position
-            if self.manager:
-                asyncio.create_task(self.manager.broadcast({
-                    'type': 'mouse_position',
-                    'data': mouse_data
-                }))
+            self._dirty_mice.add(user_id)
+            # Broadcast with the next 'cursors' frame
+            self._cursor_moves[user_id] = mouse_data
 
     def set_user_online(self, user_id: str, is_online: bool):
         """Set a user's online flag and persist to SQLite."""
         if user_id in self.users:
             self.users[user_id]['is_online'] = bool(is_online)
+            self._user_changed(user_id)
             # Persist to SQLite
-            conn = get_connection()
-            try:
-                cur = conn.cursor()
-                cur.execute(
+            with get_connection() as conn:
+                conn.execute(
                     "UPDATE users SET is_online = ? WHERE id = ?",
                     (1 if is_online else 0, user_id)
                 )
-                conn.commit()
-            finally:
-                conn.close()
             self.schedule_save()
 
-    def update_tamagotchi_location(self, tamagotchi_id: str, x: float, y: float) -> Optional[Tamagotchi]:
+    def update_tamagotchi_location(self, tamagotchi_id: str, x: float, y: float) -> Optional[PetRecord]:
         """Update a single Tamagotchi's position and broadcast the change."""
-        data = self.tamagotchis.get(tamagotchi_id)
-        if not data:
+        pet = self.tamagotchis.get(tamagotchi_id)
+        if not pet:
             return None
 
+        positions = PositionColumns()
+        self._apply_location(pet, x, y, positions)
+        # Position changes aren’t critical; schedule to reduce write spam
+        self.schedule_save()
+
+        # Broadcast single position update so other clients can reflect it quickly
+        self._broadcast_positions(positions)
+        return pet
+
+    def update_tamagotchi_locations(self, owner_user_id: str, moves: List[tuple]) -> List[PetRecord]:
+        """Apply many ``(id, x, y)`` moves for one owner with a single save and broadcast.
+
+        Moves for pets that are missing or owned by someone else are skipped;
+        the returned list holds only the pets that moved.
+        """
+        owned = self._index.owned_by(owner_user_id)
+        latest = {}
+        for tamagotchi_id, x, y in moves:
+            if tamagotchi_id in owned:
+                latest[tamagotchi_id] = (x, y)  # last move per pet wins
+        if not latest:
+            return []
+        positions = PositionColumns()
+        moved = []
+        for tamagotchi_id, (x, y) in latest.items():
+            pet = self.tamagotchis[tamagotchi_id]
+            self._apply_location(pet, x, y, positions)
+            moved.append(pet)
+        self.schedule_save()
+        self._broadcast_positions(positions)
+        return moved
+
+    def _apply_location(self, pet: PetRecord, x: float, y: float, positions: PositionColumns):
+        """Move a pet (clamped to the game area) and add its entry to ``positions``."""
+        tamagotchi_id = pet.id
         # Clamp within game area bounds
         x = max(0, min(GAME_AREA_WIDTH, x))
         y = max(0, min(GAME_AREA_HEIGHT, y))
 
-        pos = data.get('position', {})
-        pos['x'] = x
-        pos['y'] = y
-        # Ensure position exists with defaults
-        if 'direction' not in pos:
-            pos['direction'] = 0.0
-        if 'speed' not in pos:
-            pos['speed'] = 1.0
-        data['position'] = pos
-
-        self.tamagotchis[tamagotchi_id] = data
-        # Position changes aren’t critical; schedule to reduce write spam
-        self.schedule_save()
+        if self._movement:
+            self._movement.set_position(tamagotchi_id, x, y)
+            self._movement.sync_position(pet)
+        pet.x = x
+        pet.y = y
+        self._grid.update(tamagotchi_id, x, y)
+        self._mark_dirty(tamagotchi_id)
+        positions.append(tamagotchi_id, x, y, pet.direction)
 
-        # Broadcast single position update so other clients can reflect it quickly
+    def _broadcast_positions(self, positions: PositionColumns):
+        self.broker.publish(TOPIC_POSITIONS, positions)
         if self.manager:
-            asyncio.create_task(self.manager.broadcast({
-                'type': 'position_update',
-                'positions': [{
-                    'id': tamagotchi_id,
-                    'x': x,
-                    'y': y,
-                    'direction': pos['direction']
-                }]
-            }))
+            asyncio.create_task(self.manager.broadcast_positions(positions))
 
-        return self._dict_to_tamagotchi(data)
+    @staticmethod
+    def _update_status(pet: PetRecord):
+        """Re-evaluate a pet's status (and death) from its stats."""
+        if pet.health <= 0:
+            pet.is_alive = False
+            pet.status = 'Dead'
+        elif pet.hunger > 80:
+            pet.status = 'Starving'
+        elif pet.energy < 20:
+            pet.status = 'Tired'
+        elif pet.happiness < 30:
+            pet.status = 'Sad'
+        else:
+            pet.status = 'Happy'
 
-    def support_tamagotchi(self, supporter_user_id: str, tamagotchi_id: str) -> Optional[Tamagotchi]:
-        data = self.tamagotchis.get(tamagotchi_id)
-        if not data:
-            return None
-        # Cannot support dead pets
-        if not data.get('is_alive', True):
-            return None
-        # Only non-owner can support
-        if data.get('owner_id') == supporter_user_id:
-            return None
+    def support_tamagotchi(self, supporter_user_id: str, tamagotchi_id: str) -> Optional[PetRecord]:
+        with self._editing(tamagotchi_id) as pet:
+            if not pet:
+                return None
+            # Cannot support dead pets
+            if not pet.is_alive:
+                return None
+            # Only non-owner can support
+            if pet.owner_id == supporter_user_id:
+                return None
 
-        # Determine lowest stat; treat hunger inversely (lower hunger is good)
-        stats = {
-            'happiness': data.get('happiness', 0),
-            'energy': data.get('energy', 0),
-            'health': data.get('health', 0),
-        }
-        hunger_val = data.get('hunger', 0)
-        lowest_key = min(list(stats.keys()) + ['hunger'], key=lambda k: hunger_val if k == 'hunger' else stats[k])
+            # Determine lowest stat; treat hunger inversely (lower hunger is good)
+            stats = {
+                'happiness': pet.happiness,
+                'energy': pet.energy,
+                'health': pet.health,
+            }
+            hunger_val = pet.hunger
+            lowest_key = min(list(stats.keys()) + ['hunger'], key=lambda k: hunger_val if k == 'hunger' else stats[k])
 
-        if lowest_key == 'hunger':
-            data['hunger'] = max(0, hunger_val - 1)
-        else:
-            data[lowest_key] = min(100, data[lowest_key] + 1)
-
-        # Update status
-        if data['health'] <= 0:
-            data['is_alive'] = False
-            data['status'] = 'Dead'
-        elif data['hunger'] > 80:
-            data['status'] = 'Starving'
-        elif data['energy'] < 20:
-            data['status'] = 'Tired'
-        elif data['happiness'] < 30:
-            data['status'] = 'Sad'
-        else:
-            data['status'] = 'Happy'
+            if lowest_key == 'hunger':
+                pet.hunger = max(0, hunger_val - 1)
+            else:
+                setattr(pet, lowest_key, min(100, stats[lowest_key] + 1))
+            self._schedule_decay(pet, ())
 
+        self._update_status(pet)
+        self._index.update(pet)
+
+        self._mark_dirty(tamagotchi_id)
         # Minor change: debounce; on death flush immediately
-        if data['is_alive']:
+        if pet.is_alive:
             self.schedule_save()
         else:
+            self._sync_alive(pet)
             self.flush_save()
 
-        t = self._dict_to_tamagotchi(data)
+        self._broadcast_pet_stats(pet)
+        return self._synced(pet)
+
+    def _broadcast_pet_stats(self, pet: PetRecord):
+        """Broadcast one pet's full stat block and make it the delta baseline."""
+        self._stat_deltas.record(pet)
+        self._publish_pet(TOPIC_STATS, pet)
         if self.manager:
             asyncio.create_task(self.manager.broadcast({
                 'type': 'stats_update',
                 'tamagotchi': {
-                    'id': t.id,
-                    'happiness': t.happiness,
-                    'hunger': t.hunger,
-                    'energy': t.energy,
-                    'health': t.health,
-                    'age': t.age,
-                    'status': t.status,
-                    'is_alive': t.is_alive
+                    'id': pet.id,
+                    'happiness': pet.happiness,
+                    'hunger': pet.hunger,
+                    'energy': pet.energy,
+                    'health': pet.health,
+                    'status': pet.status,
+                    'is_alive': pet.is_alive
                 }
             }))
-        return t
+
+    def _publish_pet(self, topic: str, pet: PetRecord):
+        """Publish a pet event, routed to subscribers of the pet and of its owner."""
+        if self.broker.has_subscribers(topic):
+            self.broker.publish(
+                topic,
+                {'id': pet.id, 'owner_id': pet.owner_id},
+                keys=(('pet', pet.id), ('owner', pet.owner_id)),
+            )
+
+    def stats_keyframe(self, record: bool = False) -> dict:
+        """Full stats_update frame for every pet (sent on resync and periodically)."""
+        return {
+            'type': 'stats_update',
+            'keyframe': True,
+            'tamagotchis': self._stat_deltas.keyframe(self.tamagotchis.values(), record=record),
+            'version': self._stat_deltas.version,
+        }
+
+    def _sync_alive(self, pet: PetRecord):
+        """Mirror a pet's alive flag into the movement engine."""
+        if self._movement:
+            self._movement.set_alive(pet.id, pet.is_alive)
 
     def _owner_difficulty(self, owner_id: str) -> float:
         """Helper to fetch owner's difficulty multiplier with default 1.0."""
@@ -478,200 +918,157 @@ class GameStorage:
         except Exception:
             return 1.0
 
-    def feed_tamagotchi(self, owner_user_id: str, tamagotchi_id: str) -> Optional[Tamagotchi]:
-        data = self.tamagotchis.get(tamagotchi_id)
-        if not data:
-            return None
-        if data.get('owner_id') != owner_user_id:
-            return None
-        if not data.get('is_alive', True):
-            return None
-        # Reduce hunger, slightly improve health, update last_fed
-        data['hunger'] = max(0, data.get('hunger', 0) - 15)
-        if data.get('hunger', 0) < 80:
-            data['health'] = min(100, data.get('health', 0) + 2)
-        data['last_fed'] = datetime.now().isoformat()
-        # Re-evaluate status
-        if data['health'] <= 0:
-            data['is_alive'] = False
-            data['status'] = 'Dead'
-        elif data['hunger'] > 80:
-            data['status'] = 'Starving'
-        elif data['energy'] < 20:
-            data['status'] = 'Tired'
-        elif data['happiness'] < 30:
-            data['status'] = 'Sad'
-        else:
-            data['status'] = 'Happy'
-        if data['is_alive']:
-            self.schedule_save()
-        else:
-            self.flush_save()
-        t = self._dict_to_tamagotchi(data)
-        if self.manager:
-            asyncio.create_task(self.manager.broadcast({
-                'type': 'stats_update',
-                'tamagotchi': {
-                    'id': t.id,
-                    'happiness': t.happiness,
-                    'hunger': t.hunger,
-                    'energy': t.energy,
-                    'health': t.health,
-                    'age': t.age,
-                    'status': t.status,
-                    'is_alive': t.is_alive
-                }
-            }))
-        return t
+    @staticmethod
+    def _is_critical(pet: PetRecord) -> bool:
+        """Whether health is draining this tick."""
+        return pet.hunger > 80 or pet.happiness < 20 or pet.energy < 20
 
-    def play_tamagotchi(self, owner_user_id: str, tamagotchi_id: str) -> Optional[Tamagotchi]:
-        data = self.tamagotchis.get(tamagotchi_id)
-        if not data:
-            return None
-        if data.get('owner_id') != owner_user_id:
-            return None
-        if not data.get('is_alive', True):
-            return None
-        # Increase happiness, small energy cost, update last_played
-        data['happiness'] = min(100, data.get('happiness', 0) + 12)
-        data['energy'] = max(0, data.get('energy', 0) - 5)
-        data['last_played'] = datetime.now().isoformat()
-        # Re-evaluate status
-        if data['health'] <= 0:
-            data['is_alive'] = False
-            data['status'] = 'Dead'
-        elif data['hunger'] > 80:
-            data['status'] = 'Starving'
-        elif data['energy'] < 20:
-            data['status'] = 'Tired'
-        elif data['happiness'] < 30:
-            data['status'] = 'Sad'
-        else:
-            data['status'] = 'Happy'
-        if data['is_alive']:
-            self.schedule_save()
-        else:
-            self.flush_save()
-        t = self._dict_to_tamagotchi(data)
-        if self.manager:
-            asyncio.create_task(self.manager.broadcast({
-                'type': 'stats_update',
-                'tamagotchi': {
-                    'id': t.id,
-                    'happiness': t.happiness,
-                    'hunger': t.hunger,
-                    'energy': t.energy,
-                    'health': t.health,
-                    'age': t.age,
-                    'status': t.status,
-                    'is_alive': t.is_alive
-                }
-            }))
-        return t
+    def _schedule_decay(self, pet: PetRecord, kinds=None):
+        """(Re)compute a pet's decay deadlines from its timestamps.
 
-    def sleep_tamagotchi(self, owner_user_id: str, tamagotchi_id: str) -> Optional[Tamagotchi]:
-        data = self.tamagotchis.get(tamagotchi_id)
-        if not data:
-            return None
-        if data.get('owner_id') != owner_user_id:
-            return None
-        if not data.get('is_alive', True):
-            return None
-        # Increase energy, small happiness drop if over-slept
-        data['energy'] = min(100, data.get('energy', 0) + 15)
-        if data['energy'] > 90:
-            data['happiness'] = max(0, data.get('happiness', 0) - 2)
-        data['last_slept'] = datetime.now().isoformat()
-        # Re-evaluate status
-        if data['health'] <= 0:
-            data['is_alive'] = False
-            data['status'] = 'Dead'
-        elif data['hunger'] > 80:
-            data['status'] = 'Starving'
-        elif data['energy'] < 20:
-            data['status'] = 'Tired'
-        elif data['happiness'] < 30:
-            data['status'] = 'Sad'
-        else:
-            data['status'] = 'Happy'
-        if data['is_alive']:
+        ``kinds`` limits which of DECAY_RULES are recomputed (all by default);
+        the health drain is (re)armed whenever the pet is in a critical state.
+        """
+        pet_id = pet.id
+        # Difficulty modifier from owner (>=0.25, <=4.0); higher = faster deterioration
+        diff = max(0.25, min(4.0, self._owner_difficulty(pet.owner_id)))
+        if self.shards:
+            # The owning shard's worker runs decay from the pet's timestamps
+            self.shards.set_stats(pet, diff)
+            return
+        if not pet.is_alive:
+            self._decay.cancel(pet_id)
+            return
+        now = time.time()
+        for kind in (self.DECAY_RULES if kinds is None else kinds):
+            field, base = self.DECAY_RULES[kind]
+            elapsed = now - getattr(pet, field)
+            self._decay.schedule(pet_id, kind, base / diff - elapsed)
+        if self._is_critical(pet) and not self._decay.has(pet_id, 'health'):
+            self._decay.schedule(pet_id, 'health', 0)
+
+    @contextmanager
+    def _editing(self, tamagotchi_id: str):
+        """The pet (or None) with its latest stats, held for a read-modify-write.
+
+        Shard workers decay stats between stats ticks: entering copies the
+        current values from the pet's shard, whose lock is held until the
+        block ends, so the change written back by ``_schedule_decay`` inside
+        the block cannot overwrite decay applied in between.
+        """
+        pet = self.tamagotchis.get(tamagotchi_id)
+        if pet is None or not self.shards:
+            yield pet
+            return
+        with self.shards.editing(pet):
+            yield pet
+
+    @staticmethod
+    def _owned_alive(pet: Optional[PetRecord], owner_user_id: str) -> bool:
+        return bool(pet) and pet.owner_id == owner_user_id and pet.is_alive
+
+    def _finish_care(self, pet: PetRecord) -> PetRecord:
+        """Shared tail of feed/play/sleep: status, indexes, save and broadcast."""
+        self._mark_dirty(pet.id)
+        self._update_status(pet)
+        self._index.update(pet)
+        if pet.is_alive:
             self.schedule_save()
         else:
+            self._sync_alive(pet)
             self.flush_save()
-        t = self._dict_to_tamagotchi(data)
-        if self.manager:
-            asyncio.create_task(self.manager.broadcast({
-                'type': 'stats_update',
-                'tamagotchi': {
-                    'id': t.id,
-                    'happiness': t.happiness,
-                    'hunger': t.hunger,
-                    'energy': t.energy,
-                    'health': t.health,
-                    'age': t.age,
-                    'status': t.status,
-                    'is_alive': t.is_alive
-                }
-            }))
-        return t
+        self._broadcast_pet_stats(pet)
+        return self._synced(pet)
 
-    def revive_tamagotchi(self, owner_user_id: str, tamagotchi_id: str) -> Optional[Tamagotchi]:
+    def feed_tamagotchi(self, owner_user_id: str, tamagotchi_id: str) -> Optional[PetRecord]:
+        with self._editing(tamagotchi_id) as pet:
+            if not self._owned_alive(pet, owner_user_id):
+                return None
+            # Reduce hunger, slightly improve health, update last_fed
+            pet.hunger = max(0, pet.hunger - 15)
+            if pet.hunger < 80:
+                pet.health = min(100, pet.health + 2)
+            pet.last_fed = time.time()
+            self._schedule_decay(pet, ('hunger',))
+        return self._finish_care(pet)
+
+    def play_tamagotchi(self, owner_user_id: str, tamagotchi_id: str) -> Optional[PetRecord]:
+        with self._editing(tamagotchi_id) as pet:
+            if not self._owned_alive(pet, owner_user_id):
+                return None
+            # Increase happiness, small energy cost, update last_played
+            pet.happiness = min(100, pet.happiness + 12)
+            pet.energy = max(0, pet.energy - 5)
+            pet.last_played = time.time()
+            self._schedule_decay(pet, ('happiness',))
+        return self._finish_care(pet)
+
+    def sleep_tamagotchi(self, owner_user_id: str, tamagotchi_id: str) -> Optional[PetRecord]:
+        with self._editing(tamagotchi_id) as pet:
+            if not self._owned_alive(pet, owner_user_id):
+                return None
+            # Increase energy, small happiness drop if over-slept
+            pet.energy = min(100, pet.energy + 15)
+            if pet.energy > 90:
+                pet.happiness = max(0, pet.happiness - 2)
+            pet.last_slept = time.time()
+            self._schedule_decay(pet, ('energy',))
+        return self._finish_care(pet)
+
+    def revive_tamagotchi(self, owner_user_id: str, tamagotchi_id: str) -> Optional[PetRecord]:
         """Revive a knocked out pet and reset its stats to base values."""
-        data = self.tamagotchis.get(tamagotchi_id)
-        if not data:
-            return None
-        # Enforce ownership
-        if data.get('owner_id') != owner_user_id:
-            return None
+        with self._editing(tamagotchi_id) as pet:
+            if not pet:
+                return None
+            # Enforce ownership
+            if pet.owner_id != owner_user_id:
+                return None
 
-        now = datetime.now().isoformat()
-        # Reset base stats
-        data['happiness'] = 20
-        data['hunger'] = 20
-        data['energy'] = 20
-        data['health'] = 20
-        data['is_alive'] = True
-        data['status'] = 'Happy'
-        data['last_fed'] = now
-        data['last_played'] = now
-        data['last_slept'] = now
-
-        self.tamagotchis[tamagotchi_id] = data
+            now = time.time()
+            # Reset base stats
+            pet.happiness = 20
+            pet.hunger = 20
+            pet.energy = 20
+            pet.health = 20
+            pet.is_alive = True
+            pet.status = 'Happy'
+            pet.last_fed = now
+            pet.last_played = now
+            pet.last_slept = now
+
+            self._sync_alive(pet)
+            self._schedule_decay(pet)
+        self._index.update(pet)
+        self._mark_dirty(tamagotchi_id)
         # Major event: flush
         self.flush_save()
 
-        t = self._dict_to_tamagotchi(data)
         # Broadcast a single stats update for this pet
-        if self.manager:
-            asyncio.create_task(self.manager.broadcast({
-                'type': 'stats_update',
-                'tamagotchi': {
-                    'id': t.id,
-                    'happiness': t.happiness,
-                    'hunger': t.hunger,
-                    'energy': t.energy,
-                    'health': t.health,
-                    'age': t.age,
-                    'status': t.status,
-                    'is_alive': t.is_alive
-                }
-            }))
-        return t
+        self._broadcast_pet_stats(pet)
+        return self._synced(pet)
 
     def release_tamagotchi(self, owner_user_id: str, tamagotchi_id: str) -> bool:
         """Release (remove) a pet from the field."""
-        data = self.tamagotchis.get(tamagotchi_id)
-        if not data:
+        pet = self.tamagotchis.get(tamagotchi_id)
+        if not pet:
             return False
-        if data.get('owner_id') != owner_user_id:
+        if pet.owner_id != owner_user_id:
             return False
 
         # Remove from storage
         self.tamagotchis.pop(tamagotchi_id, None)
+        if self._movement:
+            self._movement.remove(tamagotchi_id)
+        self._index.remove(tamagotchi_id)
+        self._decay.cancel(tamagotchi_id)
+        self._stat_deltas.forget(tamagotchi_id)
+        self._grid.remove(tamagotchi_id)
+        self._mark_dirty(tamagotchi_id)
         # Major event: flush
         self.flush_save()
 
         # Broadcast removal so clients can update UI
+        self._publish_pet(TOPIC_REMOVED, pet)
         if self.manager:
             asyncio.create_task(self.manager.broadcast({
                 'type': 'tamagotchi_removed',
@@ -679,130 +1076,265 @@ class GameStorage:
             }))
         return True
     
-    async def update_stats_loop(self):
-        while True:
-            await asyncio.sleep(1)  # Update every second
+    def _apply_due_decay(self):
+        """Apply every stat change that is due and return (touched pets, any death)."""
+        if self.shards:
+            return self._collect_shard_decay()
+        due = self._decay.pop_due()
+        if not due:
+            return [], False
+
+        now = time.time()
+        updated = []
+        death_occurred = False
+        for tamagotchi_id, kinds in due.items():
+            pet = self.tamagotchis.get(tamagotchi_id)
+            if not pet or not pet.is_alive:
+                continue
+            diff = max(0.25, min(4.0, self._owner_difficulty(pet.owner_id)))
+
+            # Increase hunger every (30 / diff) seconds
+            if 'hunger' in kinds:
+                pet.hunger = min(100, pet.hunger + 1)
+                pet.last_fed = now
+            # Decrease happiness every (60 / diff) seconds
+            if 'happiness' in kinds:
+                pet.happiness = max(0, pet.happiness - 1)
+                pet.last_played = now
+            # Decrease energy every (45 / diff) seconds
+            if 'energy' in kinds:
+                pet.energy = max(0, pet.energy - 1)
+                pet.last_slept = now
+            for kind in kinds:
+                if kind in self.DECAY_RULES:
+                    self._decay.schedule(tamagotchi_id, kind, self.DECAY_RULES[kind][1] / diff)
+
+            # Health drains every tick while another stat is critical
+            if self._is_critical(pet) and ('health' in kinds or not self._decay.has(tamagotchi_id, 'health')):
+                pet.health = max(0, pet.health - 1)
+                # Zero delay: due again on the next tick
+                self._decay.schedule(tamagotchi_id, 'health', 0)
+
+            self._update_status(pet)
+            if not pet.is_alive:
+                self._sync_alive(pet)
+                self._decay.cancel(tamagotchi_id)
+                death_occurred = True
+
+            pet.age = pet.age_seconds(now)
+            self._index.update(pet)
+            self._mark_dirty(tamagotchi_id)
+            updated.append(pet)
+        return updated, death_occurred
+
+    def _collect_shard_decay(self):
+        """Pick up the stat changes shard workers made since the last stats tick."""
+        now = time.time()
+        updated = self.shards.collect_decay(self.tamagotchis)
+        death_occurred = False
+        for pet in updated:
+            self._update_status(pet)
+            if not pet.is_alive:
+                death_occurred = True
+            pet.age = pet.age_seconds(now)
+            self._index.update(pet)
+            self._mark_dirty(pet.id)
+        return updated, death_occurred
+
+    def _next_stats_frame(self, updated: List[dict]) -> Optional[dict]:
+        """Delta frame for the pets touched this tick, or a periodic keyframe."""
+        self._stats_ticks += 1
+        every = max(1, round(STATS_KEYFRAME_INTERVAL_SEC / STATS_UPDATE_INTERVAL)) if STATS_KEYFRAME_INTERVAL_SEC else 0
+        if every and self._stats_ticks % every == 0:
+            return self.stats_keyframe(record=True)
+        entries = self._stat_deltas.delta(updated)
+        if not entries:
+            return None
+        return {
+            'type': 'stats_update',
+            'tamagotchis': entries,
+            'version': self._stat_deltas.version,
+        }
+
+    async def stats_tick(self):
+        """One STATS_UPDATE_INTERVAL step: apply due decay and broadcast the changes."""
+        # Each pet decay touches is marked dirty, which bumps the snapshot generation
+        updated_tamagotchis, death_occurred = self._apply_due_decay()
+        if self.broker.has_subscribers(TOPIC_STATS):
+            for pet in updated_tamagotchis:
+                self._publish_pet(TOPIC_STATS, pet)
+
+        if updated_tamagotchis:
+            # If any pet died, flush immediately; otherwise debounce
+            if death_occurred:
+                self.flush_save()
+            else:
+                self.schedule_save()
+        # Broadcast only the stat fields that changed since the last frame
+        frame = self._next_stats_frame(updated_tamagotchis)
+        if frame and self.manager:
+            await self.manager.broadcast(frame)
+    
+    def _step_positions_scalar(self) -> PositionColumns:
+        """Advance every living pet one frame with the per-pet Python loop."""
+        updated_positions = PositionColumns()
+        for tamagotchi_id, pet in self.tamagotchis.items():
+            if not pet.is_alive:
+                continue
             
-            updated_tamagotchis = []
-            death_occurred = False
-            for tamagotchi_id, data in self.tamagotchis.items():
-                if not data['is_alive']:
-                    continue
-                
-                now = datetime.now()
-                last_fed = datetime.fromisoformat(data['last_fed'])
-                last_played = datetime.fromisoformat(data['last_played'])
-                last_slept = datetime.fromisoformat(data['last_slept'])
-                # Difficulty modifier from owner (>=0.25, <=4.0); higher = faster deterioration
-                diff = self._owner_difficulty(data.get('owner_id'))
-                diff = max(0.25, min(4.0, diff))
-                
-                # Update stats (faster than before - per second)
-                seconds_since_fed = (now - last_fed).total_seconds()
-                seconds_since_played = (now - last_played).total_seconds()
-                seconds_since_slept = (now - last_slept).total_seconds()
-                
-                # Increase hunger every (30 / diff) seconds
-                if seconds_since_fed > (30 / diff):
-                    data['hunger'] = min(100, data['hunger'] + 1)
-                    # reset the baseline to avoid rapid catch-up
-                    data['last_fed'] = now.isoformat()
-
-                # Decrease happiness every (60 / diff) seconds
-                if seconds_since_played > (60 / diff):
-                    data['happiness'] = max(0, data['happiness'] - 1)
-                    data['last_played'] = now.isoformat()
-
-                # Decrease energy every (45 / diff) seconds
-                if seconds_since_slept > (45 / diff):
-                    data['energy'] = max(0, data['energy'] - 1)
-                    data['last_slept'] = now.isoformat()
-                
-                # Update health based on other stats
-                if data['hunger'] > 80 or data['happiness'] < 20 or data['energy'] < 20:
-                    data['health'] = max(0, data['health'] - 1)
-                
-                # Update status
-                if data['health'] <= 0:
-                    data['is_alive'] = False
-                    data['status'] = 'Dead'
-                    death_occurred = True
-                elif data['hunger'] > 80:
-                    data['status'] = 'Starving'
-                elif data['energy'] < 20:
-                    data['status'] = 'Tired'
-                elif data['happiness'] < 30:
-                    data['status'] = 'Sad'
-                else:
-                    data['status'] = 'Happy'
-                
-                # Update age (in seconds)
-                created_at = datetime.fromisoformat(data['created_at'])
-                data['age'] = int((now - created_at).total_seconds())
-                
-                updated_tamagotchis.append(self._dict_to_tamagotchi(data))
+            # Move tamagotchi
+            pet.x += math.cos(pet.direction) * pet.speed
+            pet.y += math.sin(pet.direction) * pet.speed
             
-            if updated_tamagotchis:
-                # If any pet died, flush immediately; otherwise debounce
-                if death_occurred:
-                    self.flush_save()
-                else:
-                    self.schedule_save()
-                # Broadcast stats update
-                if self.manager:
-                    await self.manager.broadcast({
-                        'type': 'stats_update',
-                        'tamagotchis': [{
-                            'id': t.id,
-                            'happiness': t.happiness,
-                            'hunger': t.hunger,
-                            'energy': t.energy,
-                            'health': t.health,
-                            'age': t.age,
-                            'status': t.status,
-                            'is_alive': t.is_alive
-                        } for t in updated_tamagotchis]
-                    })
-    
-    async def update_positions_loop(self):
-        while True:
-            await asyncio.sleep(0.1)  # Update positions 10 times per second
+            # Bounce off walls
+            if pet.x <= 0 or pet.x >= GAME_AREA_WIDTH:
+                pet.direction = math.pi - pet.direction
+                pet.x = max(0, min(GAME_AREA_WIDTH, pet.x))
             
-            updated_positions = []
-            for tamagotchi_id, data in self.tamagotchis.items():
-                if not data['is_alive']:
-                    continue
-                
-                pos = data['position']
-                
-                # Move tamagotchi
-                pos['x'] += math.cos(pos['direction']) * pos['speed']
-                pos['y'] += math.sin(pos['direction']) * pos['speed']
-                
-                # Bounce off walls
-                if pos['x'] <= 0 or pos['x'] >= GAME_AREA_WIDTH:
-                    pos['direction'] = math.pi - pos['direction']
-                    pos['x'] = max(0, min(GAME_AREA_WIDTH, pos['x']))
-                
-                if pos['y'] <= 0 or pos['y'] >= GAME_AREA_HEIGHT:
-                    pos['direction'] = -pos['direction']
-                    pos['y'] = max(0, min(GAME_AREA_HEIGHT, pos['y']))
-                
-                # Randomly change direction occasionally
-                if random.random() < 0.02:  # 2% chance per frame
-                    pos['direction'] += random.uniform(-0.5, 0.5)
-                
-                updated_positions.append({
-                    'id': tamagotchi_id,
-                    'x': pos['x'],
-                    'y': pos['y'],
-                    'direction': pos['direction']
-                })
+            if pet.y <= 0 or pet.y >= GAME_AREA_HEIGHT:
+                pet.direction = -pet.direction
+                pet.y = max(0, min(GAME_AREA_HEIGHT, pet.y))
             
-            if updated_positions:
-                # Broadcast position updates
-                if self.manager:
-                    await self.manager.broadcast({
-                        'type': 'position_update',
-                        'positions': updated_positions
-                    })
\ No newline at end of file
+            # Randomly change direction occasionally
+            if random.random() < 0.02:  # 2% chance per frame
+                pet.direction += random.uniform(-0.5, 0.5)
+            
+            updated_positions.append(tamagotchi_id, pet.x, pet.y, pet.direction)
+        return updated_positions
+
+    def step_positions(self) -> PositionColumns:
+        """Advance all living pets one frame and return their new positions."""
+        if self._movement:
+            return self._movement.positions(self._movement.step())
+        return self._step_positions_scalar()
+
+    async def positions_tick(self):
+        """One POSITION_UPDATE_INTERVAL step: move every living pet and broadcast the frame."""
+        updated_positions = self.step_positions()
+        if updated_positions:
+            self.snapshots.bump_live('positions')
+        self._grid.update_many(updated_positions)
+        if self.manager:
+            self.manager.refresh_interest(self._grid)
+
+        if updated_positions:
+            self.broker.publish(TOPIC_POSITIONS, updated_positions)
+            # Broadcast position updates
+            if self.manager:
+                await self.manager.broadcast_positions(updated_positions)
+
+    # Multi-worker cluster (see services/cluster.py)
+
+    async def submit(self, method: str, *args):
+        """Run a mutation where the simulation lives: here, or on the owner when following."""
+        if self.follower:
+            return await self.cluster.forward(method, args)
+        return getattr(self, method)(*args)
+
+    def follow(self):
+        """Give up the local simulation; the world now comes from the owner."""
+        self.follower = True
+        if self.shards:
+            self.shards.release()
+            self.shards = None
+        self._movement = None
+
+    def lead(self):
+        """Take over the simulation from a departed owner, starting from its last save."""
+        self.follower = False
+        self._init_simulation()
+        self.load_data()
+        self._load_users_from_db()
+        self._rebuild_indexes()
+        self.snapshots.bump()
+
+    def replica_pets(self, pet_ids: List[str]) -> List[dict]:
+        """Records of the given pets that still exist, for a follower's world stream."""
+        pets = []
+        for pet_id in pet_ids:
+            pet = self.tamagotchis.get(pet_id)
+            if pet is not None:
+                pets.append(self._synced(pet).to_dict())
+        return pets
+
+    def load_replica(self, state: dict):
+        self.tamagotchis = {}
+        for data in state['tamagotchis']:
+            pet = PetRecord.from_dict(data)
+            self.tamagotchis[pet.id] = pet
+        self.users = {data['id']: data for data in state['users']}
+        self._rebuild_indexes()
+        self.snapshots.bump()
+
+    def take_replica_changes(self, build: bool = True) -> Optional[dict]:
+        """Pets and users changed since the last call, as records for followers."""
+        if not (self._replica_pets or self._replica_users):
+            return None
+        pet_ids, self._replica_pets = self._replica_pets, set()
+        user_ids, self._replica_users = self._replica_users, set()
+        if not build:
+            return None
+        # Released pets are left out: their tamagotchi_removed event follows
+        pets = [self._synced(self.tamagotchis[pet_id]).to_dict() for pet_id in pet_ids if pet_id in self.tamagotchis]
+        users = [self.users[user_id] for user_id in user_ids if user_id in self.users]
+        return {'tamagotchis': pets, 'users': users}
+
+    def apply_replica_changes(self, changes: dict) -> List[PetRecord]:
+        """Install pet and user records published by the owner; returns the pets."""
+        for data in changes.get('users', ()):
+            self.users[data['id']] = data
+        pets = []
+        for data in changes.get('tamagotchis', ()):
+            pet = PetRecord.from_dict(data)
+            self.tamagotchis[pet.id] = pet
+            self._index.update(pet)
+            self._grid.update(pet.id, pet.x, pet.y)
+            pets.append(pet)
+        self.snapshots.bump()
+        return pets
+
+    def apply_remote_positions(self, positions: PositionColumns):
+        """Mirror one of the owner's movement frames into the replica and local subscriptions."""
+        tamagotchis = self.tamagotchis
+        for pet_id, x, y, d in zip(positions.ids, positions.x, positions.y, positions.direction):
+            pet = tamagotchis.get(pet_id)
+            if pet is not None:
+                pet.x = x
+                pet.y = y
+                pet.direction = d
+        self.snapshots.bump_live('positions')
+        self._grid.update_many(positions)
+        if self.manager:
+            self.manager.refresh_interest(self._grid)
+        self.broker.publish(TOPIC_POSITIONS, positions)
+
+    def apply_remote_event(self, message: dict):
+        """Mirror one of the owner's broadcasts into the replica and local subscriptions."""
+        msg_type = message.get('type')
+        if msg_type == 'stats_update':
+            # Keyframes restate every pet; subscribers only hear about changes
+            if message.get('keyframe') or not self.broker.has_subscribers(TOPIC_STATS):
+                return
+            for entry in message.get('tamagotchis') or [message['tamagotchi']]:
+                pet = self.tamagotchis.get(entry['id'])
+                if pet is not None:
+                    self._publish_pet(TOPIC_STATS, pet)
+        elif msg_type == 'tamagotchi_created':
+            pet = self.apply_replica_changes({'tamagotchis': [message['tamagotchi']]})[0]
+            self._publish_pet(TOPIC_CREATED, pet)
+        elif msg_type == 'tamagotchi_removed':
+            pet = self.tamagotchis.pop(message['id'], None)
+            if pet is not None:
+                self._index.remove(pet.id)
+                self._grid.remove(pet.id)
+                self.snapshots.bump()
+                self._publish_pet(TOPIC_REMOVED, pet)
+        elif msg_type == 'cursors':
+            for cursor in message.get('data') or []:
+                user = self.users.get(cursor['user_id'])
+                if user is not None:
+                    user['mouse_x'] = cursor['x']
+                    user['mouse_y'] = cursor['y']
+                self.mouse_positions[cursor['user_id']] = cursor
+            self.snapshots.bump_live('cursors')
+            self.broker.publish(TOPIC_CURSORS, message.get('data') or [])
@@ -1,44 +1,347 @@
+import asyncio
 import json
 import uuid
-from typing import Dict
+from collections import deque
+from typing import Callable, Deque, Dict, Hashable, Optional, Set, Tuple, Union
 from fastapi import WebSocket
 
+from ..config import WS_SEND_TIMEOUT_SEC, WS_OUTBOUND_QUEUE_SIZE, AOI_MARGIN
+from .binary_frames import BINARY_SUBPROTOCOL, PositionHandles, encode_positions
+from .positions import PositionColumns
+from .spatial import SpatialGrid
+
+Payload = Union[str, bytes]
+Entries = Union[Dict[Hashable, dict], PositionColumns]
+Encoder = Callable[[Entries], Payload]
+
+# Frames that fold into a still-queued frame of the same type: their entries
+# are merged by id (newest entry per id wins), so a burst of cursor frames
+# occupies one queue slot. Type -> (list field, entry id field). Movement
+# frames (broadcast_positions) merge the same way under 'position_update',
+# so a single-pet update never hides the pets of a queued full-world frame.
+# Everything else (creation, removal, stats/death) is delivered in order and
+# never dropped.
+MERGED_TYPES = {
+    'cursors': ('data', 'user_id'),
+}
+
+
+def coalesce_key(message: dict) -> Optional[Hashable]:
+    """Key under which a queued frame merges with newer ones, or None."""
+    msg_type = message.get('type')
+    if msg_type in MERGED_TYPES:
+        return msg_type
+    return None
+
+
+def frame_entries(message: dict) -> Entries:
+    """A mergeable frame's entries keyed by id."""
+    field, id_field = MERGED_TYPES[message['type']]
+    return {entry[id_field]: entry for entry in message.get(field) or []}
+
+
+def json_encoder(msg_type: str) -> Encoder:
+    field = MERGED_TYPES[msg_type][0]
+    return lambda entries: json.dumps({'type': msg_type, field: list(entries.values())})
+
+
+def merge_entries(queued: Entries, newer: Entries) -> Entries:
+    """A queued frame's entries updated with a newer frame's."""
+    if isinstance(queued, PositionColumns):
+        return queued.merge(newer)
+    merged = dict(queued)
+    merged.update(newer)
+    return merged
+
+
+class OutboundQueue:
+    """Bounded outbound frame queue for one connection, drained by its writer task."""
+
+    def __init__(self, max_size: int = WS_OUTBOUND_QUEUE_SIZE):
+        self.max_size = max_size
+        # [key, payload, entries, encoder]; the last two only for mergeable frames
+        self._items: Deque[list] = deque()
+        self._ready = asyncio.Event()
+        self.in_flight = False
+        self.sent = 0
+        self.coalesced = 0
+        self.dropped = 0
+        self.max_depth = 0
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def put(self, payload: Payload, key: Optional[Hashable] = None,
+            entries: Optional[Entries] = None, encoder: Optional[Encoder] = None) -> bool:
+        """Queue a frame; returns False only if a must-deliver frame cannot fit.
+
+        A keyed frame replaces a queued frame with the same key. When both
+        carry ``entries`` the two are merged (the new entries win) and
+        re-encoded with ``encoder``.
+        """
+        items = self._items
+        if key is not None:
+            for i, item in enumerate(items):
+                if item[0] == key:
+                    del items[i]
+                    self.coalesced += 1
+                    if entries is not None and item[2] is not None:
+                        entries = merge_entries(item[2], entries)
+                        payload = encoder(entries)
+                    break
+        if len(items) >= self.max_size:
+            for i, item in enumerate(items):
+                if item[0] is not None:
+                    del items[i]
+                    self.dropped += 1
+                    break
+            else:
+                if key is not None:
+                    self.dropped += 1
+                    return True
+                return False
+        items.append([key, payload, entries, encoder])
+        self.max_depth = max(self.max_depth, len(items))
+        self._ready.set()
+        return True
+
+    async def get(self) -> Payload:
+        while not self._items:
+            self._ready.clear()
+            await self._ready.wait()
+        return self._items.popleft()[1]
+
+
 class ConnectionManager:
-    def __init__(self):
+    def __init__(self, send_timeout: float = WS_SEND_TIMEOUT_SEC, queue_size: int = WS_OUTBOUND_QUEUE_SIZE):
         self.active_connections: Dict[str, WebSocket] = {}
         self.user_connections: Dict[str, str] = {}  # user_id -> connection_id
+        self.connection_users: Dict[str, str] = {}  # connection_id -> user_id
+        self.queues: Dict[str, OutboundQueue] = {}
+        self._writers: Dict[str, asyncio.Task] = {}
+        # Binary position clients: connection_id -> handle log position it has
+        # seen (None until it has been sent the live handle table)
+        self.binary_connections: Dict[str, Optional[int]] = {}
+        self.handles = PositionHandles()
+        # Area of interest: connection_id -> declared viewport (x, y, w, h) and
+        # the pet ids currently inside it. Connections without one see everything.
+        self.viewports: Dict[str, Tuple[float, float, float, float]] = {}
+        self.interest: Dict[str, Set[str]] = {}
+        self.send_timeout = send_timeout
+        self.queue_size = queue_size
+        self.evicted_count = 0
     
     async def connect(self, websocket: WebSocket, user_id: str):
-        await websocket.accept()
+        binary = BINARY_SUBPROTOCOL in websocket.scope.get('subprotocols', [])
+        await websocket.accept(subprotocol=BINARY_SUBPROTOCOL if binary else None)
+        connection_id = self._register(websocket, user_id)
+        if binary:
+            self.enable_binary_positions(connection_id)
+        return connection_id
+
+    def enable_binary_positions(self, connection_id: str):
+        """Switch a connection's position_update frames to the packed binary encoding."""
+        if connection_id in self.active_connections:
+            self.binary_connections.setdefault(connection_id, None)
+
+    def set_viewport(self, connection_id: str, rect: Optional[Tuple[float, float, float, float]]):
+        """Limit a connection's position frames to a viewport; None restores the full world."""
+        if connection_id not in self.active_connections:
+            return
+        if rect is None:
+            self.viewports.pop(connection_id, None)
+            self.interest.pop(connection_id, None)
+        else:
+            self.viewports[connection_id] = rect
+            self.interest.setdefault(connection_id, set())
+
+    def refresh_interest(self, grid: SpatialGrid, margin: float = AOI_MARGIN):
+        """Recompute each viewport's pet set and queue enter/leave events."""
+        for conn_id, rect in list(self.viewports.items()):
+            visible = grid.query(*rect, margin=margin)
+            previous = self.interest.get(conn_id, set())
+            self.interest[conn_id] = visible
+            entered = visible - previous
+            left = previous - visible
+            if entered:
+                self._enqueue(conn_id, json.dumps({'type': 'aoi_enter', 'ids': list(entered)}))
+            if left:
+                self._enqueue(conn_id, json.dumps({'type': 'aoi_leave', 'ids': list(left)}))
+
+    def _register(self, websocket: WebSocket, user_id: str) -> str:
         connection_id = str(uuid.uuid4())
         self.active_connections[connection_id] = websocket
         self.user_connections[user_id] = connection_id
+        self.connection_users[connection_id] = user_id
+        queue = OutboundQueue(self.queue_size)
+        self.queues[connection_id] = queue
+        self._writers[connection_id] = asyncio.create_task(self._writer(connection_id, websocket, queue))
         return connection_id
     
     def disconnect(self, connection_id: str, user_id: str):
         if connection_id in self.active_connections:
             del self.active_connections[connection_id]
-        if user_id in self.user_connections:
+        self.connection_users.pop(connection_id, None)
+        self._stop_writer(connection_id)
+        # Only drop the user mapping if it still points at this connection
+        if self.user_connections.get(user_id) == connection_id:
             del self.user_connections[user_id]
+
+    def _stop_writer(self, connection_id: str):
+        self.queues.pop(connection_id, None)
+        self.binary_connections.pop(connection_id, None)
+        self.viewports.pop(connection_id, None)
+        self.interest.pop(connection_id, None)
+        task = self._writers.pop(connection_id, None)
+        if task is not None and task is not asyncio.current_task():
+            task.cancel()
+
+    def _evict(self, connection_id: str):
+        """Drop a slow or failed socket and close it in the background."""
+        websocket = self.active_connections.pop(connection_id, None)
+        user_id = self.connection_users.pop(connection_id, None)
+        if user_id is not None and self.user_connections.get(user_id) == connection_id:
+            del self.user_connections[user_id]
+        self._stop_writer(connection_id)
+        if websocket is not None:
+            self.evicted_count += 1
+            asyncio.create_task(self._close_quietly(websocket))
+
+    async def _close_quietly(self, websocket: WebSocket):
+        try:
+            await asyncio.wait_for(websocket.close(), timeout=self.send_timeout)
+        except Exception:
+            pass
+
+    async def _send(self, websocket: WebSocket, payload: Payload) -> bool:
+        try:
+            send = websocket.send_bytes(payload) if isinstance(payload, bytes) else websocket.send_text(payload)
+            await asyncio.wait_for(send, timeout=self.send_timeout)
+            return True
+        except Exception:
+            return False
+
+    async def _writer(self, connection_id: str, websocket: WebSocket, queue: OutboundQueue):
+        """Drain one connection's queue; a failed or timed-out send evicts it."""
+        try:
+            while True:
+                payload = await queue.get()
+                queue.in_flight = True
+                ok = await self._send(websocket, payload)
+                queue.in_flight = False
+                if not ok:
+                    self._evict(connection_id)
+                    return
+                queue.sent += 1
+        except asyncio.CancelledError:
+            pass
+
+    def _enqueue(self, connection_id: str, payload: Payload, key: Optional[Hashable] = None,
+                 entries: Optional[Entries] = None, encoder: Optional[Encoder] = None):
+        queue = self.queues.get(connection_id)
+        if queue is not None and not queue.put(payload, key, entries, encoder):
+            # Backlog of must-deliver frames: the client cannot keep up
+            self._evict(connection_id)
     
     async def broadcast(self, message: dict):
-        disconnected = []
+        if message.get('type') == 'tamagotchi_removed':
+            # Free the pet's binary handle; a reassignment is announced before use
+            self.handles.release(message['id'])
+        if not self.active_connections:
+            return
+        # Encode once and hand the frame to every connection's queue; writers
+        # send concurrently, so a slow client only backs up its own queue
+        key = coalesce_key(message)
+        payload = json.dumps(message)
+        entries = encoder = None
+        if key is not None:
+            entries = frame_entries(message)
+            encoder = json_encoder(key)
         # Iterate over a snapshot to avoid mutation during iteration
-        for connection_id, websocket in list(self.active_connections.items()):
-            try:
-                await websocket.send_text(json.dumps(message))
-            except:
-                disconnected.append(connection_id)
-        
-        # Clean up disconnected connections
-        for conn_id in disconnected:
-            if conn_id in self.active_connections:
-                del self.active_connections[conn_id]
+        for conn_id in list(self.active_connections):
+            self._enqueue(conn_id, payload, key, entries, encoder)
+
+    async def broadcast_positions(self, positions: PositionColumns):
+        """Queue a movement frame, with viewport filtering and binary encoding.
+
+        Connections that see the whole world share one encoded frame per
+        encoding; viewport connections get only the pets in their interest set.
+        """
+        if not self.active_connections:
+            return
+        if self.binary_connections:
+            self.handles.assign(positions.ids)
+        shared: Dict[bool, Payload] = {}
+        rows = None
+        encoders = {
+            True: lambda entries: encode_positions(self.handles, entries),
+            False: PositionColumns.to_json,
+        }
+        for conn_id in list(self.active_connections):
+            binary = conn_id in self.binary_connections
+            interest = self.interest.get(conn_id)
+            if interest is None:
+                entries = positions
+                payload = shared.get(binary)
+                if payload is None:
+                    payload = shared[binary] = encoders[binary](positions)
+            else:
+                if rows is None:
+                    rows = positions.rows()
+                entries = positions.take(rows[i] for i in interest if i in rows)
+                if not entries:
+                    continue
+                payload = encoders[binary](entries)
+            if binary and not self._announce_handles(conn_id):
+                continue
+            self._enqueue(conn_id, payload, 'position_update', entries, encoders[binary])
+        seen = [seq for seq in self.binary_connections.values() if seq is not None]
+        self.handles.trim(min(seen, default=self.handles.seq))
+
+    def _announce_handles(self, connection_id: str) -> bool:
+        """Tell a binary client about handles it has not seen; False if it was evicted."""
+        seen = self.binary_connections.get(connection_id)
+        seq = self.handles.seq
+        if seen == seq:
+            return True
+        message = self.handles.snapshot() if seen is None else self.handles.announce(seen)
+        if message is not None:
+            self._enqueue(connection_id, json.dumps(message))
+            if connection_id not in self.binary_connections:
+                return False
+        self.binary_connections[connection_id] = seq
+        return True
     
     async def send_to_user(self, user_id: str, message: dict):
         connection_id = self.user_connections.get(user_id)
-        if connection_id and connection_id in self.active_connections:
-            try:
-                await self.active_connections[connection_id].send_text(json.dumps(message))
-            except:
-                self.disconnect(connection_id, user_id)
\ No newline at end of file
+        if connection_id:
+            await self.send_to_connection(connection_id, message)
+
+    async def send_to_connection(self, connection_id: str, message: dict):
+        if connection_id in self.active_connections:
+            key = coalesce_key(message)
+            if key is None:
+                self._enqueue(connection_id, json.dumps(message))
+            else:
+                self._enqueue(connection_id, json.dumps(message), key, frame_entries(message), json_encoder(key))
+
+    async def drain(self, timeout: float = None):
+        """Wait until every queue is empty and no send is in flight."""
+        async def _wait():
+            while any(len(q) or q.in_flight for q in self.queues.values()):
+                await asyncio.sleep(0.001)
+        await asyncio.wait_for(_wait(), timeout=timeout)
+
+    def connection_stats(self) -> Dict[str, dict]:
+        """Per-connection queue depth and delivery counters."""
+        return {
+            conn_id: {
+                'user_id': self.connection_users.get(conn_id),
+                'queue_depth': len(q),
+                'max_depth': q.max_depth,
+                'sent': q.sent,
+                'coalesced': q.coalesced,
+                'dropped': q.dropped,
+            }
+            for conn_id, q in self.queues.items()
+        }
@@ -0,0 +1,175 @@
+# Everything a spawned shard worker runs. Workers import only this module, so
+# it must stay free of app imports (FastAPI, Strawberry, storage, ...).
+import math
+import signal
+import time
+from multiprocessing.shared_memory import SharedMemory
+from typing import Dict, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; GameStorage falls back to the scalar loop
+    np = None
+
+
+JITTER_CHANCE = 0.02  # per frame, mirrors the scalar loop
+JITTER_RANGE = 0.5
+
+
+def step_slots(x, y, direction, speed, alive, n: int, width: float, height: float, rng):
+    """Advance the living pets among the first ``n`` slots of the arrays by one frame.
+
+    Returns the slot indices that moved. Shared by ``MovementEngine`` and the
+    shard workers.
+    """
+    if n == 0:
+        return np.empty(0, dtype=np.intp)
+    idx = np.flatnonzero(alive[:n])
+    if idx.size == 0:
+        return idx
+    px = x[idx]
+    py = y[idx]
+    d = direction[idx]
+    s = speed[idx]
+
+    px += np.cos(d) * s
+    py += np.sin(d) * s
+
+    bounce_x = (px <= 0) | (px >= width)
+    d = np.where(bounce_x, math.pi - d, d)
+    np.clip(px, 0, width, out=px)
+
+    bounce_y = (py <= 0) | (py >= height)
+    d = np.where(bounce_y, -d, d)
+    np.clip(py, 0, height, out=py)
+
+    jitter = rng.random(idx.size) < JITTER_CHANCE
+    if jitter.any():
+        d[jitter] += rng.uniform(-JITTER_RANGE, JITTER_RANGE, int(jitter.sum()))
+
+    x[idx] = px
+    y[idx] = py
+    direction[idx] = d
+    return idx
+
+
+# Per-pet columns in a shard segment, laid out one after another
+COLUMNS = (
+    ('x', 'f8'), ('y', 'f8'), ('direction', 'f8'), ('speed', 'f8'),
+    ('last_fed', 'f8'), ('last_played', 'f8'), ('last_slept', 'f8'),
+    ('difficulty', 'f8'), ('changed', 'i8'),
+    ('happiness', 'i4'), ('hunger', 'i4'), ('energy', 'i4'), ('health', 'i4'),
+    ('alive', '?'),
+)
+STAT_COLUMNS = ('happiness', 'hunger', 'energy', 'health', 'last_fed', 'last_played', 'last_slept')
+
+# Slots of the int64 control block shared by a shard and its worker. SEQ is
+# a seqlock: the worker makes it odd while it writes the columns and even
+# again after, so lock-free readers can detect a torn copy and retry.
+SIZE, CAPACITY, SEGMENT, MOVE_TICKS, STATS_TICKS, STOP, TICK_US, SEQ = range(8)
+HEADER_LEN = 8
+
+
+def _column_bytes(dtype: str, capacity: int) -> int:
+    # Rounded up to 8 so every column stays aligned
+    return -(-capacity * np.dtype(dtype).itemsize // 8) * 8
+
+
+def segment_bytes(capacity: int) -> int:
+    return sum(_column_bytes(dtype, capacity) for _, dtype in COLUMNS)
+
+
+def columns(buf, capacity: int) -> Dict[str, 'np.ndarray']:
+    """Array views of every column over a segment's buffer."""
+    cols = {}
+    offset = 0
+    for name, dtype in COLUMNS:
+        cols[name] = np.ndarray(capacity, dtype=dtype, buffer=buf, offset=offset)
+        offset += _column_bytes(dtype, capacity)
+    return cols
+
+
+def decay_slots(cols: dict, n: int, now: float, tick: int, rules: Tuple[Tuple[str, str, float, int], ...]):
+    """One stats tick over the first ``n`` slots, vectorized.
+
+    Mirrors ``GameStorage._apply_due_decay``: a stat moves one point once its
+    timestamp is ``base / difficulty`` seconds old (and is restamped), health
+    drains a point per tick while any stat is critical, and pets whose health
+    hits zero die. Every touched slot gets ``changed = tick``.
+    """
+    if n == 0:
+        return
+    alive = cols['alive'][:n]
+    diff = cols['difficulty'][:n]
+    touched = np.zeros(n, dtype=bool)
+    for stat, stamp, base, step in rules:
+        due = alive & (now - cols[stamp][:n] >= base / diff)
+        if due.any():
+            values = cols[stat][:n]
+            values[due] = np.clip(values[due] + step, 0, 100)
+            cols[stamp][:n][due] = now
+            touched |= due
+    hunger = cols['hunger'][:n]
+    critical = alive & ((hunger > 80) | (cols['happiness'][:n] < 20) | (cols['energy'][:n] < 20))
+    if critical.any():
+        health = cols['health'][:n]
+        health[critical] = np.maximum(health[critical] - 1, 0)
+        touched |= critical
+        alive[critical & (health <= 0)] = False
+    cols['changed'][:n][touched] = tick
+
+
+def run_shard(prefix: str, index: int, lock, width: float, height: float,
+              move_interval: float, stats_interval: float, rules):
+    """Worker process: tick movement and decay for one shard until told to stop."""
+    # Ctrl-C is handled by the parent, which stops the workers
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    # Spawned workers share the parent's resource tracker; the parent unlinks every segment
+    control = SharedMemory(name=f"{prefix}_{index}_ctl")
+    header = np.ndarray(HEADER_LEN, dtype=np.int64, buffer=control.buf)
+    segment = None
+    segment_id = -1
+    cols = {}
+    rng = np.random.default_rng()
+    next_move = next_stats = time.monotonic()
+    try:
+        while not header[STOP]:
+            now = time.monotonic()
+            wake = min(next_move, next_stats)
+            if wake > now:
+                time.sleep(min(wake - now, 0.05))
+                continue
+            started = time.perf_counter()
+            with lock:
+                if header[SEGMENT] != segment_id:
+                    # The parent grew the shard into a new segment
+                    if segment is not None:
+                        cols = {}  # drop the views before unmapping
+                        segment.close()
+                    segment_id = int(header[SEGMENT])
+                    segment = SharedMemory(name=f"{prefix}_{index}_{segment_id}")
+                    cols = columns(segment.buf, int(header[CAPACITY]))
+                n = int(header[SIZE])
+                header[SEQ] += 1
+                try:
+                    if now >= next_move:
+                        step_slots(cols['x'], cols['y'], cols['direction'], cols['speed'], cols['alive'],
+                                   n, width, height, rng)
+                        header[MOVE_TICKS] += 1
+                        next_move = max(next_move + move_interval, now)
+                    if now >= next_stats:
+                        tick = int(header[STATS_TICKS]) + 1
+                        decay_slots(cols, n, time.time(), tick, rules)
+                        header[STATS_TICKS] = tick
+                        next_stats = max(next_stats + stats_interval, now)
+                finally:
+                    header[SEQ] += 1
+            header[TICK_US] = int((time.perf_counter() - started) * 1e6)
+    finally:
+        cols = {}
+        header = None
+        if segment is not None:
+            segment.close()
+        control.close()
+
+
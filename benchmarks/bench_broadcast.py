@@ -0,0 +1,90 @@
+"""Fan-out latency of ConnectionManager.broadcast with simulated sockets.
+
+Compares the previous sequential per-socket json.dumps/send loop with the
+encode-once queued broadcast (time until every healthy socket received the
+frame), with and without a few stalled clients.
+
+    python -m benchmarks.bench_broadcast
+"""
+import asyncio
+import json
+import time
+
+from app.services.positions import PositionColumns
+from app.services.websocket import ConnectionManager
+
+CONNECTIONS = (1_000, 5_000)
+SLOW_CLIENTS = 5
+SLOW_DELAY_SEC = 0.5
+SEND_TIMEOUT_SEC = 0.1
+
+
+class FakeWebSocket:
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.received = 0
+
+    async def send_text(self, payload: str):
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        else:
+            await asyncio.sleep(0)
+        self.received += 1
+
+    async def close(self):
+        pass
+
+
+def make_positions(pets: int = 200) -> PositionColumns:
+    positions = PositionColumns()
+    for i in range(pets):
+        positions.append(f"{i:036d}", i * 1.5, i * 0.5, 0.25)
+    return positions
+
+
+async def sequential_broadcast(manager: ConnectionManager, positions: PositionColumns):
+    """The pre-change broadcast: dumps and awaits each socket in turn."""
+    message = {'type': 'position_update', 'positions': positions.entries()}
+    for connection_id, websocket in list(manager.active_connections.items()):
+        try:
+            await websocket.send_text(json.dumps(message))
+        except Exception:
+            pass
+
+
+def make_manager(n: int, slow: int) -> ConnectionManager:
+    manager = ConnectionManager(send_timeout=SEND_TIMEOUT_SEC)
+    for i in range(n):
+        manager._register(FakeWebSocket(SLOW_DELAY_SEC if i < slow else 0.0), f"user-{i}")
+    return manager
+
+
+async def queued_broadcast(manager: ConnectionManager, positions: PositionColumns):
+    await manager.broadcast_positions(positions)
+    await manager.drain()
+
+
+async def timed(coro) -> float:
+    start = time.perf_counter()
+    await coro
+    return (time.perf_counter() - start) * 1000
+
+
+async def main():
+    positions = make_positions()
+    print(f"{'conns':>6} {'slow':>5} {'sequential ms':>14} {'queued ms':>14} {'evicted':>8}")
+    for n in CONNECTIONS:
+        for slow in (0, SLOW_CLIENTS):
+            baseline = make_manager(n, slow)
+            seq = await timed(sequential_broadcast(baseline, positions))
+            for conn_id in list(baseline.active_connections):
+                baseline.disconnect(conn_id, baseline.connection_users[conn_id])
+            manager = make_manager(n, slow)
+            conc = await timed(queued_broadcast(manager, positions))
+            print(f"{n:>6} {slow:>5} {seq:>14.1f} {conc:>14.1f} {manager.evicted_count:>8}")
+            for conn_id in list(manager.active_connections):
+                manager.disconnect(conn_id, manager.connection_users[conn_id])
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
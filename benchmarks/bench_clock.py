@@ -0,0 +1,75 @@
+"""Tick rate under load: the old ``while True: await asyncio.sleep(interval)``
+loops vs the fixed-timestep GameClock.
+
+Each position tick burns WORK_MS of CPU (a busy world), the stats tick a
+little more. The sleep loops stretch their period by the work time, so they
+fall behind wall-clock; the clock holds the configured rates and reports
+lateness.
+
+    python -m benchmarks.bench_clock
+"""
+import asyncio
+import time
+
+from app.config import POSITION_UPDATE_INTERVAL, STATS_UPDATE_INTERVAL
+from app.services.clock import GameClock
+
+SECONDS = 5
+WORK_MS = (10, 30, 60)  # per position tick; a stats tick costs twice as much
+
+
+def busy(ms: float):
+    end = time.perf_counter() + ms / 1000
+    while time.perf_counter() < end:
+        pass
+
+
+async def sleep_loops(work_ms: float) -> dict:
+    counts = {'stats': 0, 'positions': 0}
+
+    async def loop(name, interval, cost):
+        while True:
+            await asyncio.sleep(interval)
+            busy(cost)
+            counts[name] += 1
+
+    tasks = [asyncio.create_task(loop('stats', STATS_UPDATE_INTERVAL, work_ms * 2)),
+             asyncio.create_task(loop('positions', POSITION_UPDATE_INTERVAL, work_ms))]
+    await asyncio.sleep(SECONDS)
+    for task in tasks:
+        task.cancel()
+    return counts
+
+
+async def game_clock(work_ms: float):
+    counts = {'stats': 0, 'positions': 0}
+
+    def tick(name, cost):
+        async def run():
+            busy(cost)
+            counts[name] += 1
+        return run
+
+    clock = GameClock()
+    clock.add('stats', STATS_UPDATE_INTERVAL, tick('stats', work_ms * 2))
+    clock.add('positions', POSITION_UPDATE_INTERVAL, tick('positions', work_ms))
+    task = asyncio.create_task(clock.run())
+    await asyncio.sleep(SECONDS)
+    task.cancel()
+    return counts, clock.stats()
+
+
+async def main():
+    expected = SECONDS / POSITION_UPDATE_INTERVAL
+    print(f"{SECONDS}s run, {expected:.0f} position ticks expected")
+    print(f"{'work ms':>8} {'sleep loops':>12} {'clock':>6} {'avg late ms':>12} {'max late ms':>12} {'skipped':>8}")
+    for work_ms in WORK_MS:
+        loops = await sleep_loops(work_ms)
+        counts, stats = await game_clock(work_ms)
+        positions = stats['positions']
+        print(f"{work_ms:>8} {loops['positions']:>12} {counts['positions']:>6} "
+              f"{positions['avg_late_ms']:>12.2f} {positions['max_late_ms']:>12.2f} {positions['skipped']:>8}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,84 @@
+"""Compare the scalar position loop with the NumPy movement engine.
+
+"step" is producing the frame's position columns; "frame" is the whole
+movement tick after it: the spatial grid update plus encoding the JSON and
+binary position_update frames that the broadcast sends.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_movement
+"""
+import math
+import os
+import random
+import tempfile
+import time
+
+# GameStorage creates game.db / reads game_data.json relative to the cwd
+os.chdir(tempfile.mkdtemp())
+
+from app.config import GAME_AREA_WIDTH, GAME_AREA_HEIGHT  # noqa: E402
+from app.models import PetRecord  # noqa: E402
+from app.services.binary_frames import PositionHandles, encode_positions  # noqa: E402
+from app.services.movement import MovementEngine  # noqa: E402
+from app.services.storage import GameStorage  # noqa: E402
+
+SIZES = (1_000, 10_000, 100_000)
+FRAMES = 20
+
+
+def make_world(n: int) -> dict:
+    world = {}
+    for i in range(n):
+        pet_id = f"pet-{i}"
+        world[pet_id] = PetRecord(
+            id=pet_id,
+            name='bench',
+            owner_id='bench-owner',
+            x=random.uniform(0, GAME_AREA_WIDTH),
+            y=random.uniform(0, GAME_AREA_HEIGHT),
+            direction=random.uniform(0, 2 * math.pi),
+        )
+    return world
+
+
+def time_frames(step) -> float:
+    start = time.perf_counter()
+    for _ in range(FRAMES):
+        step()
+    return (time.perf_counter() - start) / FRAMES * 1000
+
+
+def make_frame(storage: GameStorage, handles: PositionHandles):
+    def frame():
+        positions = storage.step_positions()
+        storage._grid.update_many(positions)
+        positions.to_json()
+        encode_positions(handles, positions)
+    return frame
+
+
+def main():
+    storage = GameStorage()
+    handles = PositionHandles()
+    print(f"{'pets':>8} {'scalar step':>12} {'numpy step':>11} {'speedup':>8} "
+          f"{'scalar frame':>13} {'numpy frame':>12} {'speedup':>8}")
+    for n in SIZES:
+        storage._movement = None
+        storage.tamagotchis = make_world(n)
+        scalar_step = time_frames(storage.step_positions)
+        scalar_frame = time_frames(make_frame(storage, handles))
+
+        if MovementEngine.available():
+            storage._movement = MovementEngine(GAME_AREA_WIDTH, GAME_AREA_HEIGHT)
+            storage._movement.rebuild(storage.tamagotchis)
+            step = time_frames(storage.step_positions)
+            frame = time_frames(make_frame(storage, handles))
+            print(f"{n:>8} {scalar_step:>12.2f} {step:>11.2f} {scalar_step / step:>7.1f}x "
+                  f"{scalar_frame:>13.2f} {frame:>12.2f} {scalar_frame / frame:>7.1f}x")
+        else:
+            print(f"{n:>8} {scalar_step:>12.2f} {'n/a':>11} {'':>8} {scalar_frame:>13.2f} {'n/a':>12} {'':>8}")
+
+
+if __name__ == "__main__":
+    main()
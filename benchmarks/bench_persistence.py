@@ -0,0 +1,85 @@
+"""Cost of one save after a single pet changes, per persistence mode, and
+how long a full snapshot blocks the caller with the inline vs background writer.
+
+    python -m benchmarks.bench_persistence
+"""
+import math
+import os
+import random
+import tempfile
+import time
+import uuid
+
+# GameStorage creates game.db / game_data.* relative to the cwd
+os.chdir(tempfile.mkdtemp())
+
+from app.services.journal import Journal  # noqa: E402
+from app.services.persistence import PersistenceWriter  # noqa: E402
+from app.services.storage import GameStorage  # noqa: E402
+from app.config import JOURNAL_FILE  # noqa: E402
+from app.models import PetRecord  # noqa: E402
+
+SIZES = (50, 50_000, 500_000)
+MODES = ('snapshot', 'journal', 'sqlite')
+SAVES = 5
+
+
+def make_pet(owner_id: str) -> PetRecord:
+    now = time.time()
+    return PetRecord(
+        id=str(uuid.uuid4()), name='bench', owner_id=owner_id,
+        last_fed=now, last_played=now, last_slept=now, created_at=now,
+        x=random.uniform(0, 800), y=random.uniform(0, 600),
+        direction=random.uniform(0, 2 * math.pi), emoji='🐱',
+    )
+
+
+def main():
+    storage = GameStorage()
+    storage._movement = None
+    storage.writer = PersistenceWriter(background=False)  # time the disk work itself
+    print(f"{'pets':>8} " + " ".join(f"{m + ' ms':>12}" for m in MODES))
+    for n in SIZES:
+        world = {}
+        for _ in range(n):
+            pet = make_pet('bench-owner')
+            world[pet.id] = pet
+        storage.tamagotchis = world
+        ids = list(world)
+        row = []
+        for mode in MODES:
+            storage._persistence_mode = mode
+            storage._journal = Journal(JOURNAL_FILE, fsync=False) if mode == 'journal' else None
+            storage.save_data(full=True)  # baseline on disk, not timed
+            start = time.perf_counter()
+            for _ in range(SAVES):
+                pet_id = random.choice(ids)
+                world[pet_id].hunger += 1
+                storage._mark_dirty(pet_id)
+                storage.save_data()
+            row.append((time.perf_counter() - start) / SAVES * 1000)
+        print(f"{n:>8} " + " ".join(f"{ms:>12.2f}" for ms in row))
+
+    print(f"\n{'pets':>8} {'inline ms':>12} {'loop ms':>12} {'writer ms':>12}  (full snapshot)")
+    storage._persistence_mode = 'snapshot'
+    storage._journal = None
+    for n in SIZES:
+        world = {}
+        for _ in range(n):
+            pet = make_pet('bench-owner')
+            world[pet.id] = pet
+        storage.tamagotchis = world
+        storage.writer = PersistenceWriter(background=False)
+        start = time.perf_counter()
+        storage.save_data(full=True)
+        inline = (time.perf_counter() - start) * 1000
+        storage.writer = PersistenceWriter(background=True)
+        start = time.perf_counter()
+        storage.save_data(full=True)
+        loop = (time.perf_counter() - start) * 1000
+        storage.writer.close()
+        print(f"{n:>8} {inline:>12.2f} {loop:>12.2f} {storage.writer.last_ms:>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
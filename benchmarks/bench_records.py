@@ -0,0 +1,136 @@
+"""Memory and per-tick cost of the old nested-dict pets vs PetRecord.
+
+For each size the world is built once per representation; memory is what
+tracemalloc sees allocated for it. The passes time what the game loops do
+to every pet:
+
+  decay     - ages one stat, restamps it and re-evaluates status (the
+              stats tick's work for a due pet)
+  deadline  - seconds since each decay timestamp (rescheduling; ISO
+              parsing for dicts, a subtraction for records)
+  keyframe  - builds the stat block of a stats_update keyframe
+
+    python -m benchmarks.bench_records
+"""
+import gc
+import math
+import random
+import time
+import tracemalloc
+import uuid
+from datetime import datetime
+
+from app.models import PetRecord
+
+SIZES = (100_000, 1_000_000)
+STAT_FIELDS = ('happiness', 'hunger', 'energy', 'health', 'status', 'is_alive')
+TIMESTAMP_FIELDS = ('last_fed', 'last_played', 'last_slept')
+
+
+def make_dict(now: str) -> dict:
+    # The shape GameStorage.create_tamagotchi used to store
+    return {
+        'id': str(uuid.uuid4()), 'name': 'bench', 'owner_id': 'bench-owner',
+        'happiness': 100, 'hunger': 0, 'energy': 100, 'health': 100, 'age': 0,
+        'last_fed': now, 'last_played': now, 'last_slept': now, 'created_at': datetime.now().isoformat(),
+        'is_alive': True, 'status': 'Happy',
+        'position': {'x': random.uniform(0, 800), 'y': random.uniform(0, 600),
+                     'direction': random.uniform(0, 2 * math.pi), 'speed': 1.0},
+        'emoji': '🐱',
+    }
+
+
+def make_record(now: float) -> PetRecord:
+    return PetRecord(
+        id=str(uuid.uuid4()), name='bench', owner_id='bench-owner',
+        last_fed=now, last_played=now, last_slept=now, created_at=time.time(),
+        x=random.uniform(0, 800), y=random.uniform(0, 600),
+        direction=random.uniform(0, 2 * math.pi), emoji='🐱',
+    )
+
+
+def status_of(hunger, energy, happiness, health) -> str:
+    if health <= 0:
+        return 'Dead'
+    if hunger > 80:
+        return 'Starving'
+    if energy < 20:
+        return 'Tired'
+    if happiness < 30:
+        return 'Sad'
+    return 'Happy'
+
+
+def decay_dicts(pets):
+    now = datetime.now().isoformat()
+    for data in pets:
+        data['hunger'] = min(100, data['hunger'] + 1)
+        data['last_fed'] = now
+        data['status'] = status_of(data['hunger'], data['energy'], data['happiness'], data['health'])
+
+
+def decay_records(pets):
+    now = time.time()
+    for pet in pets:
+        pet.hunger = min(100, pet.hunger + 1)
+        pet.last_fed = now
+        pet.status = status_of(pet.hunger, pet.energy, pet.happiness, pet.health)
+
+
+def deadlines_dicts(pets):
+    now = datetime.now()
+    for data in pets:
+        for field in TIMESTAMP_FIELDS:
+            (now - datetime.fromisoformat(data[field])).total_seconds()
+
+
+def deadlines_records(pets):
+    now = time.time()
+    for pet in pets:
+        for field in TIMESTAMP_FIELDS:
+            now - getattr(pet, field)
+
+
+def keyframe_dicts(pets):
+    return [dict({'id': data['id']}, **{f: data.get(f) for f in STAT_FIELDS}) for data in pets]
+
+
+def keyframe_records(pets):
+    return [dict({'id': pet.id}, **{f: getattr(pet, f) for f in STAT_FIELDS}) for pet in pets]
+
+
+def build(make, stamp, n):
+    gc.collect()
+    tracemalloc.start()
+    world = {}
+    for _ in range(n):
+        pet = make(stamp)
+        world[pet['id'] if isinstance(pet, dict) else pet.id] = pet
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return world, size
+
+
+def timed(fn, pets) -> float:
+    start = time.perf_counter()
+    fn(pets)
+    return (time.perf_counter() - start) * 1000
+
+
+def main():
+    variants = (
+        ('dict', make_dict, lambda: datetime.now().isoformat(), decay_dicts, deadlines_dicts, keyframe_dicts),
+        ('PetRecord', make_record, time.time, decay_records, deadlines_records, keyframe_records),
+    )
+    print(f"{'pets':>9} {'store':<10} {'MB':>8} {'B/pet':>7} {'decay ms':>9} {'deadline ms':>12} {'keyframe ms':>12}")
+    for n in SIZES:
+        for name, make, stamp, decay, deadlines, keyframe in variants:
+            world, size = build(make, stamp(), n)
+            pets = list(world.values())
+            print(f"{n:>9,} {name:<10} {size / 2**20:>8.1f} {size / n:>7.0f} {timed(decay, pets):>9.1f} "
+                  f"{timed(deadlines, pets):>12.1f} {timed(keyframe, pets):>12.1f}")
+            del world, pets
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""Event-loop time spent simulating one second of game time: in-process
+ticks (NumPy movement engine + decay scheduler) vs shard workers.
+
+One simulated second is 10 position frames plus one stats tick. In-process
+the loop steps every pet and applies due decay itself; with shards the
+workers do that and the loop only reads positions and collects stat
+changes from shared memory.
+
+    python -m benchmarks.bench_shards
+    python -m benchmarks.bench_shards --sizes 100000 500000
+
+The defaults (10k and 100k pets) take about a minute on one core, nearly
+all of it in the 100k runs. Larger worlds grow from there: 500k pets takes
+well over five minutes.
+"""
+import argparse
+import math
+import os
+import random
+import tempfile
+import time
+
+# GameStorage creates game.db / game_data.* relative to the cwd
+os.chdir(tempfile.mkdtemp())
+
+from app.config import GAME_AREA_WIDTH, GAME_AREA_HEIGHT, POSITION_UPDATE_INTERVAL, STATS_UPDATE_INTERVAL  # noqa: E402
+from app.models import PetRecord  # noqa: E402
+from app.services.movement import MovementEngine  # noqa: E402
+from app.services.shards import ShardedSimulation  # noqa: E402
+from app.services.storage import GameStorage  # noqa: E402
+
+SIZES = (10_000, 100_000)
+WORKERS = (2, 4)
+SECONDS = 3
+
+
+def make_world(n: int) -> dict:
+    now = time.time()
+    world = {}
+    for i in range(n):
+        pet_id = f"pet-{i}"
+        # Timestamps spread over their decay periods, so each tick some pets are due
+        world[pet_id] = PetRecord(
+            id=pet_id, name='bench', owner_id=f"owner-{i % 1000}",
+            last_fed=now - random.uniform(0, 30), last_played=now - random.uniform(0, 60),
+            last_slept=now - random.uniform(0, 45), created_at=now,
+            x=random.uniform(0, GAME_AREA_WIDTH), y=random.uniform(0, GAME_AREA_HEIGHT),
+            direction=random.uniform(0, 2 * math.pi),
+        )
+    return world
+
+
+def loop_ms_per_second(storage: GameStorage) -> float:
+    """Event-loop milliseconds per simulated second (frames paced like the real loops)."""
+    frames = round(STATS_UPDATE_INTERVAL / POSITION_UPDATE_INTERVAL)
+    busy = 0.0
+    for _ in range(SECONDS):
+        for _ in range(frames):
+            start = time.perf_counter()
+            storage._grid.update_many(storage.step_positions())
+            busy += time.perf_counter() - start
+            time.sleep(POSITION_UPDATE_INTERVAL)
+        start = time.perf_counter()
+        storage._apply_due_decay()
+        busy += time.perf_counter() - start
+    return busy / SECONDS * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=SIZES, help="world sizes to run (pets)")
+    args = parser.parse_args()
+
+    storage = GameStorage()
+    storage._mark_dirty = lambda pet_id: None  # saves are not measured
+    # Workers only pay off with spare cores; on one core they compete with the loop
+    print(f"cpus: {os.cpu_count()}")
+    print(f"{'pets':>8} {'mode':<12} {'loop ms/s':>10} {'worker tick ms':>15}")
+    for n in args.sizes:
+        storage.tamagotchis = make_world(n)
+        storage.shards = None
+        storage._movement = MovementEngine(GAME_AREA_WIDTH, GAME_AREA_HEIGHT)
+        storage._movement.rebuild(storage.tamagotchis)
+        storage._rebuild_indexes()
+        print(f"{n:>8} {'in-process':<12} {loop_ms_per_second(storage):>10.1f} {'':>15}")
+
+        for workers in WORKERS:
+            shards = ShardedSimulation(workers, GAME_AREA_WIDTH, GAME_AREA_HEIGHT, n // workers + 1,
+                                       POSITION_UPDATE_INTERVAL, STATS_UPDATE_INTERVAL, GameStorage.DECAY_RULES)
+            storage.shards = storage._movement = shards
+            storage._rebuild_indexes()
+            shards.rebuild(storage.tamagotchis)
+            shards.start()
+            while min(shards.stats()['stats_ticks']) < 1:
+                time.sleep(0.1)
+            loop = loop_ms_per_second(storage)
+            tick = max(shards.stats()['last_tick_ms'])
+            print(f"{n:>8} {f'{workers} shards':<12} {loop:>10.1f} {tick:>15.2f}")
+            shards.release()
+
+
+if __name__ == "__main__":
+    main()
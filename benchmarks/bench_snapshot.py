@@ -0,0 +1,76 @@
+"""Cost of serving the whole world to readers: rebuilding it on every read
+vs the per-generation snapshot cache, plus a conditional HTTP request
+answered with 304.
+
+Each "read" is what one ``allTamagotchis`` call or one ``/snapshot`` hit
+used to cost; with the cache, readers that arrive within one generation
+share a single build.
+
+    python -m benchmarks.bench_snapshot
+"""
+import asyncio
+import os
+import tempfile
+import time
+
+# GameStorage creates game.db / game_data.* relative to the cwd
+os.chdir(tempfile.mkdtemp())
+
+from fastapi.testclient import TestClient  # noqa: E402
+from fastapi import FastAPI  # noqa: E402
+
+from app.models import Tamagotchi  # noqa: E402
+from app.routes.snapshot import setup_snapshot_routes  # noqa: E402
+from app.services.storage import GameStorage  # noqa: E402
+
+SIZES = (1_000, 10_000)
+READS = 50
+
+
+def timed(fn, reads: int = READS) -> float:
+    start = time.perf_counter()
+    for _ in range(reads):
+        fn()
+    return (time.perf_counter() - start) / reads * 1000
+
+
+def main():
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    storage = GameStorage()
+    storage.flush_save = lambda: None  # saves are not measured
+    app = FastAPI()
+    setup_snapshot_routes(app, storage)
+    client = TestClient(app)
+
+    print(f"{'pets':>7} {'view':<16} {'rebuild ms':>11} {'cached ms':>10} {'304 ms':>8}")
+    for n in SIZES:
+        while len(storage.tamagotchis) < n:
+            storage.create_tamagotchi("bench", "owner")
+
+        def all_tamagotchis():
+            # What the unfiltered allTamagotchis resolver does
+            return storage.snapshots.get('tamagotchis', lambda: [
+                Tamagotchi.from_record(pet) for pet in storage.get_all_tamagotchis()
+            ])
+
+        def rebuild_pets():
+            storage.snapshots.bump()
+            all_tamagotchis()
+
+        def rebuild_http():
+            storage.snapshots.bump()
+            client.get("/snapshot")
+
+        print(f"{n:>7} {'allTamagotchis':<16} {timed(rebuild_pets):>11.2f} "
+              f"{timed(all_tamagotchis):>10.3f} {'':>8}")
+        cached = timed(lambda: client.get("/snapshot"), 10)
+        etag = client.get("/snapshot").headers["etag"]
+        assert client.get("/snapshot", headers={"If-None-Match": etag}).status_code == 304
+        not_modified = timed(lambda: client.get("/snapshot", headers={"If-None-Match": etag}), 10)
+        print(f"{n:>7} {'/snapshot':<16} {timed(rebuild_http, 10):>11.2f} {cached:>10.3f} {not_modified:>8.3f}")
+    loop.close()
+
+
+if __name__ == "__main__":
+    main()
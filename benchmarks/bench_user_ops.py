@@ -0,0 +1,133 @@
+"""User-table operations per second: the old per-call connection pattern
+(connect, execute, commit, close on every call; rollback journal,
+synchronous=FULL) vs the per-thread long-lived WAL connection.
+
+Every measured operation reads or writes the users table. Password hashing
+is left out; it dominates create_user/authenticate_user regardless of how
+the connection is obtained.
+
+    python -m benchmarks.bench_user_ops
+"""
+import os
+import sqlite3
+import tempfile
+import time
+
+# GameStorage creates game.db / game_data.* relative to the cwd
+os.chdir(tempfile.mkdtemp())
+
+import app.db as db  # noqa: E402
+from app.services.storage import GameStorage  # noqa: E402
+
+USERS = 200
+OPS = 2_000
+LEGACY_DB = "legacy.db"
+
+
+class LegacyUserOps:
+    """The user methods as they were before the connection pool: each call
+    opens its own connection and closes it when done."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.users = {}
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def get_user(self, user_id: str):
+        data = self.users.get(user_id)
+        if data:
+            return data
+        conn = self._connect()
+        try:
+            cur = conn.cursor()
+            cur.execute(
+                "SELECT id, username, created_at, mouse_x, mouse_y, is_online, difficulty FROM users WHERE id = ?",
+                (user_id,)
+            )
+            row = cur.fetchone()
+            if not row:
+                return None
+            data = dict(row)
+            self.users[user_id] = data
+            return data
+        finally:
+            conn.close()
+
+    def set_user_difficulty(self, user_id: str, difficulty: float):
+        conn = self._connect()
+        try:
+            cur = conn.cursor()
+            cur.execute("UPDATE users SET difficulty = ? WHERE id = ?", (difficulty, user_id))
+            conn.commit()
+        finally:
+            conn.close()
+
+    def set_user_online(self, user_id: str, is_online: bool):
+        conn = self._connect()
+        try:
+            cur = conn.cursor()
+            cur.execute("UPDATE users SET is_online = ? WHERE id = ?", (1 if is_online else 0, user_id))
+            conn.commit()
+        finally:
+            conn.close()
+
+
+def run(ops, user_ids):
+    """Time each operation against ``ops`` (GameStorage or LegacyUserOps)."""
+    results = {}
+
+    start = time.perf_counter()
+    for i in range(OPS):
+        ops.users.pop(user_ids[i % len(user_ids)], None)
+        ops.get_user(user_ids[i % len(user_ids)])
+    results['get_user (miss)'] = OPS / (time.perf_counter() - start)
+
+    start = time.perf_counter()
+    for i in range(OPS):
+        ops.set_user_difficulty(user_ids[i % len(user_ids)], 1.0 + (i % 3))
+    results['set_user_difficulty'] = OPS / (time.perf_counter() - start)
+
+    start = time.perf_counter()
+    for i in range(OPS):
+        ops.set_user_online(user_ids[i % len(user_ids)], bool(i % 2))
+    results['set_user_online'] = OPS / (time.perf_counter() - start)
+    return results
+
+
+def seed(conn, user_ids):
+    with conn:
+        conn.executemany(
+            "INSERT INTO users (id, username, password_hash, created_at) VALUES (?, ?, ?, ?)",
+            [(uid, uid, "x", "") for uid in user_ids],
+        )
+
+
+def main():
+    storage = GameStorage()
+    storage._cancel_save_task()
+    storage.schedule_save = lambda: None  # no event loop here; saves are not measured
+    user_ids = [f"bench-{i}" for i in range(USERS)]
+
+    seed(db.get_connection(), user_ids)
+    storage._load_users_from_db()
+    pooled = run(storage, user_ids)
+
+    # Same schema in a separate file so WAL (persistent per database) stays off
+    legacy = sqlite3.connect(LEGACY_DB)
+    for (sql,) in db.get_connection().execute("SELECT sql FROM sqlite_master WHERE type = 'table'"):
+        legacy.execute(sql)
+    seed(legacy, user_ids)
+    legacy.close()
+    before = run(LegacyUserOps(LEGACY_DB), user_ids)
+
+    print(f"{'operation':<24} {'per-call ops/s':>15} {'pooled ops/s':>13} {'speedup':>8}")
+    for name in pooled:
+        print(f"{name:<24} {before[name]:>15,.0f} {pooled[name]:>13,.0f} {pooled[name] / before[name]:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -185,15 +185,15 @@ export function useGameData(pushToast, currentUser) {
         }
         break;
       }
-      case 'mouse_position': {
-        const uid = message?.data?.user_id;
-        if (uid && uid !== currentUser.value?.id) {
-          const idx = otherMousePositions.value.findIndex((m) => m.user_id === uid);
-          if (idx !== -1) {
-            otherMousePositions.value = otherMousePositions.value.map((m, i) => (i === idx ? message.data : m));
-          } else {
-            otherMousePositions.value = [...otherMousePositions.value, message.data];
+      case 'cursors': {
+        // Cursors that moved since the previous frame
+        if (Array.isArray(message.data)) {
+          const byUser = new Map(otherMousePositions.value.map((m) => [m.user_id, m]));
+          for (const cursor of message.data) {
+            const uid = cursor?.user_id;
+            if (uid && uid !== currentUser.value?.id) byUser.set(uid, cursor);
           }
+          otherMousePositions.value = [...byUser.values()];
         }
         break;
       }
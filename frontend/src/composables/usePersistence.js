@@ -1,18 +1,28 @@
 import { watch, onMounted, onBeforeUnmount } from 'vue';
 import { useMutation } from '@vue/apollo-composable';
-import { UPDATE_TAMAGOTCHI_LOCATION } from '../graphql/tamagotchi';
+import { UPDATE_TAMAGOTCHI_LOCATIONS } from '../graphql/tamagotchi';
 
-export function useDebouncedPersistence(allTamagotchis, positionsById, delayMs = 30000, intervalMs = 60000) {
-  const { mutate: updateLocation } = useMutation(UPDATE_TAMAGOTCHI_LOCATION);
+// Moves the server accepts per updateTamagotchiLocations call (MAX_LOCATION_BATCH in app/config.py)
+const MAX_LOCATION_BATCH = 1000;
+
+export function useDebouncedPersistence(allTamagotchis, positionsById, currentUser, delayMs = 30000, intervalMs = 60000) {
+  const { mutate: updateLocations } = useMutation(UPDATE_TAMAGOTCHI_LOCATIONS);
   let timeoutId = null;
   let intervalId = null;
 
   const saveAllLocations = async () => {
     try {
+      // Only this user's living pets, in batches the server accepts
+      const userId = currentUser.value?.id;
+      if (!userId) return;
+      const inputs = [];
       for (const t of allTamagotchis.value || []) {
-        if (!t.isAlive) continue;
+        if (!t.isAlive || t.ownerId !== userId) continue;
         const pos = positionsById.value?.[t.id];
-        if (pos) await updateLocation({ id: t.id, x: pos.x, y: pos.y });
+        if (pos) inputs.push({ id: t.id, x: pos.x, y: pos.y });
+      }
+      for (let i = 0; i < inputs.length; i += MAX_LOCATION_BATCH) {
+        await updateLocations({ inputs: inputs.slice(i, i + MAX_LOCATION_BATCH) });
       }
     } catch (e) {
       // swallow errors to avoid UX disruption
@@ -5,16 +5,61 @@ export function useWebSocket(currentUser) {
   let retry = 0;
   let shouldReconnect = true;
   let messageHandler = null;
+  let statsVersion = null;
+  // Binary position frames: handle -> pet id, announced by the server per session
+  let handleIds = [];
+
+  // Unpack a binary position frame into the JSON position_update shape
+  // (header: u8 type, u8 version, u16 reserved, u32 count; then u32 handles,
+  // f32 x, f32 y, f32 direction columns)
+  const decodePositions = (buf) => {
+    const view = new DataView(buf);
+    if (view.getUint8(0) !== 1) return null;
+    const n = view.getUint32(4, true);
+    const handles = new Uint32Array(buf, 8, n);
+    const xs = new Float32Array(buf, 8 + 4 * n, n);
+    const ys = new Float32Array(buf, 8 + 8 * n, n);
+    const ds = new Float32Array(buf, 8 + 12 * n, n);
+    const positions = [];
+    for (let i = 0; i < n; i++) {
+      const id = handleIds[handles[i]];
+      if (id) positions.push({ id, x: xs[i], y: ys[i], direction: ds[i] });
+    }
+    return { type: 'position_update', positions };
+  };
+
+  const parseMessage = (evt) => {
+    if (evt.data instanceof ArrayBuffer) return decodePositions(evt.data);
+    const data = JSON.parse(evt.data);
+    if (data?.type === 'position_handles') {
+      data.handles.forEach((h, i) => { handleIds[h] = data.ids[i]; });
+      return null;
+    }
+    return data;
+  };
+
+  // stats_update frames are deltas; ask for a keyframe when one was missed
+  const trackStatsVersion = (data) => {
+    if (data?.type !== 'stats_update' || typeof data.version !== 'number') return;
+    if (!data.keyframe && statsVersion !== null && data.version !== statsVersion + 1) {
+      try { ws.value.send(JSON.stringify({ type: 'resync' })); } catch (_) {}
+    }
+    statsVersion = data.version;
+  };
+
+  const onMessage = (evt) => {
+    try {
+      const data = parseMessage(evt);
+      if (!data || !messageHandler) return;
+      trackStatsVersion(data);
+      messageHandler(data);
+    } catch (_) {}
+  };
 
   const setMessageHandler = (cb) => {
     messageHandler = typeof cb === 'function' ? cb : null;
     if (ws.value && messageHandler) {
-      ws.value.onmessage = (evt) => {
-        try {
-          const data = JSON.parse(evt.data);
-          messageHandler(data);
-        } catch (_) {}
-      };
+      ws.value.onmessage = onMessage;
     }
   };
 
@@ -23,14 +68,17 @@ export function useWebSocket(currentUser) {
     const protocol = window.location.protocol === 'https:' ? 'wss:' : 'ws:';
     const wsUrl = `${protocol}//${window.location.host}/ws/${currentUser.value.id}`;
     ws.value = new WebSocket(wsUrl);
-    ws.value.onopen = () => { retry = 0; };
-    ws.value.onmessage = (evt) => {
-      if (!messageHandler) return;
+    ws.value.binaryType = 'arraybuffer';
+    ws.value.onopen = () => {
+      retry = 0;
+      statsVersion = null;
+      handleIds = [];
       try {
-        const data = JSON.parse(evt.data);
-        messageHandler(data);
+        ws.value.send(JSON.stringify({ type: 'hello', binary_positions: true }));
+        ws.value.send(JSON.stringify({ type: 'resync' }));
       } catch (_) {}
     };
+    ws.value.onmessage = onMessage;
     ws.value.onclose = () => {
       if (!shouldReconnect) return;
       const delay = Math.min(30000, 1000 * Math.pow(2, retry));
@@ -3,7 +3,7 @@ import gql from 'graphql-tag';
 export const GET_ALL_TAMAGOTCHIS = gql`
   query GetAllTamagotchis {
     allTamagotchis {
-      id name ownerId happiness hunger energy health age isAlive status
+      id name ownerId happiness hunger energy health age createdAt isAlive status
       position { x y direction speed }
       emoji
     }
@@ -19,7 +19,7 @@ export const GET_ALL_USERS = gql`
 export const CREATE_TAMAGOTCHI = gql`
   mutation CreateTamagotchi($input: CreateTamagotchiInput!) {
     createTamagotchi(input: $input) {
-      id name ownerId happiness hunger energy health age isAlive status
+      id name ownerId happiness hunger energy health age createdAt isAlive status
       position { x y direction speed }
       emoji
     }
@@ -31,7 +31,7 @@ export const TAMAGOTCHI_UPDATES_SUBSCRIPTION = gql`
     tamagotchiUpdates {
       type
       tamagotchi {
-        id name ownerId happiness hunger energy health age isAlive status
+        id name ownerId happiness hunger energy health age createdAt isAlive status
         position { x y direction speed }
         emoji
       }
@@ -49,6 +49,15 @@ export const UPDATE_TAMAGOTCHI_LOCATION = gql`
   }
 `;
 
+export const UPDATE_TAMAGOTCHI_LOCATIONS = gql`
+  mutation UpdateTamagotchiLocations($inputs: [TamagotchiLocationInput!]!) {
+    updateTamagotchiLocations(inputs: $inputs) {
+      id
+      position { x y }
+    }
+  }
+`;
+
 export const SUPPORT_TAMAGOTCHI = gql`
   mutation SupportTamagotchi($id: ID!) {
     supportTamagotchi(id: $id) {